@@ -1,50 +1,64 @@
-from FundRaiseDAL.DAL_core import get_db_connection
-import mysql.connector
+from FundRaiseDAL.DAL_core import (get_db_connection, DB_ERRORS, after_commit, filter_clause, fund_status_filter,
+                                   keyset_clause, like_prefix, limit_clause, sort_clause, text_column)
+from FundRaiseDAL.DAL_counters import sync_fund_total
+from FundRaiseDAL.DAL_events import publish, FUND_DELETED, FUND_UPDATED, FUND_VERIFIED
+from FundRaiseDAL.DAL_metrics import instrumented
+from FundRaiseDAL.DAL_retry import raise_if_retryable, retry_transient
 
 # ============================================================
 # Helper Query Functions related to admin role
 # ============================================================
 
-def fetch_unverified_funds():
+@instrumented
+def fetch_unverified_funds(after=None, limit=None, session=None):
     """
     Fetches FundsNeeded records that are not yet verified (is_verified = FALSE).
-    Returns list of (fund_id, recipient_name, service_name, amount_needed, proof_of_charge).
+    Returns list of (fund_id, recipient_name, service_name, amount_needed); the
+    proof_of_charge is loaded on selection with DAL_core.fetch_fund_details.
+    Oldest first; pass after=fund_id of the last row shown to get the next page.
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
-        query = """
+        seek, params = keyset_clause(('f.fund_id',), None if after is None else (after,), descending=False)
+        limit_sql, limit_params = limit_clause(limit)
+        query = f"""
         SELECT
             f.fund_id,
             u_rec.name AS RecipientName,
             s.service_name AS ServiceName,
-            f.amount_needed,
-            f.proof_of_charge
+            f.amount_needed
         FROM FundsNeeded f
         JOIN Users u_rec ON f.recipient_id = u_rec.user_id
         JOIN Services s ON f.service_id = s.user_id
         WHERE f.is_verified = FALSE
-        ORDER BY f.fund_id ASC;
+        {'AND ' + seek if seek else ''}
+        ORDER BY f.fund_id ASC
+        {limit_sql};
         """
-        cursor.execute(query)
+        cursor.execute(query, tuple(params + limit_params))
         data = cursor.fetchall()
         cursor.close()
         conn.close()
         return data
     return []
 
-def update_fund_verification_status(fund_id: int) -> bool:
+@instrumented
+@retry_transient
+def update_fund_verification_status(fund_id: int, session=None) -> bool:
     """Updates a fund's is_verified status to TRUE."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
             query = "UPDATE FundsNeeded SET is_verified = TRUE WHERE fund_id = %s"
             cursor.execute(query, (fund_id,))
             conn.commit()
+            after_commit(session, lambda: publish(FUND_VERIFIED, fund_ids=[fund_id]))
             return True
-        except mysql.connector.Error:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False
         finally:
             cursor.close()
@@ -52,17 +66,117 @@ def update_fund_verification_status(fund_id: int) -> bool:
     return False
 
 
-def fetch_all_funds():
+# Largest IN (...) list sent in one statement; longer batches are split into
+# several statements inside the same transaction.
+BULK_CHUNK_SIZE = 500
+
+
+@instrumented
+@retry_transient
+def update_fund_verification_status_bulk(fund_ids, session=None):
+    """
+    Sets is_verified = TRUE for every fund in fund_ids in one transaction.
+    Returns (True, outcomes) where outcomes maps each fund_id to 'verified',
+    'already_verified' or 'not_found', or (False, error_message) after a
+    rollback, in which case no fund was changed.
+    """
+    fund_ids = list(dict.fromkeys(fund_ids))
+    if not fund_ids:
+        return True, {}
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            outcomes = {fund_id: 'not_found' for fund_id in fund_ids}
+            for start in range(0, len(fund_ids), BULK_CHUNK_SIZE):
+                chunk = fund_ids[start:start + BULK_CHUNK_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"SELECT fund_id, is_verified FROM FundsNeeded WHERE fund_id IN ({placeholders})",
+                               tuple(chunk))
+                for fund_id, is_verified in cursor.fetchall():
+                    outcomes[fund_id] = 'already_verified' if is_verified else 'verified'
+                cursor.execute(f"""
+                UPDATE FundsNeeded SET is_verified = TRUE
+                WHERE fund_id IN ({placeholders}) AND is_verified = FALSE
+                """, tuple(chunk))
+            conn.commit()
+            verified = [fund_id for fund_id, outcome in outcomes.items() if outcome == 'verified']
+            if verified:
+                after_commit(session, lambda: publish(FUND_VERIFIED, fund_ids=verified))
+            return True, outcomes
+        except DB_ERRORS as err:
+            conn.rollback()
+            raise_if_retryable(err, session)
+            return False, str(err)
+        finally:
+            cursor.close()
+            conn.close()
+    return False, "Failed to connect to the database."
+
+
+# name -> (column, row position, is_text)
+ALL_FUNDS_SORTS = {
+    'fund_id': ('f.fund_id', 0, False),
+    'needed': ('f.amount_needed', 3, False),
+    'raised': ('f.amount_raised', 4, False),
+}
+ALL_FUNDS_FILTERS = {
+    # Recipient name starts with the text (Users name index)
+    'recipient': lambda value: (
+        f"f.recipient_id IN (SELECT user_id FROM Users WHERE {text_column('name')} LIKE %s ESCAPE '!')",
+        [like_prefix(value.strip())],
+    ),
+    'status': fund_status_filter,
+}
+
+
+@instrumented
+def fetch_all_funds(after=None, limit=None, offset=None, sort=None, descending=False, filters=None, session=None):
     """
     Fetches ALL FundsNeeded records for admin management.
     Returns list of:
       (fund_id, recipient_name, service_name,
-       amount_needed, amount_raised, is_verified, is_fully_funded, proof_of_charge)
+       amount_needed, amount_raised, is_verified, is_fully_funded)
+    The proof_of_charge is loaded on selection with DAL_core.fetch_fund_details.
+    Sorted by one of ALL_FUNDS_SORTS (default: fund_id, oldest first) and
+    narrowed by ALL_FUNDS_FILTERS. Pass after=fund_id of the last row shown
+    (or (sort value, fund_id) when sorting by another column) to get the next
+    page, or offset=n with a limit to start at the n-th fund (for jumping to
+    a scroll position). offset without a limit, or together with after,
+    raises ValueError.
     """
-    conn = get_db_connection()
+    if offset is not None and after is not None:
+        raise ValueError("Pass either after or offset, not both.")
+    if offset is not None and limit is None:
+        raise ValueError("An offset needs a limit.")
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
-        query = """
+        column = sort_clause(ALL_FUNDS_SORTS, sort, 'fund_id')
+        keys = ('f.fund_id',) if column == 'f.fund_id' else (column, 'f.fund_id')
+        order = ', '.join(f"{key} {'DESC' if descending else 'ASC'}" for key in keys)
+        where, params = filter_clause(filters, ALL_FUNDS_FILTERS)
+        limit_sql, limit_params = limit_clause(limit)
+        if offset is not None:
+            # Skip on FundsNeeded and its indexes alone, then join only the rows returned
+            source = f"""(
+                SELECT f.fund_id FROM FundsNeeded f
+                {'WHERE ' + ' AND '.join(where) if where else ''}
+                ORDER BY {order}
+                LIMIT %s OFFSET %s
+            ) page
+            JOIN FundsNeeded f ON f.fund_id = page.fund_id"""
+            params = params + [int(limit), int(offset)]
+            where, limit_sql, limit_params = [], '', []
+        else:
+            if after is not None and not isinstance(after, tuple):
+                after = (after,)
+            seek, seek_params = keyset_clause(keys, after, descending=descending)
+            if seek:
+                where.append(seek)
+                params += seek_params
+            source = "FundsNeeded f"
+        query = f"""
         SELECT
             f.fund_id,
             u_rec.name AS RecipientName,
@@ -70,14 +184,15 @@ def fetch_all_funds():
             f.amount_needed,
             f.amount_raised,
             f.is_verified,
-            f.is_fully_funded,
-            f.proof_of_charge
-        FROM FundsNeeded f
+            f.is_fully_funded
+        FROM {source}
         JOIN Users u_rec ON f.recipient_id = u_rec.user_id
         JOIN Services s ON f.service_id = s.user_id
-        ORDER BY f.fund_id ASC;
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY {order}
+        {limit_sql};
         """
-        cursor.execute(query)
+        cursor.execute(query, tuple(params + limit_params))
         rows = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -85,26 +200,49 @@ def fetch_all_funds():
     return []
 
 
-def update_fund_amount_and_proof(fund_id: int, new_amount: float, new_proof: str):
+@instrumented
+def count_all_funds(filters=None, session=None):
+    """Returns the number of FundsNeeded records matching ALL_FUNDS_FILTERS (0 if unreachable)."""
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        where, params = filter_clause(filters, ALL_FUNDS_FILTERS)
+        cursor.execute(f"SELECT COUNT(*) FROM FundsNeeded f {'WHERE ' + ' AND '.join(where) if where else ''}",
+                       tuple(params))
+        count = cursor.fetchone()[0]
+        cursor.close()
+        conn.close()
+        return count
+    return 0
+
+
+@instrumented
+@retry_transient
+def update_fund_amount_and_proof(fund_id: int, new_amount: float, new_proof: str, session=None):
     """
     Updates amount_needed and proof_of_charge for a specific fund.
     Returns (success: bool, message: str).
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
+            # is_fully_funded is judged on the full total, unfolded shards included
+            sync_fund_total(cursor, fund_id)
             query = """
             UPDATE FundsNeeded
-            SET amount_needed = %s,
+            SET is_fully_funded = CASE WHEN amount_raised >= %s THEN TRUE ELSE FALSE END,
+                amount_needed = %s,
                 proof_of_charge = %s
             WHERE fund_id = %s
             """
-            cursor.execute(query, (new_amount, new_proof, fund_id))
+            cursor.execute(query, (new_amount, new_amount, new_proof, fund_id))
             conn.commit()
+            after_commit(session, lambda: publish(FUND_UPDATED, fund_ids=[fund_id]))
             return True, "Success"
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -112,23 +250,31 @@ def update_fund_amount_and_proof(fund_id: int, new_amount: float, new_proof: str
     return False, "Failed to connect to the database."
 
 
-def delete_fund(fund_id: int):
+@instrumented
+@retry_transient
+def delete_fund(fund_id: int, session=None):
     """
     Deletes a fund (and its donations) from the database.
     Returns (success: bool, message: str).
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
-            # Remove dependent donations first (FK constraint)
+            # Remove dependent donations and counter shards first (FK constraint)
             cursor.execute("DELETE FROM Donations WHERE fund_id = %s", (fund_id,))
-            # Then delete the fund itself
+            cursor.execute("DELETE FROM FundCounterShards WHERE fund_id = %s", (fund_id,))
+            # Then delete the fund itself; its running total goes with it
             cursor.execute("DELETE FROM FundsNeeded WHERE fund_id = %s", (fund_id,))
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return False, "Fund not found."
             conn.commit()
+            after_commit(session, lambda: publish(FUND_DELETED, fund_ids=[fund_id]))
             return True, "Success"
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
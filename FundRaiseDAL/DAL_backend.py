@@ -0,0 +1,205 @@
+"""Storage backends for the DAL.
+
+Every DAL module talks to a DB-API connection obtained through
+DAL_core.get_db_connection(). A backend knows how to open such a connection
+for one database engine, how to tell whether a pooled connection is still
+usable, and which exception types its driver raises.
+
+Two backends are available:
+
+* MySQLBackend  - the production database, configured through DB_CONFIG.
+* SQLiteBackend - a file-based or in-memory database with the same schema,
+                  used to run and benchmark the LIB managers without a server.
+                  Its schema is created by the DAL_migrations runner.
+"""
+
+import sqlite3
+import itertools
+from datetime import date, datetime
+from decimal import Decimal
+
+from .DAL_migrations import upgrade
+
+try:
+    import mysql.connector
+except ImportError:     # SQLite-only installs
+    mysql = None
+
+
+# Exception types any backend may raise from execute()/commit().
+DB_ERRORS = (sqlite3.Error,) + ((mysql.connector.Error,) if mysql else ())
+
+
+# ============================================================
+# MySQL
+# ============================================================
+class MySQLBackend:
+    """Production backend using mysql.connector."""
+
+    name = 'mysql'
+
+    def __init__(self, **config):
+        if mysql is None:
+            raise RuntimeError("mysql-connector-python is not installed; use the 'sqlite' backend instead.")
+        self.config = config
+
+    def connect(self):
+        return mysql.connector.connect(**self.config)
+
+    def is_alive(self, raw):
+        return raw.is_connected()
+
+    # ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK: the transaction was rolled back
+    # (or its statement was) and can safely be run again.
+    TRANSIENT_ERRNOS = {1205, 1213}
+
+    def is_transient(self, err):
+        return getattr(err, 'errno', None) in self.TRANSIENT_ERRNOS
+
+    def pool_overrides(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# SQLite
+# ============================================================
+# The DAL is written against MySQL: %s placeholders, IF() and CONCAT().
+# SQLite gets the same SQL through a cursor that rewrites the placeholders
+# and through user-defined functions for the two MySQL built-ins.
+
+class _SQLiteCursor(sqlite3.Cursor):
+    def execute(self, sql, params=()):
+        return super().execute(sql.replace('%s', '?'), params)
+
+    def executemany(self, sql, seq_of_params):
+        return super().executemany(sql.replace('%s', '?'), seq_of_params)
+
+
+class _SQLiteConnection(sqlite3.Connection):
+    def cursor(self, factory=_SQLiteCursor):
+        return super().cursor(factory)
+
+
+def _sql_if(condition, when_true, when_false):
+    return when_true if condition else when_false
+
+
+def _sql_concat(*parts):
+    if any(p is None for p in parts):
+        return None     # MySQL CONCAT() is NULL if any argument is NULL
+    return ''.join(f"{p:.2f}" if isinstance(p, float) else str(p) for p in parts)
+
+
+def _to_decimal(raw):
+    # Money columns are DECIMAL(x, 2) in MySQL; SQLite stores them as REAL.
+    return Decimal(raw.decode()).quantize(Decimal('0.01'))
+
+
+def _to_datetime(raw):
+    return datetime.fromisoformat(raw.decode())
+
+
+def _to_date(raw):
+    return date.fromisoformat(raw.decode()[:10])
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('DECIMAL', _to_decimal)
+sqlite3.register_converter('DATETIME', _to_datetime)
+sqlite3.register_converter('DATE', _to_date)
+
+
+class SQLiteBackend:
+    """File-based or in-memory SQLite backend with the MySQL schema.
+
+    database is a file path or ':memory:'. In-memory databases are shared
+    between the pool's connections through SQLite's shared cache, and are
+    kept alive for as long as the backend is open.
+    """
+
+    name = 'sqlite'
+    _memory_ids = itertools.count(1)
+
+    def __init__(self, database='fundraising.db', timeout=5.0, bootstrap=True):
+        self.memory = database == ':memory:'
+        if self.memory:
+            self.database = f"file:fundraise_mem_{next(self._memory_ids)}?mode=memory&cache=shared"
+        else:
+            self.database = database
+        self.timeout = timeout
+        self._keeper = None
+
+        if self.memory:
+            # The in-memory database lives as long as one connection to it is open.
+            self._keeper = self.connect()
+        if bootstrap:
+            self.bootstrap()
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.timeout,
+            uri=self.memory,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,    # the pool hands connections across threads
+            factory=_SQLiteConnection,
+        )
+        conn.create_function('IF', 3, _sql_if, deterministic=True)
+        conn.create_function('CONCAT', -1, _sql_concat, deterministic=True)
+        conn.execute('PRAGMA foreign_keys = ON')
+        if not self.memory:
+            conn.execute('PRAGMA journal_mode = WAL')
+        return conn
+
+    def is_alive(self, raw):
+        raw.execute('SELECT 1')
+        return True
+
+    # SQLITE_BUSY, SQLITE_LOCKED ("database is locked" / "database table is locked")
+    TRANSIENT_CODES = {5, 6}
+
+    def is_transient(self, err):
+        if not isinstance(err, sqlite3.OperationalError):
+            return False
+        code = getattr(err, 'sqlite_errorcode', None)
+        if code is not None:
+            return code & 0xFF in self.TRANSIENT_CODES
+        return 'locked' in str(err)
+
+    def pool_overrides(self):
+        # Shared-cache in-memory databases fail with "table is locked" rather
+        # than waiting, so serialize access through a single connection.
+        return {'min_size': 1, 'max_size': 1} if self.memory else {}
+
+    def bootstrap(self):
+        """Brings the schema up to date by running the pending migrations."""
+        conn = self.connect()
+        try:
+            upgrade(conn, self.name)
+        finally:
+            conn.close()
+
+    def close(self):
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+
+BACKENDS = {
+    'mysql': MySQLBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def create_backend(name, **options):
+    """Instantiates the backend registered under name."""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown database backend '{name}'. Choose one of: {', '.join(BACKENDS)}.")
+    return backend_cls(**options)
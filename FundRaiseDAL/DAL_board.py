@@ -0,0 +1,117 @@
+"""Maintenance of the PublicBoard read model (migration 6).
+
+PublicBoard holds one display-ready row per fund for the public MainWindow
+board (DAL_core.fetch_funds_data). Triggers keep it current; this module
+recreates it from the base tables, or reports rows that differ from them.
+
+    python -m FundRaiseDAL.DAL_board check
+    python -m FundRaiseDAL.DAL_board rebuild
+"""
+
+import argparse
+import sys
+
+from FundRaiseDAL.DAL_core import get_db_connection, DB_ERRORS
+from FundRaiseDAL.DAL_metrics import instrumented
+from FundRaiseDAL.DAL_migrations import PUBLIC_BOARD_POPULATE_V8
+from FundRaiseDAL.DAL_retry import raise_if_retryable, retry_transient
+
+
+@instrumented
+@retry_transient
+def rebuild_public_board(session=None):
+    """Replaces every PublicBoard row in one transaction.
+
+    Returns (True, number of rows) or (False, error_message).
+    """
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM PublicBoard")
+            cursor.execute(PUBLIC_BOARD_POPULATE_V8)
+            cursor.execute("SELECT COUNT(*) FROM PublicBoard")
+            count = cursor.fetchone()[0]
+            conn.commit()
+            return True, count
+        except DB_ERRORS as err:
+            conn.rollback()
+            raise_if_retryable(err, session)
+            return False, str(err)
+        finally:
+            cursor.close()
+            conn.close()
+    return False, "Failed to connect to the database."
+
+
+@instrumented
+def check_public_board(session=None):
+    """Returns (True, fund_ids whose PublicBoard row is missing, extra or different)
+    or (False, error_message).
+    """
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+            SELECT f.fund_id, u_rec.name, COALESCE(s.service_name, ''), f.amount_needed, f.amount_raised, f.is_fully_funded
+            FROM FundsNeeded f
+            JOIN Users u_rec ON f.recipient_id = u_rec.user_id
+            JOIN Services s ON f.service_id = s.user_id
+            """)
+            expected = {row[0]: _normalise(row) for row in cursor.fetchall()}
+            cursor.execute("""
+            SELECT fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded
+            FROM PublicBoard
+            """)
+            actual = {row[0]: _normalise(row) for row in cursor.fetchall()}
+            return True, sorted(fund_id for fund_id in expected.keys() | actual.keys()
+                                if expected.get(fund_id) != actual.get(fund_id))
+        except DB_ERRORS as err:
+            return False, str(err)
+        finally:
+            cursor.close()
+            conn.close()
+    return False, "Failed to connect to the database."
+
+
+def _normalise(row):
+    fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded = row
+    return (recipient_name, service_name, round(float(amount_needed), 2), round(float(amount_raised), 2),
+            bool(is_fully_funded))
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the PublicBoard read model")
+    parser.add_argument('command', choices=['check', 'rebuild'])
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    args = parser.parse_args(argv)
+
+    from FundRaiseDAL import DAL_core
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+
+    if args.command == 'rebuild':
+        success, result = rebuild_public_board()
+        print(f"Rebuilt PublicBoard: {result} row(s)." if success else f"Rebuild failed: {result}")
+        return 0 if success else 1
+
+    success, result = check_public_board()
+    if not success:
+        print(f"Check failed: {result}")
+        return 1
+    if result:
+        print(f"{len(result)} fund(s) out of date: {', '.join(map(str, result[:20]))}"
+              f"{' ...' if len(result) > 20 else ''}")
+        return 1
+    print("PublicBoard matches the base tables.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""In-process read cache for reference data that rarely changes.
+
+Read functions are wrapped with @cached(name): results are kept per
+argument tuple for CACHE_CONFIG['ttl'] seconds, at most
+CACHE_CONFIG['max_entries'] per cache (least recently used dropped first).
+Calls made inside a Session bypass the cache, so a unit of work always
+reads its own transaction.
+
+Write paths call invalidate(name[, *args]) after they commit. Every
+invalidation bumps the cache's generation, and a value loaded while an
+invalidation happened is not stored, so a read racing with a write cannot
+put the old value back. Other processes see a change after at most ttl.
+
+stats() reports hits, misses, evictions, expirations and invalidations:
+
+    >>> DAL_cache.stats()['services']['hit_ratio']
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+
+CACHE_CONFIG = {
+    'enabled': True,
+    'ttl': 300,             # seconds
+    'max_entries': 1024,    # per cache
+}
+
+
+class TTLCache:
+    """LRU-bounded mapping whose entries expire ttl seconds after being stored."""
+
+    def __init__(self, name, ttl=None, max_entries=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key):
+        """Returns (True, value) on a hit, (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            return False, None
+
+    def put(self, key, value, generation=None):
+        """Stores value unless the cache was invalidated since generation was read."""
+        ttl = self.ttl if self.ttl is not None else CACHE_CONFIG['ttl']
+        max_entries = self.max_entries or CACHE_CONFIG['max_entries']
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, key=None):
+        """Drops one key, or every entry when key is None."""
+        with self._lock:
+            self.generation += 1
+            self._stats['invalidations'] += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(self._stats, size=len(self._entries),
+                        hit_ratio=round(self._stats['hits'] / lookups, 3) if lookups else 0.0)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+_caches = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name, ttl=None, max_entries=None):
+    """Returns the named cache, creating it on first use."""
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(name, ttl, max_entries)
+        return cache
+
+
+def cached(name, ttl=None, max_entries=None):
+    """Decorator caching a DAL read function's result per argument tuple.
+
+    Empty results (None, []) are not stored: they are also what the DAL
+    returns when the database is unreachable.
+    """
+    cache = get_cache(name, ttl, max_entries)
+
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            if not CACHE_CONFIG['enabled'] or bound.arguments.get('session') is not None:
+                return fn(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(value for param, value in bound.arguments.items() if param != 'session')
+            hit, value = cache.get(key)
+            if not hit:
+                generation = cache.generation
+                value = fn(*args, **kwargs)
+                if value:
+                    cache.put(key, value, generation)
+            # Callers get their own list; the cached one stays unchanged
+            return list(value) if isinstance(value, list) else value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorate
+
+
+def invalidate(name, *key):
+    """Drops the entry for key (the cached function's arguments) or the whole cache."""
+    get_cache(name).invalidate(key if key else None)
+
+
+def clear():
+    """Empties every cache."""
+    for cache in list(_caches.values()):
+        cache.invalidate()
+
+
+def stats():
+    """{cache name: counters} for every cache."""
+    return {name: cache.stats() for name, cache in list(_caches.items())}
+
+
+def reset_stats():
+    for cache in list(_caches.values()):
+        cache.reset_stats()
@@ -1,5 +1,15 @@
-import mysql.connector
 import hashlib
+import os
+import threading
+import time
+import atexit
+from collections import deque
+
+from .DAL_backend import DB_ERRORS, create_backend
+from .DAL_cache import invalidate
+from .DAL_events import publish, USER_UPDATED
+from .DAL_metrics import InstrumentedCursor, instrumented, record_connect
+from .DAL_retry import raise_if_retryable, retry_transient
 
 
 # ============================================================
@@ -12,23 +22,543 @@ DB_CONFIG = {
     'database': 'fundraising_db'
 }
 
+# Storage backend: 'mysql' uses DB_CONFIG, 'sqlite' uses SQLITE_CONFIG.
+# SQLite runs the full DAL without a server (tests, benchmarks, demos).
+DB_BACKEND = os.environ.get('FUNDRAISE_DB_BACKEND', 'mysql')
+
+SQLITE_CONFIG = {
+    'database': os.environ.get('FUNDRAISE_SQLITE_PATH', 'fundraising.db'),  # or ':memory:'
+    'timeout': 5.0,             # seconds to wait on a locked database
+}
+
+# Connection pool sizing. Connections are reused across DAL calls instead of
+# paying a TCP + auth handshake for every query.
+POOL_CONFIG = {
+    'min_size': 1,              # connections kept open even when idle
+    'max_size': 10,             # hard cap on open connections
+    'idle_timeout': 300,        # seconds before an idle connection is closed
+    'checkout_timeout': 5,      # seconds to wait for a free connection
+}
+
+
+# ============================================================
+# Connection Pool
+# ============================================================
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within checkout_timeout."""
+
+
+class PooledConnection:
+    """Thin wrapper around a raw connection borrowed from a ConnectionPool.
+
+    Every attribute is forwarded to the raw connection except close(), which
+    hands the connection back to the pool instead of closing the socket, and
+    cursor(), whose cursors report their timings to DAL_metrics.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._raw.cursor(*args, **kwargs))
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise AttributeError(f"connection already returned to the pool ({name})")
+        return getattr(self._raw, name)
+
 
-def get_db_connection():
-    """Establishes and returns a connection to the MySQL database."""
+class ConnectionPool:
+    """Bounded, thread-safe pool of database connections.
+
+    connect is a zero-argument callable returning a new raw connection and
+    is_alive a callable used as the liveness check on checkout.
+    """
+
+    def __init__(self, connect, is_alive, min_size=1, max_size=10,
+                 idle_timeout=300, checkout_timeout=5):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Invalid pool size: need 0 <= min_size <= max_size and max_size >= 1.")
+        self._connect = connect
+        self._is_alive = is_alive
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()    # (raw_connection, returned_at), newest on the right
+        self._size = 0          # open connections, idle + in use + being opened
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'evicted_idle': 0,
+            'discarded_dead': 0,
+            'timeouts': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+        }
+
+    def prewarm(self):
+        """Open connections up to min_size. Errors are left to the first checkout."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                return
+            with self._cond:
+                self._stats['created'] += 1
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Checks out a live connection wrapped in a PooledConnection.
+
+        Raises PoolTimeout if none is free within the timeout, or the driver
+        error if a new connection cannot be opened.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            raw = None
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed.")
+                self._evict_idle_locked()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {timeout}s "
+                            f"({self._in_use} in use, max_size={self.max_size})."
+                        )
+                    self._waiters += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+                if self._idle:
+                    raw, _ = self._idle.pop()
+                else:
+                    self._size += 1     # reserve a slot, connect outside the lock
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+            elif not self._check_alive(raw):
+                self._discard(raw, 'discarded_dead')
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use += 1
+                self._stats['checkouts'] += 1
+                self._stats['total_wait'] += waited
+                self._stats['max_wait'] = max(self._stats['max_wait'], waited)
+            return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Returns a raw connection to the pool, discarding it if it is broken."""
+        try:
+            # Never hand the next caller someone else's open transaction.
+            raw.rollback()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+            self._discard(raw, 'discarded_dead')
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            if not self._closed:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(raw, None)
+
+    def stats(self):
+        """Returns a snapshot dict of pool usage counters."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiters': self._waiters,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        checkouts = snapshot['checkouts']
+        snapshot['avg_wait'] = snapshot['total_wait'] / checkouts if checkouts else 0.0
+        return snapshot
+
+    def close(self):
+        """Closes every idle connection; in-use connections close on release."""
+        with self._cond:
+            self._closed = True
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for raw in idle:
+            self._discard(raw, None)
+
+    def _check_alive(self, raw):
+        try:
+            return bool(self._is_alive(raw))
+        except Exception:
+            return False
+
+    def _evict_idle_locked(self):
+        """Closes connections idle past idle_timeout, keeping min_size open."""
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        # Oldest connections sit on the left of the deque.
+        while self._idle and self._idle[0][1] < cutoff and self._size > self.min_size:
+            raw, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats['evicted_idle'] += 1
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def _discard(self, raw, counter):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            if counter:
+                self._stats[counter] += 1
+            self._cond.notify()
+
+
+_backend = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure_backend(name, **options):
+    """Switches the storage backend, e.g. configure_backend('sqlite', database=':memory:').
+
+    Options update DB_CONFIG (mysql) or SQLITE_CONFIG (sqlite). Open pooled
+    connections to the previous backend are closed.
+    """
+    global DB_BACKEND
+    reset_pool()
+    DB_BACKEND = name
+    if name == 'sqlite':
+        SQLITE_CONFIG.update(options)
+    elif name == 'mysql':
+        DB_CONFIG.update(options)
+    return get_backend()
+
+
+def get_backend():
+    """Returns the configured storage backend, creating it on first use."""
+    global _backend
+    with _pool_lock:
+        if _backend is None:
+            config = SQLITE_CONFIG if DB_BACKEND == 'sqlite' else DB_CONFIG
+            _backend = create_backend(DB_BACKEND, **config)
+        return _backend
+
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    backend = get_backend()
+    with _pool_lock:
+        if _pool is None:
+            config = dict(POOL_CONFIG)
+            config.update(backend.pool_overrides())
+            _pool = ConnectionPool(connect=backend.connect, is_alive=backend.is_alive, **config)
+            _pool.prewarm()
+        return _pool
+
+
+def reset_pool():
+    """Closes the pool and backend so the next checkout picks up new configuration."""
+    global _pool, _backend
+    with _pool_lock:
+        pool, _pool = _pool, None
+        backend, _backend = _backend, None
+    if pool is not None:
+        pool.close()
+    if backend is not None:
+        backend.close()
+
+
+def get_pool_stats():
+    """Returns pool statistics (in-use, idle, waiters, wait times, ...)."""
+    return get_pool().stats()
+
+
+atexit.register(reset_pool)
+
+
+def get_db_connection(session=None):
+    """Checks out a pooled connection to the configured database.
+
+    Callers use it exactly like a plain connection; close() returns it to the pool.
+    Inside a Session the session's shared connection is returned instead.
+    """
+    if session is not None:
+        return session.connection()
+    started = time.perf_counter()
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except mysql.connector.Error as err:
-        print(f"Error connecting to MySQL: {err}")
+        conn = get_pool().acquire()
+    except DB_ERRORS + (PoolTimeout,) as err:
+        record_connect(time.perf_counter() - started, failed=True)
+        print(f"Error connecting to the database: {err}")
         return None
+    record_connect(time.perf_counter() - started)
+    return conn
+
+
+# ============================================================
+# Unit of Work
+# ============================================================
+class _SessionConnection:
+    """Connection handed to DAL functions running inside a Session.
+
+    commit() and close() are deferred to the session; rollback() aborts the
+    whole unit of work.
+    """
+
+    def __init__(self, session, conn):
+        self._session = session
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._session.failed = True
+        self._conn.rollback()
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class Session:
+    """One connection and one transaction shared by several DAL calls.
+
+    Pass the session to DAL functions through their session argument:
+
+        with DAL_core.session() as s:
+            if not DAL_core.fetch_user_by_email(email, session=s):
+                DAL_core.create_user(name, email, password, role, session=s)
+
+    The work is committed once on exit. It is rolled back as a unit if any
+    DAL call failed, rollback() was called or an exception escaped.
+    Callbacks registered with after_commit() run once the commit succeeded
+    and the connection is back in the pool.
+    """
+
+    def __init__(self):
+        self.failed = False
+        self._conn = None
+        self._proxy = None
+        self._after_commit = []
+
+    def __enter__(self):
+        self._conn = get_db_connection()
+        if self._conn is not None:
+            self._proxy = _SessionConnection(self, self._conn)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._conn is None:
+            return False
+        committed = False
+        try:
+            if exc_type is None and not self.failed:
+                try:
+                    self._conn.commit()
+                    committed = True
+                except DB_ERRORS as err:
+                    self.failed = True
+                    print(f"Error committing transaction: {err}")
+                    self._conn.rollback()
+            else:
+                self._conn.rollback()
+        finally:
+            self._conn.close()
+            self._conn = self._proxy = None
+        callbacks, self._after_commit = self._after_commit, []
+        if committed:
+            for callback in callbacks:
+                callback()
+        return False
+
+    def connection(self):
+        """Returns the shared connection, or None if the database is unreachable."""
+        return self._proxy
+
+    def rollback(self):
+        """Marks the unit of work as failed so nothing is committed."""
+        self.failed = True
+
+    def after_commit(self, callback):
+        """Runs callback() after the session has committed; dropped on rollback."""
+        self._after_commit.append(callback)
+
+
+def session():
+    """Opens a unit of work; use as a context manager."""
+    return Session()
+
+
+def after_commit(session, callback):
+    """Runs callback() once the caller's work is committed.
+
+    DAL functions call this right after their own commit(), before or after
+    close(): without a session the callback runs immediately, inside one it
+    waits for the session to commit and return its connection.
+    """
+    if session is None:
+        callback()
+    else:
+        session.after_commit(callback)
+
+
+# ============================================================
+# Keyset Pagination
+# ============================================================
+# List queries accept after= (the sort key of the last row already shown)
+# and limit=. Pages are found by seeking on an indexed key instead of
+# OFFSET, so page N costs the same as page 1. With both left as None the
+# query returns every row, exactly as before.
+
+def keyset_clause(columns, after, descending):
+    """Returns (sql, params) selecting rows strictly past `after`.
+
+    columns is a tuple of column expressions forming the sort key and after
+    the matching tuple of values from the last row of the previous page.
+    """
+    if after is None:
+        return '', []
+    op = '<' if descending else '>'
+    # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y); spelled out for portability
+    terms = []
+    params = []
+    for i, column in enumerate(columns):
+        equal_prefix = [f"{c} = %s" for c in columns[:i]]
+        terms.append('(' + ' AND '.join(equal_prefix + [f"{column} {op} %s"]) + ')')
+        params.extend(list(after[:i]) + [after[i]])
+    return '(' + ' OR '.join(terms) + ')', params
+
+
+def limit_clause(limit):
+    """Returns (sql, params) for an optional LIMIT."""
+    if limit is None:
+        return '', []
+    return 'LIMIT %s', [int(limit)]
+
+
+# ============================================================
+# Whitelisted Sorting and Filtering
+# ============================================================
+# List queries take sort= and filters= by name only. Each module declares
+# its allowed names: sorts map to (column, row position, is_text) and
+# filters to a function building (sql, params) from the user's value, so no
+# user input ever becomes SQL text. Every sort is paired with the primary
+# key as tie-breaker and keyset-paged on (sort column, primary key); the
+# matching indexes are created by migration 7.
+
+def text_column(column):
+    """Column expression for case-insensitive sorting and prefix search.
+
+    MySQL's default collations already ignore case; on SQLite the NOCASE
+    indexes of migration 7 only serve expressions using the same collation.
+    """
+    return f"{column} COLLATE NOCASE" if get_backend().name == 'sqlite' else column
+
+
+def like_prefix(text):
+    """LIKE pattern (with ESCAPE '!') matching values that start with text."""
+    return text.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+
+
+# Fund states for the 'status' filter of FundsNeeded queries (aliased f)
+FUND_STATUS_FILTERS = {
+    'pending': "f.is_verified = FALSE",
+    'active': "f.is_verified = TRUE AND f.is_fully_funded = FALSE",
+    'funded': "f.is_fully_funded = TRUE",
+}
+
+
+def fund_status_filter(value):
+    if value not in FUND_STATUS_FILTERS:
+        raise ValueError(f"Unknown fund status: {value!r}")
+    return FUND_STATUS_FILTERS[value], []
+
+
+def sort_clause(sorts, sort, default):
+    """Returns the column expression of a whitelisted sort name (default if None)."""
+    name = default if sort is None else sort
+    if name not in sorts:
+        raise ValueError(f"Unknown sort: {name!r}")
+    column, _, is_text = sorts[name]
+    return text_column(column) if is_text else column
+
+
+def filter_clause(filters, allowed):
+    """Returns (list of sql terms, params) for filters {name: value}.
+
+    Names must be keys of allowed; None and blank values are skipped.
+    """
+    terms, params = [], []
+    for name, value in (filters or {}).items():
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+        if name not in allowed:
+            raise ValueError(f"Unknown filter: {name!r}")
+        sql, values = allowed[name](value)
+        terms.append(sql)
+        params.extend(values)
+    return terms, params
 
 
 # ============================================================
 # Database Shared Query Functions
 # ============================================================
-def fetch_user_by_email(email):
+@instrumented
+def fetch_user_by_email(email, session=None):
     """Returns (user_id, user_type, password_hash) for the given email or None."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         query = "SELECT user_id, user_type, password_hash FROM Users WHERE email = %s"
@@ -40,9 +570,10 @@ def fetch_user_by_email(email):
     return None
 
 
-def fetch_user_by_id(user_id):
+@instrumented
+def fetch_user_by_id(user_id, session=None):
     """Returns the user row for a given user_id or None."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         query = "SELECT user_id, name, email, user_type FROM Users WHERE user_id = %s"
@@ -54,12 +585,14 @@ def fetch_user_by_id(user_id):
     return None
 
 
-def create_user(name, email, password, user_type):
+@instrumented
+@retry_transient
+def create_user(name, email, password, user_type, session=None):
     """Creates a new user. Returns (True, user_id) or (False, error_message).
 
     The password is hashed with SHA-256 before storing.
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -70,21 +603,26 @@ def create_user(name, email, password, user_type):
             user_id = cursor.lastrowid
             cursor.close()
             conn.close()
+            if user_type == 'Service':
+                after_commit(session, lambda: invalidate('services'))
             return True, user_id
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
+            conn.rollback()
             cursor.close()
             conn.close()
+            raise_if_retryable(err, session)
             return False, str(err)
     return False, "Failed to connect to the database."
 
 
-def authenticate_user(email, password):
+@instrumented
+def authenticate_user(email, password, session=None):
     """Checks credentials and returns (user_id, user_type) if valid.
 
     This function fetches the stored password_hash for the user and
     compares it against the provided password after hashing with SHA-256.
     """
-    row = fetch_user_by_email(email)
+    row = fetch_user_by_email(email, session=session)
     if not row:
         return (None, None)
 
@@ -97,25 +635,60 @@ def authenticate_user(email, password):
     return (None, None)
 
 
-def fetch_funds_data():
-    """Fetches key information about all FundsNeeded for the Main Window."""
-    conn = get_db_connection()
+# name -> (column, row position, is_text)
+BOARD_SORTS = {
+    'fund_id': ('fund_id', 0, False),
+    'recipient': ('recipient_name', 1, True),
+    'service': ('service_name', 2, True),
+    'needed': ('amount_needed', 3, False),
+    'raised': ('amount_raised', 4, False),
+}
+BOARD_FILTERS = {
+    # Recipient or service name starts with the text
+    'name': lambda value: (
+        f"({text_column('recipient_name')} LIKE %s ESCAPE '!' OR {text_column('service_name')} LIKE %s ESCAPE '!')",
+        [like_prefix(value.strip())] * 2,
+    ),
+    'funded': lambda value: ("is_fully_funded = %s", [bool(value)]),
+}
+
+
+@instrumented
+def fetch_funds_data(after=None, limit=None, sort=None, descending=True, filters=None, session=None):
+    """Fetches key information about all FundsNeeded for the Main Window.
+
+    Reads the PublicBoard read model (see DAL_board). Sorted by one of
+    BOARD_SORTS (default: fund_id, newest first) and narrowed by
+    BOARD_FILTERS. Pass after=fund_id of the last row shown (or
+    (sort value, fund_id) when sorting by another column) for the next page.
+    """
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
-        query = """
+        column = sort_clause(BOARD_SORTS, sort, 'fund_id')
+        keys = ('fund_id',) if column == 'fund_id' else (column, 'fund_id')
+        if after is not None and not isinstance(after, tuple):
+            after = (after,)
+        seek, params = keyset_clause(keys, after, descending=descending)
+        where, filter_params = filter_clause(filters, BOARD_FILTERS)
+        if seek:
+            where.append(seek)
+        limit_sql, limit_params = limit_clause(limit)
+        direction = 'DESC' if descending else 'ASC'
+        query = f"""
         SELECT
-            f.fund_id,
-            u_rec.name AS Recipient,
-            s.service_name AS Service,
-            f.amount_needed,
-            f.amount_raised,
-            f.is_fully_funded
-        FROM FundsNeeded f
-        JOIN Users u_rec ON f.recipient_id = u_rec.user_id
-        JOIN Services s ON f.service_id = s.user_id
-        ORDER BY f.fund_id DESC;
+            fund_id,
+            recipient_name AS Recipient,
+            service_name AS Service,
+            amount_needed,
+            amount_raised,
+            is_fully_funded
+        FROM PublicBoard
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY {', '.join(f'{key} {direction}' for key in keys)}
+        {limit_sql};
         """
-        cursor.execute(query)
+        cursor.execute(query, tuple(filter_params + params + limit_params))
         data = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -123,12 +696,59 @@ def fetch_funds_data():
     return []
 
 
-def fetch_donations_data():
-    """Fetches key information about recent Donations for the Main Window."""
-    conn = get_db_connection()
+# Largest fund_ids list fetch_fund_details sends in one IN (...)
+DETAIL_CHUNK_SIZE = 500
+
+
+@instrumented
+def fetch_fund_details(fund_ids, recipient_id=None, service_id=None, session=None):
+    """Fetches the detail columns the fund lists leave out, for the given funds.
+
+    Returns list of (fund_id, proof_of_charge). Pass recipient_id or
+    service_id to return only the funds of that recipient or service.
+    Unknown fund_ids are left out.
+    """
+    fund_ids = list(dict.fromkeys(fund_ids))
+    if not fund_ids:
+        return []
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
-        query = """
+        owner_sql, owner_params = '', []
+        if recipient_id is not None:
+            owner_sql, owner_params = 'AND recipient_id = %s', [recipient_id]
+        elif service_id is not None:
+            owner_sql, owner_params = 'AND service_id = %s', [service_id]
+        data = []
+        for start in range(0, len(fund_ids), DETAIL_CHUNK_SIZE):
+            chunk = fund_ids[start:start + DETAIL_CHUNK_SIZE]
+            cursor.execute(f"""
+            SELECT fund_id, proof_of_charge
+            FROM FundsNeeded
+            WHERE fund_id IN ({', '.join(['%s'] * len(chunk))}) {owner_sql}
+            """, tuple(chunk + owner_params))
+            data += cursor.fetchall()
+        cursor.close()
+        conn.close()
+        return data
+    return []
+
+
+@instrumented
+def fetch_donations_since(after_donation_id=None, limit=10, session=None):
+    """Fetches the newest donations with donation_id > after_donation_id.
+
+    Returns at most limit rows of (donation_id, fund_id, Donor, donation_amount,
+    donation_date), newest first; after_donation_id=None returns the newest
+    rows. donation_id only grows, so the first row's id is the high-water
+    mark for the next call, and a call with nothing new reads no rows.
+    """
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        seek, params = keyset_clause(('d.donation_id',), None if after_donation_id is None else (after_donation_id,),
+                                     descending=False)
+        query = f"""
         SELECT
             d.donation_id,
             d.fund_id,
@@ -138,10 +758,11 @@ def fetch_donations_data():
         FROM Donations d
         LEFT JOIN Donors r ON d.donor_id = r.user_id
         LEFT JOIN Users u_don ON r.user_id = u_don.user_id
-        ORDER BY d.donation_date DESC
-        LIMIT 10;
+        {'WHERE ' + seek if seek else ''}
+        ORDER BY d.donation_id DESC
+        LIMIT %s;
         """
-        cursor.execute(query)
+        cursor.execute(query, tuple(params + [limit]))
         data = cursor.fetchall()
         cursor.close()
         conn.close()
@@ -149,9 +770,11 @@ def fetch_donations_data():
     return []
 
 
-def update_user_profile(user_id, name=None, phone_number=None, address=None):
+@instrumented
+@retry_transient
+def update_user_profile(user_id, name=None, phone_number=None, address=None, session=None):
     """Update basic fields in Users table for a user_id."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -174,9 +797,14 @@ def update_user_profile(user_id, name=None, phone_number=None, address=None):
             query = f"UPDATE Users SET {', '.join(fields)} WHERE user_id = %s"
             cursor.execute(query, tuple(params))
             conn.commit()
+            after_commit(session, lambda: publish(USER_UPDATED, user_id=user_id))
+            if name is not None:
+                # The services list shows Users.name
+                after_commit(session, lambda: invalidate('services'))
             return True, 'Success'
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -0,0 +1,217 @@
+"""Running totals of FundsNeeded: single-row deltas and sharded counters.
+
+By default every donation adds its amount straight to
+FundsNeeded.amount_raised, so all donations to one fund queue on that row's
+lock. In sharded-counter mode (COUNTER_CONFIG['enabled'], or
+FUNDRAISE_SHARDED_COUNTERS=1) a donation adds to one of COUNTER_CONFIG['shards']
+rows of FundCounterShards instead, picked at random, and a fold step later
+moves the shard amounts into amount_raised.
+
+The fund's true total is amount_raised plus its unfolded shards. A sharded
+donation re-reads that total inside its own transaction and, once it
+reaches amount_needed, folds the fund there, which sets is_fully_funded
+under the fund's row lock before the donation commits. Concurrent
+donations that each saw the total below the target are caught by
+settle_fully_funded() after they commit: the last one to commit sees all
+of them. Writes that compare against amount_raised (amount_needed edits)
+fold the fund first. Scheduled folds keep the displayed amount_raised
+current:
+
+    python -m FundRaiseDAL.DAL_counters fold
+"""
+
+import argparse
+import os
+import random
+import sys
+from decimal import Decimal
+
+from FundRaiseDAL.DAL_core import get_db_connection, get_backend, DB_ERRORS, after_commit
+from FundRaiseDAL.DAL_events import publish, FUND_TOTALS_CHANGED
+from FundRaiseDAL.DAL_metrics import instrumented
+from FundRaiseDAL.DAL_retry import raise_if_retryable, retry_transient
+
+
+COUNTER_CONFIG = {
+    'enabled': os.environ.get('FUNDRAISE_SHARDED_COUNTERS') == '1',
+    'shards': 16,
+}
+
+SHARD_UPSERT = {
+    'mysql': """
+        INSERT INTO FundCounterShards (fund_id, shard_id, amount) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE amount = amount + VALUES(amount)
+        """,
+    'sqlite': """
+        INSERT INTO FundCounterShards (fund_id, shard_id, amount) VALUES (%s, %s, %s)
+        ON CONFLICT (fund_id, shard_id) DO UPDATE SET amount = amount + excluded.amount
+        """,
+}
+
+
+def _add_to_fund(cursor, fund_id, delta):
+    # is_fully_funded comes first: MySQL evaluates SET left to right, so an
+    # assignment after amount_raised would already see the new total.
+    cursor.execute("""
+    UPDATE FundsNeeded SET
+        is_fully_funded = CASE WHEN amount_raised + %s >= amount_needed THEN TRUE ELSE FALSE END,
+        amount_raised = amount_raised + %s
+    WHERE fund_id = %s
+    """, (delta, delta, fund_id))
+
+
+def apply_fund_delta(cursor, fund_id, delta):
+    """Adds delta to a fund's amount_raised and re-evaluates is_fully_funded.
+
+    Runs on the caller's cursor so it commits or rolls back together with the
+    Donations change that caused it. In sharded mode the fund's shards are
+    folded first so is_fully_funded is judged on the full total.
+    """
+    sync_fund_total(cursor, fund_id)
+    _add_to_fund(cursor, fund_id, delta)
+
+
+def sync_fund_total(cursor, fund_id):
+    """In sharded mode, folds the fund's shards on the caller's cursor so its
+    amount_raised is the full total before a write compares against it.
+    """
+    if COUNTER_CONFIG['enabled']:
+        fold_on_cursor(cursor, [fund_id])
+
+
+def add_to_shard(cursor, fund_id, amount):
+    """Adds amount to a random counter shard of the fund (sharded mode)."""
+    shard_id = random.randrange(COUNTER_CONFIG['shards'])
+    cursor.execute(SHARD_UPSERT[get_backend().name], (fund_id, shard_id, amount))
+
+
+def fold_on_cursor(cursor, fund_ids=None):
+    """Moves shard amounts into amount_raised on the caller's cursor.
+
+    fund_ids=None folds every fund. Each shard is decreased by the amount
+    read rather than reset to zero, so increments that land meanwhile are
+    kept for the next fold. Returns {fund_id: amount folded}.
+    """
+    if fund_ids is None:
+        cursor.execute("SELECT fund_id, shard_id, amount FROM FundCounterShards WHERE amount <> 0")
+    elif not fund_ids:
+        return {}
+    else:
+        placeholders = ', '.join(['%s'] * len(fund_ids))
+        cursor.execute(
+            f"SELECT fund_id, shard_id, amount FROM FundCounterShards WHERE fund_id IN ({placeholders}) AND amount <> 0",
+            tuple(fund_ids)
+        )
+    shards = cursor.fetchall()
+    if not shards:
+        return {}
+
+    cursor.executemany(
+        "UPDATE FundCounterShards SET amount = amount - %s WHERE fund_id = %s AND shard_id = %s",
+        [(amount, fund_id, shard_id) for fund_id, shard_id, amount in shards]
+    )
+    folded = {}
+    for fund_id, _, amount in shards:
+        folded[fund_id] = folded.get(fund_id, 0) + amount
+    for fund_id, total in folded.items():
+        _add_to_fund(cursor, fund_id, total)
+    return folded
+
+
+@instrumented
+@retry_transient
+def fold_counters(fund_ids=None, session=None):
+    """Folds the counter shards of fund_ids (default: all funds) in one transaction.
+
+    Returns (True, {fund_id: amount folded}) or (False, error_message).
+    """
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            folded = fold_on_cursor(cursor, fund_ids)
+            conn.commit()
+            if folded:
+                after_commit(session, lambda: publish(FUND_TOTALS_CHANGED, fund_ids=sorted(folded)))
+            return True, folded
+        except DB_ERRORS as err:
+            conn.rollback()
+            raise_if_retryable(err, session)
+            return False, str(err)
+        finally:
+            cursor.close()
+            conn.close()
+    return False, "Failed to connect to the database."
+
+
+def _reaches_target(cursor, fund_id):
+    """True if the fund is not marked fully funded but amount_raised plus its shards reaches amount_needed."""
+    cursor.execute("""
+    SELECT f.amount_needed, f.amount_raised, f.is_fully_funded,
+           (SELECT COALESCE(SUM(c.amount), 0) FROM FundCounterShards c WHERE c.fund_id = f.fund_id)
+    FROM FundsNeeded f
+    WHERE f.fund_id = %s
+    """, (fund_id,))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    amount_needed, amount_raised, is_fully_funded, unfolded = row
+    return not is_fully_funded and Decimal(str(amount_raised)) + Decimal(str(unfolded)) >= Decimal(str(amount_needed))
+
+
+def settle_on_cursor(cursor, fund_id):
+    """In-transaction check after a sharded donation: folds the fund (setting
+    is_fully_funded under its row lock) once its total reaches amount_needed.
+    Returns True if it folded.
+    """
+    if not _reaches_target(cursor, fund_id):
+        return False
+    fold_on_cursor(cursor, [fund_id])
+    return True
+
+
+@instrumented
+def settle_fully_funded(fund_id):
+    """Post-commit check after a sharded donation, for concurrent donations
+    that crossed the target together. Returns True if a fold was needed.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return False
+    cursor = conn.cursor()
+    try:
+        crossed = _reaches_target(cursor, fund_id)
+    finally:
+        cursor.close()
+        conn.close()
+    if not crossed:
+        return False
+    success, _ = fold_counters([fund_id])
+    return success
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold sharded donation counters into FundsNeeded")
+    parser.add_argument('command', choices=['fold'])
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    args = parser.parse_args(argv)
+
+    from FundRaiseDAL import DAL_core
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+
+    success, result = fold_counters()
+    if not success:
+        print(f"Fold failed: {result}")
+        return 1
+    print(f"Folded {len(result)} fund(s), {sum(result.values(), 0):.2f} in total.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,31 @@
-from .DAL_core import get_db_connection
-import mysql.connector
+from decimal import Decimal, ROUND_HALF_UP
 
+from .DAL_core import (get_db_connection, DB_ERRORS, DETAIL_CHUNK_SIZE, after_commit, filter_clause, keyset_clause,
+                       limit_clause, sort_clause)
+from .DAL_metrics import instrumented
+from .DAL_retry import raise_if_retryable, retry_transient
+from .DAL_cache import cached, invalidate
+from .DAL_events import (publish, subscribe, DONATIONS_CHANGED, FUND_DELETED, FUND_TOTALS_CHANGED,
+                         FUND_UPDATED, FUND_VERIFIED, USER_UPDATED)
+from .DAL_counters import COUNTER_CONFIG, add_to_shard, apply_fund_delta, settle_fully_funded, settle_on_cursor
 
-def fetch_active_funds():
+
+# Committed changes that can add, remove or alter a row of fetch_active_funds.
+# New funds are unverified, so FUND_CREATED is not one of them.
+ACTIVE_FUNDS_EVENTS = (FUND_VERIFIED, FUND_UPDATED, FUND_DELETED, DONATIONS_CHANGED, FUND_TOTALS_CHANGED,
+                       USER_UPDATED)
+
+
+# Event-invalidated; the TTL only bounds how long other processes' writes stay unseen
+@cached('active_funds', ttl=60)
+@instrumented
+def fetch_active_funds(session=None):
     """Fetches active, unfulfilled funds for the Donor dashboard.
 
     Returns list of tuples:
     (fund_id, fund_description, amount_needed, amount_raised, recipient_name)
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -35,34 +52,133 @@ def fetch_active_funds():
     return []
 
 
-def execute_donation_transaction(fund_id, donor_id_to_insert, donation_amount):
-    """Executes the two-step transaction (INSERT Donation and UPDATE FundsNeeded)."""
-    conn = get_db_connection()
+def _invalidate_active_funds(event, payload):
+    invalidate('active_funds')
+
+
+for _event in ACTIVE_FUNDS_EVENTS:
+    subscribe(_event, _invalidate_active_funds)
+
+
+def _money(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _replay_donation(cursor, idempotency_key, fund_id, donor_id, donation_amount):
+    """Result of the donation already recorded under idempotency_key, or None."""
+    cursor.execute(
+        "SELECT fund_id, donor_id, donation_amount FROM Donations WHERE idempotency_key = %s",
+        (idempotency_key,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    if (row[0], row[1], _money(row[2])) != (fund_id, donor_id, _money(donation_amount).quantize(Decimal('0.01'), ROUND_HALF_UP)):
+        return False, "Idempotency key was already used for a different donation."
+    return True, "Success"
+
+
+@instrumented
+@retry_transient
+def execute_donation_transaction(fund_id, donor_id_to_insert, donation_amount, idempotency_key=None, session=None):
+    """Executes the two-step transaction (INSERT Donation and UPDATE FundsNeeded).
+
+    With an idempotency_key, a repeated call with the same key returns the
+    original result without recording the donation again.
+    """
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
+            if idempotency_key is not None:
+                replayed = _replay_donation(cursor, idempotency_key, fund_id, donor_id_to_insert, donation_amount)
+                if replayed is not None:
+                    return replayed
+
             # 1. Insert into Donations table
             donation_query = """
             INSERT INTO Donations 
-            (fund_id, donor_id, donation_amount, payment_status) 
-            VALUES (%s, %s, %s, 'Completed')
-            """
-            cursor.execute(donation_query, (fund_id, donor_id_to_insert, donation_amount))
-
-            # 2. Update FundsNeeded table
-            update_fund_query = """
-            UPDATE FundsNeeded SET 
-                amount_raised = amount_raised + %s, 
-                is_fully_funded = IF((amount_raised + %s) >= amount_needed, TRUE, FALSE)
-            WHERE fund_id = %s
+            (fund_id, donor_id, donation_amount, payment_status, idempotency_key) 
+            VALUES (%s, %s, %s, 'Completed', %s)
             """
-            cursor.execute(update_fund_query, (donation_amount, donation_amount, fund_id))
+            cursor.execute(donation_query, (fund_id, donor_id_to_insert, donation_amount, idempotency_key))
+
+            # 2. Update FundsNeeded table, or one of its counter shards
+            sharded = COUNTER_CONFIG['enabled']
+            settled = False
+            if sharded:
+                add_to_shard(cursor, fund_id, donation_amount)
+                # Flips is_fully_funded in this transaction if this donation reaches the target
+                settled = settle_on_cursor(cursor, fund_id)
+            else:
+                apply_fund_delta(cursor, fund_id, donation_amount)
 
             conn.commit()
-            return True, "Success"
+        except DB_ERRORS as err:
+            conn.rollback()
+            raise_if_retryable(err, session)
+            if idempotency_key is not None:
+                # A concurrent request with the same key won the unique index
+                replayed = _replay_donation(cursor, idempotency_key, fund_id, donor_id_to_insert, donation_amount)
+                if replayed is not None:
+                    return replayed
+            return False, str(err)
+        finally:
+            cursor.close()
+            conn.close()
+
+        if sharded and not settled:
+            # Donations committing concurrently may cross the target together; recheck once committed
+            after_commit(session, lambda: settle_fully_funded(fund_id))
+        after_commit(session, lambda: publish(DONATIONS_CHANGED, fund_ids=[fund_id]))
+        return True, "Success"
+    return False, "Failed to connect to the database."
 
-        except mysql.connector.Error as err:
+
+@instrumented
+@retry_transient
+def execute_donation_batch(donations, session=None):
+    """Records many donations in one transaction.
+
+    donations is a sequence of (fund_id, donor_id, donation_amount,
+    idempotency_key) tuples. They are inserted with a single executemany and
+    each affected fund gets one amount_raised update for its summed amount.
+    Donations whose idempotency_key is already recorded are skipped.
+    Returns (True, number inserted) or (False, error_message).
+    """
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            keys = [key for _, _, _, key in donations if key is not None]
+            done = set()
+            if keys:
+                cursor.execute(
+                    f"SELECT idempotency_key FROM Donations WHERE idempotency_key IN ({', '.join(['%s'] * len(keys))})",
+                    tuple(keys)
+                )
+                done = {row[0] for row in cursor.fetchall()}
+            todo = [donation for donation in donations if donation[3] is None or donation[3] not in done]
+            if todo:
+                cursor.executemany("""
+                INSERT INTO Donations
+                (fund_id, donor_id, donation_amount, payment_status, idempotency_key)
+                VALUES (%s, %s, %s, 'Completed', %s)
+                """, todo)
+
+                totals = {}
+                for fund_id, _, donation_amount, _ in todo:
+                    totals[fund_id] = totals.get(fund_id, 0) + _money(donation_amount)
+                # Funds in a fixed order so concurrent batches lock rows in the same order
+                for fund_id in sorted(totals):
+                    apply_fund_delta(cursor, fund_id, totals[fund_id])
+            conn.commit()
+            if todo:
+                after_commit(session, lambda: publish(DONATIONS_CHANGED, fund_ids=sorted(totals)))
+            return True, len(todo)
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -70,15 +186,63 @@ def execute_donation_transaction(fund_id, donor_id_to_insert, donation_amount):
     return False, "Failed to connect to the database."
 
 
-def fetch_donations_for_donor(donor_user_id):
+@instrumented
+def fetch_recorded_idempotency_keys(keys, session=None):
+    """Returns the subset of keys already recorded on a donation."""
+    keys = list(keys)
+    conn = get_db_connection(session)
+    if conn:
+        cursor = conn.cursor()
+        try:
+            done = set()
+            for start in range(0, len(keys), DETAIL_CHUNK_SIZE):
+                chunk = keys[start:start + DETAIL_CHUNK_SIZE]
+                cursor.execute(
+                    f"SELECT idempotency_key FROM Donations WHERE idempotency_key IN ({', '.join(['%s'] * len(chunk))})",
+                    tuple(chunk)
+                )
+                done.update(row[0] for row in cursor.fetchall())
+            return done
+        finally:
+            cursor.close()
+            conn.close()
+    return set()
+
+
+# name -> (column, row position, is_text). A donor's donations are found through
+# ix_donations_donor_date; the database sorts that short list.
+DONOR_DONATION_SORTS = {
+    'date': ('d.donation_date', 4, False),
+    'amount': ('d.donation_amount', 2, False),
+    'fund_id': ('d.fund_id', 1, False),
+}
+DONOR_DONATION_FILTERS = {
+    'fund_id': lambda value: ("d.fund_id = %s", [int(value)]),
+    'status': lambda value: ("d.payment_status = %s", [value]),
+}
+
+
+@instrumented
+def fetch_donations_for_donor(donor_user_id, after=None, limit=None, sort=None, descending=True, filters=None,
+                              session=None):
     """Returns this donor's donations as a list of tuples:
     (donation_id, fund_id, donation_amount, payment_status, donation_date)
+
+    Sorted by one of DONOR_DONATION_SORTS (default: date, newest first);
+    pass after=(sort value, donation_id) of the last row shown to get the
+    next page.
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
-            query = """
+            keys = (sort_clause(DONOR_DONATION_SORTS, sort, 'date'), 'd.donation_id')
+            seek, params = keyset_clause(keys, after, descending=descending)
+            where, filter_params = filter_clause(filters, DONOR_DONATION_FILTERS)
+            if seek:
+                where.append(seek)
+            limit_sql, limit_params = limit_clause(limit)
+            query = f"""
             SELECT
                 d.donation_id,
                 d.fund_id,
@@ -87,9 +251,11 @@ def fetch_donations_for_donor(donor_user_id):
                 d.donation_date
             FROM Donations d
             WHERE d.donor_id = %s
-            ORDER BY d.donation_date DESC;
+            {''.join(' AND ' + term for term in where)}
+            ORDER BY {', '.join(f"{key} {'DESC' if descending else 'ASC'}" for key in keys)}
+            {limit_sql};
             """
-            cursor.execute(query, (donor_user_id,))
+            cursor.execute(query, tuple([donor_user_id] + filter_params + params + limit_params))
             rows = cursor.fetchall()
             return rows
         finally:
@@ -98,9 +264,11 @@ def fetch_donations_for_donor(donor_user_id):
     return []
 
 
-def update_donation_amount(donor_user_id, donation_id, new_amount):
+@instrumented
+@retry_transient
+def update_donation_amount(donor_user_id, donation_id, new_amount, session=None):
     """Update this donor's donation amount."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -113,19 +281,28 @@ def update_donation_amount(donor_user_id, donation_id, new_amount):
             row = cursor.fetchone()
             if not row:
                 return False, "Donation not found or does not belong to this donor."
+            old_amount, fund_id = row
 
-            # Update donation amount
+            # Update donation amount, unless someone changed it since we read it
             cursor.execute(
                 "UPDATE Donations SET donation_amount = %s "
-                "WHERE donation_id = %s AND donor_id = %s",
-                (new_amount, donation_id, donor_user_id)
+                "WHERE donation_id = %s AND donor_id = %s AND ROUND(donation_amount, 2) = ROUND(%s, 2)",
+                (new_amount, donation_id, donor_user_id, old_amount)
             )
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return False, "Donation was changed by another request; please reload and try again."
+
+            # Move the fund total by the difference
+            apply_fund_delta(cursor, fund_id, _money(new_amount) - _money(old_amount))
 
             conn.commit()
+            after_commit(session, lambda: publish(DONATIONS_CHANGED, fund_ids=[fund_id]))
             return True, "Success"
 
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -133,9 +310,11 @@ def update_donation_amount(donor_user_id, donation_id, new_amount):
     return False, "Failed to connect to the database."
 
 
-def delete_donation_record(donor_user_id, donation_id):
+@instrumented
+@retry_transient
+def delete_donation_record(donor_user_id, donation_id, session=None):
     """Delete this donor's donation."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -148,18 +327,28 @@ def delete_donation_record(donor_user_id, donation_id):
             row = cursor.fetchone()
             if not row:
                 return False, "Donation not found or does not belong to this donor."
+            old_amount, fund_id = row
 
-            # Delete the donation
+            # Delete the donation, unless someone changed it since we read it
             cursor.execute(
-                "DELETE FROM Donations WHERE donation_id = %s AND donor_id = %s",
-                (donation_id, donor_user_id)
+                "DELETE FROM Donations "
+                "WHERE donation_id = %s AND donor_id = %s AND ROUND(donation_amount, 2) = ROUND(%s, 2)",
+                (donation_id, donor_user_id, old_amount)
             )
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return False, "Donation was changed by another request; please reload and try again."
+
+            # Take the amount back off the fund total
+            apply_fund_delta(cursor, fund_id, -_money(old_amount))
 
             conn.commit()
+            after_commit(session, lambda: publish(DONATIONS_CHANGED, fund_ids=[fund_id]))
             return True, "Success"
 
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -167,12 +356,13 @@ def delete_donation_record(donor_user_id, donation_id):
     return False, "Failed to connect to the database."
 
 
-def fetch_donor_profile(user_id):
+@instrumented
+def fetch_donor_profile(user_id, session=None):
     """Return donor-specific profile row or None.
 
     Expected return: (user_id, is_anonymous_default, join_date)
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -185,9 +375,11 @@ def fetch_donor_profile(user_id):
     return None
 
 
-def upsert_donor_profile(user_id, is_anonymous_default=False):
+@instrumented
+@retry_transient
+def upsert_donor_profile(user_id, is_anonymous_default=False, session=None):
     """Insert or update donor profile row."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -198,9 +390,13 @@ def upsert_donor_profile(user_id, is_anonymous_default=False):
             else:
                 cursor.execute("INSERT INTO Donors (user_id, is_anonymous_default) VALUES (%s, %s)", (user_id, 1 if is_anonymous_default else 0))
             conn.commit()
+            if not exists:
+                # Donor names on the public board come from the Donors row
+                after_commit(session, lambda: publish(USER_UPDATED, user_id=user_id))
             return True, 'Success'
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -0,0 +1,60 @@
+"""In-process notifications of committed data changes.
+
+DAL write functions publish an event once their change is committed (with
+DAL_core.after_commit, so inside a Session only when the session commits).
+Caches and other derived data subscribe to the events that can change
+them instead of expiring on a timer:
+
+    subscribe(FUND_VERIFIED, lambda event, payload: ...)
+
+Handlers run synchronously in the writing thread; an exception in one is
+logged and does not affect the write or the other handlers. Events are
+not seen by other processes.
+"""
+
+import logging
+import threading
+
+
+# payload: fund_ids
+FUND_VERIFIED = 'fund_verified'
+FUND_CREATED = 'fund_created'
+FUND_UPDATED = 'fund_updated'
+FUND_DELETED = 'fund_deleted'
+# Donations recorded, edited or deleted; covers the amount_raised and
+# is_fully_funded changes they cause. payload: fund_ids
+DONATIONS_CHANGED = 'donations_changed'
+# amount_raised / is_fully_funded rewritten without a donation change
+# (counter folds, reconciliation repairs). payload: fund_ids
+FUND_TOTALS_CHANGED = 'fund_totals_changed'
+# payload: user_id
+USER_UPDATED = 'user_updated'
+
+logger = logging.getLogger('FundRaiseDAL.events')
+
+_subscribers = {}
+_lock = threading.Lock()
+
+
+def subscribe(event, handler):
+    """Calls handler(event, payload) after every committed event of this kind."""
+    with _lock:
+        _subscribers.setdefault(event, []).append(handler)
+
+
+def unsubscribe(event, handler):
+    with _lock:
+        handlers = _subscribers.get(event, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+
+def publish(event, **payload):
+    """Delivers an event to its subscribers. Call only after the commit."""
+    with _lock:
+        handlers = list(_subscribers.get(event, ()))
+    for handler in handlers:
+        try:
+            handler(event, payload)
+        except Exception:
+            logger.exception("Handler %r failed for event %s", handler, event)
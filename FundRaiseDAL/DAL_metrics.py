@@ -0,0 +1,275 @@
+"""Per-query instrumentation for the DAL.
+
+Every public DAL function is wrapped with @instrumented. While it runs, the
+pool checkout (connect), each cursor.execute() and each fetch are timed and
+attributed to it, together with row counts and driver errors, which
+otherwise disappear into "str(err)" return values.
+
+Statements slower than METRICS_CONFIG['slow_query_ms'] are logged on the
+'FundRaiseDAL.slow_query' logger with a digest of the SQL (literals and
+whitespace normalised) and the shape of its parameters, never their values.
+
+snapshot() returns everything recorded so far as plain dicts, e.g.
+
+    >>> DAL_metrics.snapshot()['DAL_admin.fetch_all_funds']['execute']['p95_ms']
+"""
+
+import functools
+import hashlib
+import logging
+import re
+import threading
+import time
+
+
+METRICS_CONFIG = {
+    'enabled': True,
+    'slow_query_ms': 200,       # log statements at or above this latency
+}
+
+slow_query_log = logging.getLogger('FundRaiseDAL.slow_query')
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= wanted:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max, 3),
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'p99_ms': round(self.percentile(0.99), 3),
+            'buckets': {('inf' if b == float('inf') else b): n for b, n in zip(BUCKETS_MS, self.counts) if n},
+        }
+
+
+class _FunctionStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.slow_queries = 0
+        self.retries = 0
+        self.retried_ok = 0
+        self.retries_exhausted = 0
+        self.last_error = None
+        self.total = Histogram()
+        self.connect = Histogram()
+        self.execute = Histogram()
+        self.fetch = Histogram()
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'slow_queries': self.slow_queries,
+            'retries': self.retries,
+            'retried_ok': self.retried_ok,
+            'retries_exhausted': self.retries_exhausted,
+            'last_error': self.last_error,
+            'total': self.total.to_dict(),
+            'connect': self.connect.to_dict(),
+            'execute': self.execute.to_dict(),
+            'fetch': self.fetch.to_dict(),
+        }
+
+
+_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+
+OUTSIDE_DAL = '(outside DAL function)'
+
+
+def current_function():
+    """Name of the innermost instrumented DAL function running on this thread."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else OUTSIDE_DAL
+
+
+def _record(name, **fields):
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _FunctionStats()
+        for field, value in fields.items():
+            if field in ('total', 'connect', 'execute', 'fetch'):
+                getattr(stats, field).record(value)
+            elif field == 'last_error':
+                stats.last_error = value
+            else:
+                setattr(stats, field, getattr(stats, field) + value)
+
+
+def instrumented(fn):
+    """Decorator recording calls, latency and errors of a DAL function."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not METRICS_CONFIG['enabled']:
+            return fn(*args, **kwargs)
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(name)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as exc:
+            _record(name, errors=1, last_error=f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            stack.pop()
+            _record(name, calls=1, total=(time.perf_counter() - started) * 1000)
+
+    wrapper.metrics_name = name
+    return wrapper
+
+
+def record_connect(seconds, failed=False):
+    """Records the time spent checking out a connection for the current function."""
+    if not METRICS_CONFIG['enabled']:
+        return
+    fields = {'connect': seconds * 1000}
+    if failed:
+        fields.update(errors=1, last_error='connection failed')
+    _record(current_function(), **fields)
+
+
+def record_retry(name, succeeded=False, exhausted=False):
+    """Counts a retry of a DAL write function (see DAL_retry)."""
+    if succeeded:
+        _record(name, retried_ok=1)
+    elif exhausted:
+        _record(name, retries_exhausted=1)
+    else:
+        _record(name, retries=1)
+
+
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def sql_digest(sql):
+    """Returns (digest_id, normalised_sql) with literals replaced by '?'."""
+    normalised = _SPACES.sub(' ', _LITERALS.sub('?', sql.replace('%s', '?'))).strip().rstrip(';')
+    return hashlib.sha1(normalised.encode('utf-8')).hexdigest()[:12], normalised
+
+
+def params_shape(params):
+    """Describes parameters by type only, e.g. '(int, str, NoneType)'."""
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f"{k}: {type(v).__name__}" for k, v in params.items()) + '}'
+    return '(' + ', '.join(type(p).__name__ for p in params) + ')'
+
+
+class InstrumentedCursor:
+    """Cursor wrapper timing execute/fetch calls for the current DAL function."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        return self._timed_execute(self._cursor.execute, sql, params, params)
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        shape_of = seq_of_params[0] if seq_of_params else ()
+        return self._timed_execute(self._cursor.executemany, sql, seq_of_params, shape_of, batch=len(seq_of_params))
+
+    def _timed_execute(self, method, sql, params, shape_of, batch=None):
+        if not METRICS_CONFIG['enabled']:
+            return method(sql, params)
+        name = current_function()
+        started = time.perf_counter()
+        try:
+            return method(sql, params)
+        except Exception as exc:
+            _record(name, errors=1, last_error=f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            _record(name, execute=ms)
+            if ms >= METRICS_CONFIG['slow_query_ms']:
+                _record(name, slow_queries=1)
+                digest, normalised = sql_digest(sql)
+                slow_query_log.warning(
+                    "slow query %.1f ms in %s [digest %s] params %s%s: %s",
+                    ms, name, digest, params_shape(shape_of),
+                    f" x{batch}" if batch is not None else '', normalised
+                )
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone, single=True)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._timed_fetch(self._cursor.fetchmany)
+        return self._timed_fetch(lambda: self._cursor.fetchmany(size))
+
+    def _timed_fetch(self, method, single=False):
+        if not METRICS_CONFIG['enabled']:
+            return method()
+        started = time.perf_counter()
+        result = method()
+        rows = (1 if result is not None else 0) if single else len(result)
+        _record(current_function(), fetch=(time.perf_counter() - started) * 1000, rows=rows)
+        return result
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def snapshot():
+    """Returns {function_name: stats_dict} for every DAL function called so far."""
+    with _lock:
+        return {name: stats.to_dict() for name, stats in sorted(_stats.items())}
+
+
+def reset():
+    """Clears all recorded metrics."""
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,791 @@
+"""Versioned schema migrations for the fundraising database.
+
+Each migration is applied once, in version order, and recorded in the
+SchemaMigrations table. Migrations work on a raw DB-API connection of either
+backend so the SQLite backend can bootstrap itself with them.
+
+Command line (uses the backend configured in DAL_core):
+
+    python -m FundRaiseDAL.DAL_migrations status
+    python -m FundRaiseDAL.DAL_migrations upgrade
+    python -m FundRaiseDAL.DAL_migrations verify    # EXPLAIN every indexed DAL query
+
+Pass --backend sqlite --database PATH to run against a SQLite file.
+
+MySQL commits every DDL statement on its own, so a migration that fails half
+way cannot be rolled back there. Every step is therefore written to be safe to
+re-run: tables use IF NOT EXISTS, triggers are dropped before being created,
+and columns and indexes are looked up in information_schema first.
+"""
+
+import argparse
+import re
+import sys
+
+
+# ============================================================
+# Migration 1: base schema
+# ============================================================
+BASE_SCHEMA = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS Users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            email VARCHAR(100) NOT NULL UNIQUE,
+            password_hash VARCHAR(255) NOT NULL,
+            user_type ENUM('Admin', 'Recipient', 'Donor', 'Service') NOT NULL,
+            phone_number VARCHAR(20),
+            address VARCHAR(255)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Recipients (
+            user_id INT PRIMARY KEY,
+            contact_email VARCHAR(100),
+            join_date DATE DEFAULT (CURRENT_DATE),
+            FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Donors (
+            user_id INT PRIMARY KEY,
+            is_anonymous_default BOOLEAN NOT NULL DEFAULT FALSE,
+            join_date DATE DEFAULT (CURRENT_DATE),
+            FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Services (
+            user_id INT PRIMARY KEY,
+            service_name VARCHAR(100),
+            service_description TEXT,
+            tax_id_number VARCHAR(50),
+            FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS FundsNeeded (
+            fund_id INT AUTO_INCREMENT PRIMARY KEY,
+            recipient_id INT NOT NULL,
+            service_id INT NOT NULL,
+            amount_needed DECIMAL(10, 2) NOT NULL,
+            amount_raised DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            proof_of_charge VARCHAR(255),
+            is_verified BOOLEAN NOT NULL DEFAULT FALSE,
+            is_fully_funded BOOLEAN NOT NULL DEFAULT FALSE,
+            FOREIGN KEY (recipient_id) REFERENCES Users(user_id),
+            FOREIGN KEY (service_id) REFERENCES Users(user_id)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Donations (
+            donation_id INT AUTO_INCREMENT PRIMARY KEY,
+            fund_id INT NOT NULL,
+            donor_id INT NULL,
+            donation_amount DECIMAL(10, 2) NOT NULL,
+            donation_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            payment_status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+            FOREIGN KEY (fund_id) REFERENCES FundsNeeded(fund_id),
+            FOREIGN KEY (donor_id) REFERENCES Users(user_id)
+        ) ENGINE=InnoDB
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS Users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(100) NOT NULL,
+            email VARCHAR(100) NOT NULL UNIQUE,
+            password_hash VARCHAR(255) NOT NULL,
+            user_type VARCHAR(20) NOT NULL
+                CHECK (user_type IN ('Admin', 'Recipient', 'Donor', 'Service')),
+            phone_number VARCHAR(20),
+            address VARCHAR(255)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Recipients (
+            user_id INTEGER PRIMARY KEY REFERENCES Users(user_id),
+            contact_email VARCHAR(100),
+            join_date DATE DEFAULT CURRENT_DATE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Donors (
+            user_id INTEGER PRIMARY KEY REFERENCES Users(user_id),
+            is_anonymous_default BOOLEAN NOT NULL DEFAULT FALSE,
+            join_date DATE DEFAULT CURRENT_DATE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Services (
+            user_id INTEGER PRIMARY KEY REFERENCES Users(user_id),
+            service_name VARCHAR(100),
+            service_description TEXT,
+            tax_id_number VARCHAR(50)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS FundsNeeded (
+            fund_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient_id INTEGER NOT NULL REFERENCES Users(user_id),
+            service_id INTEGER NOT NULL REFERENCES Users(user_id),
+            amount_needed DECIMAL(10, 2) NOT NULL,
+            amount_raised DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            proof_of_charge VARCHAR(255),
+            is_verified BOOLEAN NOT NULL DEFAULT FALSE,
+            is_fully_funded BOOLEAN NOT NULL DEFAULT FALSE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Donations (
+            donation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fund_id INTEGER NOT NULL REFERENCES FundsNeeded(fund_id),
+            donor_id INTEGER REFERENCES Users(user_id),
+            donation_amount DECIMAL(10, 2) NOT NULL,
+            donation_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            payment_status VARCHAR(20) NOT NULL DEFAULT 'Pending'
+        )
+        """,
+    ],
+}
+
+
+_TRIGGER_NAME = re.compile(r"CREATE\s+TRIGGER\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+
+
+def run_schema(cursor, dialect, statements):
+    """Runs CREATE statements so that re-running them after a failure works.
+
+    MySQL has no CREATE TRIGGER IF NOT EXISTS before 8.0.29, so each trigger
+    is dropped first; a partly applied migration then simply runs again.
+    """
+    for statement in statements:
+        match = _TRIGGER_NAME.match(statement.strip())
+        if match and dialect == 'mysql':
+            cursor.execute(f"DROP TRIGGER IF EXISTS {match.group(1)}")
+        cursor.execute(statement)
+
+
+def _m001_base_schema(cursor, dialect):
+    run_schema(cursor, dialect, BASE_SCHEMA[dialect])
+
+
+# ============================================================
+# Migration 2: indexes for the DAL queries
+# ============================================================
+# (table, index name, columns). Leading columns match each query's WHERE
+# clause, then its ORDER BY / keyset seek key, then the selected columns so
+# the index covers the query. InnoDB and SQLite both append the primary key
+# to secondary indexes, which keeps fund_id order inside equal prefixes.
+QUERY_INDEXES = [
+    # DAL_core.fetch_user_by_email / authenticate_user
+    ('Users', 'ix_users_email', ('email',)),
+    # DAL_recipient.fetch_all_services: WHERE user_type = 'Service'
+    ('Users', 'ix_users_type_name', ('user_type', 'user_id', 'name')),
+    # DAL_admin.fetch_unverified_funds: WHERE is_verified = FALSE ORDER BY fund_id
+    ('FundsNeeded', 'ix_funds_pending',
+     ('is_verified', 'fund_id', 'recipient_id', 'service_id', 'amount_needed')),
+    # DAL_donor.fetch_active_funds: WHERE is_verified AND NOT is_fully_funded ORDER BY fund_id DESC
+    ('FundsNeeded', 'ix_funds_active',
+     ('is_verified', 'is_fully_funded', 'fund_id', 'recipient_id', 'service_id', 'amount_needed', 'amount_raised')),
+    # DAL_recipient.fetch_recipient_funds: WHERE recipient_id = %s ORDER BY fund_id DESC
+    ('FundsNeeded', 'ix_funds_recipient',
+     ('recipient_id', 'fund_id', 'service_id', 'amount_needed', 'amount_raised', 'is_verified', 'is_fully_funded')),
+    # DAL_service.fetch_service_funds: WHERE service_id = %s ORDER BY fund_id DESC
+    ('FundsNeeded', 'ix_funds_service', ('service_id', 'fund_id', 'recipient_id', 'amount_needed')),
+    # DAL_donor.fetch_donations_for_donor: WHERE donor_id = %s ORDER BY donation_date DESC, donation_id DESC
+    ('Donations', 'ix_donations_donor_date',
+     ('donor_id', 'donation_date', 'donation_id', 'fund_id', 'donation_amount', 'payment_status')),
+    # DAL_admin.delete_fund / DAL_recipient.delete_recipient_fund: WHERE fund_id = %s
+    ('Donations', 'ix_donations_fund', ('fund_id', 'donation_amount')),
+]
+
+
+def list_indexes(cursor, dialect, table):
+    """Returns {index_name: (column, ...)} for the table."""
+    indexes = {}
+    if dialect == 'sqlite':
+        cursor.execute(f"PRAGMA index_list({table})")
+        names = [row[1] for row in cursor.fetchall()]
+        for name in names:
+            cursor.execute(f"PRAGMA index_info({name})")
+            indexes[name] = tuple(row[2] for row in sorted(cursor.fetchall()))
+    else:
+        cursor.execute(
+            "SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+            (table,)
+        )
+        for name, column in cursor.fetchall():
+            indexes.setdefault(name, ())
+            indexes[name] += (column,)
+    return indexes
+
+
+def column_exists(cursor, dialect, table, column):
+    """Returns True if the table has the column."""
+    if dialect == 'sqlite':
+        cursor.execute(f"PRAGMA table_info({table})")
+        return any(row[1].lower() == column.lower() for row in cursor.fetchall())
+    cursor.execute(
+        "SELECT 1 FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def find_index(cursor, dialect, table, columns):
+    """Returns the name of an index whose leading columns are `columns`, or None."""
+    columns = tuple(c.lower() for c in columns)
+    for name, indexed in list_indexes(cursor, dialect, table).items():
+        if tuple(c.lower() for c in indexed[:len(columns)]) == columns:
+            return name
+    return None
+
+
+def ensure_index(cursor, dialect, table, name, columns):
+    """Creates the index unless an equivalent one (same leading columns) exists."""
+    if find_index(cursor, dialect, table, columns):
+        return False
+    cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+    return True
+
+
+def _m002_query_indexes(cursor, dialect):
+    for table, name, columns in QUERY_INDEXES:
+        ensure_index(cursor, dialect, table, name, columns)
+
+
+# ============================================================
+# Migration 3: donation change log for incremental reconciliation
+# ============================================================
+# Triggers record the fund of every inserted, updated or deleted donation so
+# DAL_reconcile can recheck only those funds. fund_id has no foreign key:
+# entries for deleted funds are simply skipped.
+DONATION_CHANGES_SCHEMA = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS DonationChanges (
+            change_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            fund_id INT NOT NULL,
+            changed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TRIGGER trg_donations_changes_ins AFTER INSERT ON Donations FOR EACH ROW
+            INSERT INTO DonationChanges (fund_id) VALUES (NEW.fund_id)
+        """,
+        """
+        CREATE TRIGGER trg_donations_changes_upd AFTER UPDATE ON Donations FOR EACH ROW
+            INSERT INTO DonationChanges (fund_id) VALUES (OLD.fund_id), (NEW.fund_id)
+        """,
+        """
+        CREATE TRIGGER trg_donations_changes_del AFTER DELETE ON Donations FOR EACH ROW
+            INSERT INTO DonationChanges (fund_id) VALUES (OLD.fund_id)
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS DonationChanges (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fund_id INTEGER NOT NULL,
+            changed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_donations_changes_ins AFTER INSERT ON Donations BEGIN
+            INSERT INTO DonationChanges (fund_id) VALUES (NEW.fund_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_donations_changes_upd AFTER UPDATE ON Donations BEGIN
+            INSERT INTO DonationChanges (fund_id) VALUES (OLD.fund_id), (NEW.fund_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_donations_changes_del AFTER DELETE ON Donations BEGIN
+            INSERT INTO DonationChanges (fund_id) VALUES (OLD.fund_id);
+        END
+        """,
+    ],
+}
+
+
+def _m003_donation_changes(cursor, dialect):
+    run_schema(cursor, dialect, DONATION_CHANGES_SCHEMA[dialect])
+
+
+# ============================================================
+# Migration 4: sharded donation counters
+# ============================================================
+# In sharded-counter mode (DAL_counters) donations add to one of N rows per
+# fund instead of FundsNeeded.amount_raised; fold steps move them over.
+COUNTER_SHARDS_SCHEMA = {
+    'mysql': """
+        CREATE TABLE IF NOT EXISTS FundCounterShards (
+            fund_id INT NOT NULL,
+            shard_id SMALLINT NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (fund_id, shard_id),
+            FOREIGN KEY (fund_id) REFERENCES FundsNeeded(fund_id)
+        ) ENGINE=InnoDB
+        """,
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS FundCounterShards (
+            fund_id INTEGER NOT NULL REFERENCES FundsNeeded(fund_id),
+            shard_id SMALLINT NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (fund_id, shard_id)
+        )
+        """,
+}
+
+
+def _m004_counter_shards(cursor, dialect):
+    cursor.execute(COUNTER_SHARDS_SCHEMA[dialect])
+
+
+# ============================================================
+# Migration 5: idempotency keys for donations
+# ============================================================
+# NULL for donations submitted without a key; both engines allow any number
+# of NULLs in a UNIQUE index.
+def _m005_donation_idempotency_key(cursor, dialect):
+    if not column_exists(cursor, dialect, 'Donations', 'idempotency_key'):
+        cursor.execute("ALTER TABLE Donations ADD COLUMN idempotency_key VARCHAR(64) NULL")
+    if 'ux_donations_idempotency_key' not in list_indexes(cursor, dialect, 'Donations'):
+        cursor.execute("CREATE UNIQUE INDEX ux_donations_idempotency_key ON Donations (idempotency_key)")
+
+
+# ============================================================
+# Migration 6: PublicBoard read model
+# ============================================================
+# One display-ready row per fund for the public MainWindow board, so the
+# board is a primary-key range read instead of a three-table join. Triggers
+# keep it in step with FundsNeeded, Users.name and Services.service_name in
+# the writing transaction; DAL_board.rebuild_public_board() recreates it from
+# scratch.
+# Like the board query it replaces, a fund without a Services row is not
+# listed.
+PUBLIC_BOARD_POPULATE = """
+    INSERT INTO PublicBoard (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded)
+    SELECT f.fund_id, u_rec.name, s.service_name, f.amount_needed, f.amount_raised, f.is_fully_funded
+    FROM FundsNeeded f
+    JOIN Users u_rec ON f.recipient_id = u_rec.user_id
+    JOIN Services s ON f.service_id = s.user_id
+    """
+
+# Trigger bodies shared by both dialects
+_BOARD_FUND_INSERT = """
+    INSERT INTO PublicBoard (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded)
+    SELECT NEW.fund_id, u_rec.name, s.service_name, NEW.amount_needed, NEW.amount_raised, NEW.is_fully_funded
+    FROM Users u_rec JOIN Services s ON s.user_id = NEW.service_id
+    WHERE u_rec.user_id = NEW.recipient_id"""
+# Runs on every donation, so it only copies FundsNeeded's own columns; the
+# app never moves a fund to another recipient or service.
+_BOARD_FUND_UPDATE = """
+    UPDATE PublicBoard
+    SET amount_needed = NEW.amount_needed,
+        amount_raised = NEW.amount_raised,
+        is_fully_funded = NEW.is_fully_funded
+    WHERE fund_id = NEW.fund_id"""
+_BOARD_FUND_DELETE = """
+    DELETE FROM PublicBoard WHERE fund_id = OLD.fund_id"""
+_BOARD_USER_RENAME = """
+    UPDATE PublicBoard SET recipient_name = NEW.name
+    WHERE fund_id IN (SELECT fund_id FROM FundsNeeded WHERE recipient_id = NEW.user_id)"""
+_BOARD_SERVICE_INSERT = """
+    INSERT INTO PublicBoard (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded)
+    SELECT f.fund_id, u_rec.name, NEW.service_name, f.amount_needed, f.amount_raised, f.is_fully_funded
+    FROM FundsNeeded f JOIN Users u_rec ON f.recipient_id = u_rec.user_id
+    WHERE f.service_id = NEW.user_id"""
+_BOARD_SERVICE_RENAME = """
+    UPDATE PublicBoard SET service_name = NEW.service_name
+    WHERE fund_id IN (SELECT fund_id FROM FundsNeeded WHERE service_id = NEW.user_id)"""
+_BOARD_SERVICE_DELETE = """
+    DELETE FROM PublicBoard
+    WHERE fund_id IN (SELECT fund_id FROM FundsNeeded WHERE service_id = OLD.user_id)"""
+
+PUBLIC_BOARD_SCHEMA = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS PublicBoard (
+            fund_id INT PRIMARY KEY,
+            recipient_name VARCHAR(100) NOT NULL,
+            service_name VARCHAR(100) NOT NULL,
+            amount_needed DECIMAL(10, 2) NOT NULL,
+            amount_raised DECIMAL(10, 2) NOT NULL,
+            is_fully_funded BOOLEAN NOT NULL
+        ) ENGINE=InnoDB
+        """,
+        f"CREATE TRIGGER trg_board_fund_ins AFTER INSERT ON FundsNeeded FOR EACH ROW {_BOARD_FUND_INSERT}",
+        f"CREATE TRIGGER trg_board_fund_upd AFTER UPDATE ON FundsNeeded FOR EACH ROW {_BOARD_FUND_UPDATE}",
+        f"CREATE TRIGGER trg_board_fund_del AFTER DELETE ON FundsNeeded FOR EACH ROW {_BOARD_FUND_DELETE}",
+        f"""
+        CREATE TRIGGER trg_board_user_upd AFTER UPDATE ON Users FOR EACH ROW
+        {_BOARD_USER_RENAME} AND NOT (NEW.name <=> OLD.name)
+        """,
+        f"CREATE TRIGGER trg_board_service_ins AFTER INSERT ON Services FOR EACH ROW {_BOARD_SERVICE_INSERT}",
+        f"""
+        CREATE TRIGGER trg_board_service_upd AFTER UPDATE ON Services FOR EACH ROW
+        {_BOARD_SERVICE_RENAME} AND NOT (NEW.service_name <=> OLD.service_name)
+        """,
+        f"CREATE TRIGGER trg_board_service_del AFTER DELETE ON Services FOR EACH ROW {_BOARD_SERVICE_DELETE}",
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS PublicBoard (
+            fund_id INTEGER PRIMARY KEY,
+            recipient_name VARCHAR(100) NOT NULL,
+            service_name VARCHAR(100) NOT NULL,
+            amount_needed DECIMAL(10, 2) NOT NULL,
+            amount_raised DECIMAL(10, 2) NOT NULL,
+            is_fully_funded BOOLEAN NOT NULL
+        )
+        """,
+        f"CREATE TRIGGER IF NOT EXISTS trg_board_fund_ins AFTER INSERT ON FundsNeeded BEGIN {_BOARD_FUND_INSERT}; END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_board_fund_upd AFTER UPDATE ON FundsNeeded BEGIN {_BOARD_FUND_UPDATE}; END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_board_fund_del AFTER DELETE ON FundsNeeded BEGIN {_BOARD_FUND_DELETE}; END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_board_user_upd AFTER UPDATE OF name ON Users BEGIN {_BOARD_USER_RENAME}; END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_board_service_ins AFTER INSERT ON Services BEGIN {_BOARD_SERVICE_INSERT}; END",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_board_service_upd AFTER UPDATE OF service_name ON Services
+        BEGIN {_BOARD_SERVICE_RENAME}; END
+        """,
+        f"CREATE TRIGGER IF NOT EXISTS trg_board_service_del AFTER DELETE ON Services BEGIN {_BOARD_SERVICE_DELETE}; END",
+    ],
+}
+
+
+def _m006_public_board(cursor, dialect):
+    run_schema(cursor, dialect, PUBLIC_BOARD_SCHEMA[dialect])
+    cursor.execute("DELETE FROM PublicBoard")
+    cursor.execute(PUBLIC_BOARD_POPULATE)
+
+
+# ============================================================
+# Migration 7: indexes for sorting and filtering the fund tables
+# ============================================================
+# (table, index name, columns, first column is text). Each whitelisted sort
+# of DAL_core.BOARD_SORTS and DAL_admin.ALL_FUNDS_SORTS gets (sort column,
+# primary key), so a sorted page is a keyset range read. Text columns are
+# indexed NOCASE on SQLite to match DAL_core.text_column; MySQL's default
+# collations already ignore case. The amount_raised indexes are updated by
+# every donation (or counter fold).
+SORT_INDEXES = [
+    ('PublicBoard', 'ix_board_recipient', ('recipient_name', 'fund_id'), True),
+    ('PublicBoard', 'ix_board_service', ('service_name', 'fund_id'), True),
+    ('PublicBoard', 'ix_board_needed', ('amount_needed', 'fund_id'), False),
+    ('PublicBoard', 'ix_board_raised', ('amount_raised', 'fund_id'), False),
+    ('FundsNeeded', 'ix_funds_needed', ('amount_needed', 'fund_id'), False),
+    ('FundsNeeded', 'ix_funds_raised', ('amount_raised', 'fund_id'), False),
+    # DAL_admin.ALL_FUNDS_FILTERS['recipient']: name prefix search
+    ('Users', 'ix_users_name', ('name', 'user_id'), True),
+]
+
+
+def _m007_sort_indexes(cursor, dialect):
+    for table, name, columns, is_text in SORT_INDEXES:
+        if is_text and dialect == 'sqlite':
+            columns = (f"{columns[0]} COLLATE NOCASE",) + columns[1:]
+        ensure_index(cursor, dialect, table, name, columns)
+
+
+# ============================================================
+# Migration 8: PublicBoard rows for services without a name
+# ============================================================
+# Services.service_name is nullable but PublicBoard.service_name is not, so
+# migration 6 could not list (or even create) a fund of a service without a
+# name. The triggers that copy the name are recreated to show such a service
+# as '', which keeps the column usable as a keyset sort key, and the table is
+# repopulated.
+PUBLIC_BOARD_POPULATE_V8 = """
+    INSERT INTO PublicBoard (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded)
+    SELECT f.fund_id, u_rec.name, COALESCE(s.service_name, ''), f.amount_needed, f.amount_raised,
+           f.is_fully_funded
+    FROM FundsNeeded f
+    JOIN Users u_rec ON f.recipient_id = u_rec.user_id
+    JOIN Services s ON f.service_id = s.user_id
+    """
+
+_BOARD_FUND_INSERT_V8 = """
+    INSERT INTO PublicBoard (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded)
+    SELECT NEW.fund_id, u_rec.name, COALESCE(s.service_name, ''), NEW.amount_needed, NEW.amount_raised, NEW.is_fully_funded
+    FROM Users u_rec JOIN Services s ON s.user_id = NEW.service_id
+    WHERE u_rec.user_id = NEW.recipient_id"""
+_BOARD_SERVICE_INSERT_V8 = """
+    INSERT INTO PublicBoard (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_fully_funded)
+    SELECT f.fund_id, u_rec.name, COALESCE(NEW.service_name, ''), f.amount_needed, f.amount_raised, f.is_fully_funded
+    FROM FundsNeeded f JOIN Users u_rec ON f.recipient_id = u_rec.user_id
+    WHERE f.service_id = NEW.user_id"""
+_BOARD_SERVICE_RENAME_V8 = """
+    UPDATE PublicBoard SET service_name = COALESCE(NEW.service_name, '')
+    WHERE fund_id IN (SELECT fund_id FROM FundsNeeded WHERE service_id = NEW.user_id)"""
+
+PUBLIC_BOARD_TRIGGERS_V8 = {
+    'mysql': [
+        f"CREATE TRIGGER trg_board_fund_ins AFTER INSERT ON FundsNeeded FOR EACH ROW {_BOARD_FUND_INSERT_V8}",
+        f"CREATE TRIGGER trg_board_service_ins AFTER INSERT ON Services FOR EACH ROW {_BOARD_SERVICE_INSERT_V8}",
+        f"""
+        CREATE TRIGGER trg_board_service_upd AFTER UPDATE ON Services FOR EACH ROW
+        {_BOARD_SERVICE_RENAME_V8} AND NOT (NEW.service_name <=> OLD.service_name)
+        """,
+    ],
+    'sqlite': [
+        f"CREATE TRIGGER trg_board_fund_ins AFTER INSERT ON FundsNeeded BEGIN {_BOARD_FUND_INSERT_V8}; END",
+        f"CREATE TRIGGER trg_board_service_ins AFTER INSERT ON Services BEGIN {_BOARD_SERVICE_INSERT_V8}; END",
+        f"""
+        CREATE TRIGGER trg_board_service_upd AFTER UPDATE OF service_name ON Services
+        BEGIN {_BOARD_SERVICE_RENAME_V8}; END
+        """,
+    ],
+}
+
+
+def _m008_board_unnamed_services(cursor, dialect):
+    for trigger in ('trg_board_fund_ins', 'trg_board_service_ins', 'trg_board_service_upd'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    run_schema(cursor, dialect, PUBLIC_BOARD_TRIGGERS_V8[dialect])
+    cursor.execute("DELETE FROM PublicBoard")
+    cursor.execute(PUBLIC_BOARD_POPULATE_V8)
+
+
+# ============================================================
+# Migration 9: drop the unused donations-by-date index
+# ============================================================
+# Migration 2 used to create ix_donations_date for the old latest-donations
+# query. That panel now reads by primary key (DAL_core.fetch_donations_since),
+# so the index only slowed down donation writes.
+def _m009_drop_donations_date_index(cursor, dialect):
+    if 'ix_donations_date' in list_indexes(cursor, dialect, 'Donations'):
+        cursor.execute("DROP INDEX ix_donations_date" + (" ON Donations" if dialect == 'mysql' else ""))
+
+
+# ============================================================
+# Runner
+# ============================================================
+# (version, description, apply(cursor, dialect)), in order
+MIGRATIONS = [
+    (1, 'Base fundraising schema', _m001_base_schema),
+    (2, 'Covering indexes for the DAL list and lookup queries', _m002_query_indexes),
+    (3, 'Donation change log for incremental reconciliation', _m003_donation_changes),
+    (4, 'Sharded donation counters', _m004_counter_shards),
+    (5, 'Idempotency keys for donations', _m005_donation_idempotency_key),
+    (6, 'PublicBoard read model for the public fund board', _m006_public_board),
+    (7, 'Indexes for sorting and filtering the fund tables', _m007_sort_indexes),
+    (8, 'PublicBoard rows for services without a name', _m008_board_unnamed_services),
+    (9, 'Drop the unused donations-by-date index', _m009_drop_donations_date_index),
+]
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS SchemaMigrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def applied_versions(conn):
+    """Returns the set of migration versions already applied."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SCHEMA_MIGRATIONS_DDL)
+        cursor.execute("SELECT version FROM SchemaMigrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def upgrade(conn, dialect, target=None, log=None):
+    """Applies pending migrations up to target (default: latest).
+
+    Returns the list of versions applied. Each migration commits on its own.
+    The rollback on failure only protects SQLite; MySQL has already committed
+    any DDL that ran, which is why every migration is safe to run again.
+    """
+    done = applied_versions(conn)
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        cursor = conn.cursor()
+        try:
+            apply(cursor, dialect)
+            cursor.execute(
+                "INSERT INTO SchemaMigrations (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        applied.append(version)
+        if log:
+            log(f"Applied migration {version}: {description}")
+    return applied
+
+
+# ============================================================
+# Query plan verification
+# ============================================================
+class _ExplainCursor:
+    """Cursor that EXPLAINs each statement instead of running it."""
+
+    def __init__(self, cursor, dialect, plans):
+        self._cursor = cursor
+        self._dialect = dialect
+        self._plans = plans
+        self.lastrowid = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        prefix = 'EXPLAIN QUERY PLAN ' if self._dialect == 'sqlite' else 'EXPLAIN '
+        self._cursor.execute(prefix + sql.strip(), params)
+        columns = [d[0] for d in self._cursor.description]
+        self._plans.append((sql, [dict(zip(columns, row)) for row in self._cursor.fetchall()]))
+
+    def executemany(self, sql, seq_of_params):
+        for params in seq_of_params:
+            self.execute(sql, params)
+            break   # one plan is enough
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        self._cursor.close()
+
+
+def _plan_uses_index(plan_rows, dialect, index_name):
+    for row in plan_rows:
+        if dialect == 'sqlite':
+            if f"INDEX {index_name} " in row.get('detail', '') + ' ':
+                return True
+        elif row.get('key') == index_name:
+            return True
+    return False
+
+
+def _query_checks():
+    """(label, call(session), table, leading index columns) for each indexed DAL query."""
+    from FundRaiseDAL import DAL_core, DAL_admin, DAL_donor, DAL_recipient, DAL_service
+    return [
+        ('DAL_core.fetch_user_by_email',
+         lambda s: DAL_core.fetch_user_by_email('someone@example.com', session=s), 'Users', ('email',)),
+        ('DAL_recipient.fetch_all_services',
+         lambda s: DAL_recipient.fetch_all_services(session=s), 'Users', ('user_type',)),
+        ('DAL_admin.fetch_unverified_funds',
+         lambda s: DAL_admin.fetch_unverified_funds(after=1, limit=50, session=s), 'FundsNeeded', ('is_verified', 'fund_id')),
+        ('DAL_donor.fetch_active_funds',
+         lambda s: DAL_donor.fetch_active_funds(session=s), 'FundsNeeded', ('is_verified', 'is_fully_funded', 'fund_id')),
+        ('DAL_recipient.fetch_recipient_funds',
+         lambda s: DAL_recipient.fetch_recipient_funds(1, session=s), 'FundsNeeded', ('recipient_id', 'fund_id')),
+        ('DAL_service.fetch_service_funds',
+         lambda s: DAL_service.fetch_service_funds(1, session=s), 'FundsNeeded', ('service_id', 'fund_id')),
+        ('DAL_donor.fetch_donations_for_donor',
+         lambda s: DAL_donor.fetch_donations_for_donor(1, session=s), 'Donations', ('donor_id', 'donation_date')),
+        ('DAL_admin.delete_fund',
+         lambda s: DAL_admin.delete_fund(1, session=s), 'Donations', ('fund_id',)),
+        ('DAL_core.fetch_funds_data sort=recipient',
+         lambda s: DAL_core.fetch_funds_data(after=('m', 1), limit=50, sort='recipient', session=s),
+         'PublicBoard', ('recipient_name', 'fund_id')),
+        ('DAL_core.fetch_funds_data sort=raised',
+         lambda s: DAL_core.fetch_funds_data(limit=50, sort='raised', session=s),
+         'PublicBoard', ('amount_raised', 'fund_id')),
+        ('DAL_admin.fetch_all_funds sort=needed',
+         lambda s: DAL_admin.fetch_all_funds(offset=1000, limit=50, sort='needed', session=s),
+         'FundsNeeded', ('amount_needed', 'fund_id')),
+        ('DAL_admin.fetch_all_funds recipient=',
+         lambda s: DAL_admin.fetch_all_funds(limit=50, filters={'recipient': 'jo'}, session=s), 'Users', ('name',)),
+    ]
+
+
+def verify_query_plans(log=print):
+    """EXPLAINs the real DAL queries and checks each one uses its index.
+
+    Returns a list of (label, index_name, used). Note that MySQL may prefer a
+    table scan on nearly empty tables; verify against representative data.
+    """
+    from FundRaiseDAL import DAL_core
+
+    class ExplainConnection(DAL_core._SessionConnection):
+        def cursor(self):
+            return _ExplainCursor(self._conn.cursor(), dialect, plans)
+
+    class ExplainSession(DAL_core.Session):
+        def connection(self):
+            if self._conn is None:
+                return None
+            return ExplainConnection(self, self._conn)
+
+    dialect = DAL_core.get_backend().name
+    results = []
+    for label, call, table, columns in _query_checks():
+        plans = []
+        with ExplainSession() as s:
+            conn = s.connection()
+            if conn is None:
+                raise RuntimeError("Cannot connect to the database.")
+            raw_cursor = s._conn.cursor()
+            try:
+                index_name = find_index(raw_cursor, dialect, table, columns)
+            finally:
+                raw_cursor.close()
+            call(s)
+            s.rollback()
+        used = index_name is not None and any(_plan_uses_index(rows, dialect, index_name) for _, rows in plans)
+        results.append((label, index_name, used))
+        if log:
+            status = 'OK  ' if used else 'MISS'
+            log(f"{status} {label:40s} {index_name or '(no index on ' + table + '(' + ', '.join(columns) + '))'}")
+    return results
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fundraising schema migrations")
+    parser.add_argument('command', choices=['status', 'upgrade', 'verify'])
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    parser.add_argument('--target', type=int, help="upgrade only up to this version")
+    args = parser.parse_args(argv)
+
+    from FundRaiseDAL import DAL_core
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+    backend = DAL_core.get_backend()
+
+    if args.command == 'verify':
+        results = verify_query_plans()
+        return 0 if all(used for _, _, used in results) else 1
+
+    conn = backend.connect()
+    try:
+        if args.command == 'upgrade':
+            applied = upgrade(conn, backend.name, target=args.target, log=print)
+            if not applied:
+                print("Schema is up to date.")
+        else:
+            done = applied_versions(conn)
+            for version, description, _ in MIGRATIONS:
+                print(f"{'applied' if version in done else 'pending'}  {version:3d}  {description}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
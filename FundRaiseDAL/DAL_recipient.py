@@ -1,14 +1,21 @@
-from .DAL_core import get_db_connection
-import mysql.connector
+from .DAL_core import (get_db_connection, DB_ERRORS, after_commit, filter_clause, fund_status_filter, keyset_clause,
+                       limit_clause, sort_clause)
+from .DAL_counters import sync_fund_total
+from .DAL_events import publish, FUND_CREATED, FUND_DELETED, FUND_UPDATED
+from .DAL_cache import cached
+from .DAL_metrics import instrumented
+from .DAL_retry import raise_if_retryable, retry_transient
 
 
 # ============================================================
 # Helper Query Functions related to recipients role
 # ============================================================
 
-def fetch_all_services():
+@cached('services')
+@instrumented
+def fetch_all_services(session=None):
     """Fetches list of services (id, name) for the Recipient fund creation form."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -22,9 +29,11 @@ def fetch_all_services():
     return []
 
 
-def insert_new_fund(recipient_id, service_id, amount_needed, proof_of_charge):
+@instrumented
+@retry_transient
+def insert_new_fund(recipient_id, service_id, amount_needed, proof_of_charge, session=None):
     """Inserts a new fund request into the FundsNeeded table."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -35,9 +44,12 @@ def insert_new_fund(recipient_id, service_id, amount_needed, proof_of_charge):
             """
             cursor.execute(query, (recipient_id, service_id, amount_needed, proof_of_charge))
             conn.commit()
+            fund_id = cursor.lastrowid
+            after_commit(session, lambda: publish(FUND_CREATED, fund_ids=[fund_id]))
             return True, "Success"
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -45,30 +57,58 @@ def insert_new_fund(recipient_id, service_id, amount_needed, proof_of_charge):
     return False, "Failed to connect to the database."
 
 
-def fetch_recipient_funds(recipient_id):
+# name -> (column, row position, is_text). A recipient's funds are found through
+# ix_funds_recipient; the database sorts that short list.
+RECIPIENT_FUND_SORTS = {
+    'fund_id': ('f.fund_id', 0, False),
+    'needed': ('f.amount_needed', 2, False),
+    'raised': ('f.amount_raised', 3, False),
+}
+RECIPIENT_FUND_FILTERS = {
+    'status': fund_status_filter,
+}
+
+
+@instrumented
+def fetch_recipient_funds(recipient_id, after=None, limit=None, sort=None, descending=True, filters=None,
+                          session=None):
     """
     Returns all funds created by this recipient.
-    (fund_id, service_name, amount_needed, amount_raised, is_verified, is_fully_funded, proof_of_charge)
+    (fund_id, service_name, amount_needed, amount_raised, is_verified, is_fully_funded)
+    The proof_of_charge is loaded on selection with DAL_core.fetch_fund_details.
+    Sorted by one of RECIPIENT_FUND_SORTS (default: fund_id, newest first);
+    pass after=fund_id of the last row shown (or (sort value, fund_id)) to
+    get the next page.
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
-            query = """
+            column = sort_clause(RECIPIENT_FUND_SORTS, sort, 'fund_id')
+            keys = ('f.fund_id',) if column == 'f.fund_id' else (column, 'f.fund_id')
+            if after is not None and not isinstance(after, tuple):
+                after = (after,)
+            seek, params = keyset_clause(keys, after, descending=descending)
+            where, filter_params = filter_clause(filters, RECIPIENT_FUND_FILTERS)
+            if seek:
+                where.append(seek)
+            limit_sql, limit_params = limit_clause(limit)
+            query = f"""
             SELECT
                 f.fund_id,
                 u_serv.name AS service_name,
                 f.amount_needed,
                 f.amount_raised,
                 f.is_verified,
-                f.is_fully_funded,
-                f.proof_of_charge
+                f.is_fully_funded
             FROM FundsNeeded f
             JOIN Users u_serv ON f.service_id = u_serv.user_id
             WHERE f.recipient_id = %s
-            ORDER BY f.fund_id DESC;
+            {''.join(' AND ' + term for term in where)}
+            ORDER BY {', '.join(f"{key} {'DESC' if descending else 'ASC'}" for key in keys)}
+            {limit_sql};
             """
-            cursor.execute(query, (recipient_id,))
+            cursor.execute(query, tuple([recipient_id] + filter_params + params + limit_params))
             rows = cursor.fetchall()
             return rows
         finally:
@@ -77,22 +117,35 @@ def fetch_recipient_funds(recipient_id):
     return []
 
 
-def update_recipient_fund(recipient_id, fund_id, new_amount_needed, new_proof):
+@instrumented
+@retry_transient
+def update_recipient_fund(recipient_id, fund_id, new_amount_needed, new_proof, session=None):
     """Update amount_needed + proof_of_charge for a recipient's own fund."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
+            # Checked with a SELECT: MySQL's rowcount is 0 for an UPDATE that changes nothing
+            cursor.execute("SELECT 1 FROM FundsNeeded WHERE fund_id = %s AND recipient_id = %s",
+                           (fund_id, recipient_id))
+            if cursor.fetchone() is None:
+                conn.rollback()
+                return False, "Fund not found or does not belong to this recipient."
+            # is_fully_funded is judged on the full total, unfolded shards included
+            sync_fund_total(cursor, fund_id)
             query = """
             UPDATE FundsNeeded
-            SET amount_needed = %s, proof_of_charge = %s
+            SET is_fully_funded = CASE WHEN amount_raised >= %s THEN TRUE ELSE FALSE END,
+                amount_needed = %s, proof_of_charge = %s
             WHERE fund_id = %s AND recipient_id = %s
             """
-            cursor.execute(query, (new_amount_needed, new_proof, fund_id, recipient_id))
+            cursor.execute(query, (new_amount_needed, new_amount_needed, new_proof, fund_id, recipient_id))
             conn.commit()
+            after_commit(session, lambda: publish(FUND_UPDATED, fund_ids=[fund_id]))
             return True, "Success"
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -100,25 +153,41 @@ def update_recipient_fund(recipient_id, fund_id, new_amount_needed, new_proof):
     return False, "Failed to connect to the database."
 
 
-def delete_recipient_fund(recipient_id, fund_id):
+@instrumented
+@retry_transient
+def delete_recipient_fund(recipient_id, fund_id, session=None):
     """
     Delete a fund created by this recipient.
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
-            # First delete related donations
-            cursor.execute("DELETE FROM Donations WHERE fund_id = %s", (fund_id,))
-            # Then delete the fund
+            # First delete related donations, only if the fund is this recipient's
+            cursor.execute(
+                "DELETE FROM Donations WHERE fund_id = %s AND EXISTS "
+                "(SELECT 1 FROM FundsNeeded f WHERE f.fund_id = %s AND f.recipient_id = %s)",
+                (fund_id, fund_id, recipient_id)
+            )
+            cursor.execute(
+                "DELETE FROM FundCounterShards WHERE fund_id = %s AND EXISTS "
+                "(SELECT 1 FROM FundsNeeded f WHERE f.fund_id = %s AND f.recipient_id = %s)",
+                (fund_id, fund_id, recipient_id)
+            )
+            # Then delete the fund; its running total goes with it
             cursor.execute(
                 "DELETE FROM FundsNeeded WHERE fund_id = %s AND recipient_id = %s",
                 (fund_id, recipient_id)
             )
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return False, "Fund not found or does not belong to this recipient."
             conn.commit()
+            after_commit(session, lambda: publish(FUND_DELETED, fund_ids=[fund_id]))
             return True, "Success"
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -126,12 +195,13 @@ def delete_recipient_fund(recipient_id, fund_id):
     return False, "Failed to connect to the database."
 
 
-def fetch_recipient_profile(user_id):
+@instrumented
+def fetch_recipient_profile(user_id, session=None):
     """Return recipient-specific profile row or None.
 
     Expected return: (user_id, contact_email, join_date)
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -144,12 +214,14 @@ def fetch_recipient_profile(user_id):
     return None
 
 
-def upsert_recipient_profile(user_id, contact_email):
+@instrumented
+@retry_transient
+def upsert_recipient_profile(user_id, contact_email, session=None):
     """Insert or update recipient profile.
 
     Returns (True, message) or (False, error)
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -161,8 +233,9 @@ def upsert_recipient_profile(user_id, contact_email):
                 cursor.execute("INSERT INTO Recipients (user_id, contact_email) VALUES (%s, %s)", (user_id, contact_email))
             conn.commit()
             return True, 'Success'
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -0,0 +1,250 @@
+"""Reconciliation of FundsNeeded.amount_raised / is_fully_funded with Donations.
+
+The running totals on FundsNeeded are maintained by the write paths. This
+job recomputes them from the Donations table, fixes any fund that drifted and
+reports what it changed.
+
+* incremental - rechecks only the funds listed in the DonationChanges log
+                (filled by triggers, see migration 3) and removes the entries
+                it consumed, so the log itself is the watermark.
+* full        - rechecks every fund in fund_id chunks of set-based statements,
+                committing after each chunk.
+
+Command line, e.g. from cron (uses the backend configured in DAL_core):
+
+    python -m FundRaiseDAL.DAL_reconcile incremental
+    python -m FundRaiseDAL.DAL_reconcile full --chunk-size 5000 --dry-run --json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from FundRaiseDAL.DAL_core import get_db_connection, DB_ERRORS
+from FundRaiseDAL.DAL_events import publish, FUND_TOTALS_CHANGED
+from FundRaiseDAL.DAL_metrics import instrumented
+
+
+RECONCILE_CONFIG = {
+    'chunk_size': 1000,     # funds (full) or change log entries (incremental) per transaction
+}
+
+# Recomputed donation total of the FundsNeeded row being updated, and the part
+# of it still held in unfolded counter shards (see DAL_counters)
+_DONATION_TOTAL = "(SELECT COALESCE(SUM(d.donation_amount), 0) FROM Donations d WHERE d.fund_id = FundsNeeded.fund_id)"
+_UNFOLDED = "(SELECT COALESCE(SUM(c.amount), 0) FROM FundCounterShards c WHERE c.fund_id = FundsNeeded.fund_id)"
+
+
+def _find_drift(cursor, fund_filter, params):
+    """Returns the funds matching fund_filter whose stored totals disagree with Donations.
+
+    fund_filter is a condition on a column named fund_id, applied to both tables.
+    """
+    query = f"""
+    SELECT f.fund_id, f.amount_needed, f.amount_raised + COALESCE(c.unfolded, 0), f.is_fully_funded,
+           COALESCE(t.total, 0) AS actual_raised
+    FROM FundsNeeded f
+    LEFT JOIN (
+        SELECT fund_id, SUM(donation_amount) AS total
+        FROM Donations
+        WHERE {fund_filter}
+        GROUP BY fund_id
+    ) t ON t.fund_id = f.fund_id
+    LEFT JOIN (
+        SELECT fund_id, SUM(amount) AS unfolded
+        FROM FundCounterShards
+        WHERE {fund_filter}
+        GROUP BY fund_id
+    ) c ON c.fund_id = f.fund_id
+    WHERE f.{fund_filter}
+      AND (ROUND(f.amount_raised + COALESCE(c.unfolded, 0), 2) <> ROUND(COALESCE(t.total, 0), 2)
+           OR f.is_fully_funded <> CASE WHEN COALESCE(t.total, 0) >= f.amount_needed THEN 1 ELSE 0 END)
+    ORDER BY f.fund_id
+    """
+    cursor.execute(query, tuple(params) * 3)
+    drift = []
+    for fund_id, amount_needed, amount_raised, is_fully_funded, actual_raised in cursor.fetchall():
+        drift.append({
+            'fund_id': fund_id,
+            'amount_needed': float(amount_needed),
+            'stored_raised': round(float(amount_raised), 2),
+            'actual_raised': round(float(actual_raised), 2),
+            'stored_fully_funded': bool(is_fully_funded),
+            'actual_fully_funded': float(actual_raised) >= float(amount_needed),
+        })
+    return drift
+
+
+def _repair(cursor, fund_ids):
+    """Recomputes the totals of fund_ids from Donations in one statement.
+
+    amount_raised plus the fund's unfolded shards is made equal to the
+    donation total, so a later fold does not count the shards twice.
+    """
+    if not fund_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(fund_ids))
+    # is_fully_funded is assigned first: MySQL evaluates SET left to right
+    # and would otherwise compare against the already updated amount_raised.
+    cursor.execute(f"""
+    UPDATE FundsNeeded
+    SET is_fully_funded = CASE WHEN {_DONATION_TOTAL} >= amount_needed THEN TRUE ELSE FALSE END,
+        amount_raised = {_DONATION_TOTAL} - {_UNFOLDED}
+    WHERE fund_id IN ({placeholders})
+    """, tuple(fund_ids))
+
+
+def _publish_repairs(drift, dry_run):
+    if drift and not dry_run:
+        publish(FUND_TOTALS_CHANGED, fund_ids=[row['fund_id'] for row in drift])
+
+
+def _new_report(mode, dry_run):
+    return {'mode': mode, 'dry_run': dry_run, 'funds_checked': 0, 'chunks': 0,
+            'changes_consumed': 0, 'watermark': None, 'discrepancies': [],
+            'elapsed_seconds': 0.0, 'error': None}
+
+
+@instrumented
+def reconcile_incremental(chunk_size=None, dry_run=False):
+    """Rechecks the funds with donation changes logged since the last run.
+
+    Each chunk of log entries is handled in its own transaction: the affected
+    funds are repaired and the entries deleted. With dry_run the drift is only
+    reported and the log is left untouched. Returns a report dict.
+    """
+    chunk_size = chunk_size or RECONCILE_CONFIG['chunk_size']
+    report = _new_report('incremental', dry_run)
+    started = time.perf_counter()
+    conn = get_db_connection()
+    if not conn:
+        report['error'] = "Failed to connect to the database."
+        return report
+    cursor = conn.cursor()
+    try:
+        last_seen = 0
+        while True:
+            cursor.execute(
+                "SELECT change_id, fund_id FROM DonationChanges WHERE change_id > %s ORDER BY change_id LIMIT %s",
+                (last_seen, chunk_size)
+            )
+            changes = cursor.fetchall()
+            if not changes:
+                break
+            change_ids = [change_id for change_id, _ in changes]
+            fund_ids = sorted({fund_id for _, fund_id in changes})
+            last_seen = change_ids[-1]
+
+            placeholders = ', '.join(['%s'] * len(fund_ids))
+            drift = _find_drift(cursor, f"fund_id IN ({placeholders})", fund_ids)
+            if not dry_run:
+                _repair(cursor, [row['fund_id'] for row in drift])
+                cursor.execute(
+                    f"DELETE FROM DonationChanges WHERE change_id IN ({', '.join(['%s'] * len(change_ids))})",
+                    tuple(change_ids)
+                )
+            conn.commit()
+            _publish_repairs(drift, dry_run)
+
+            report['chunks'] += 1
+            report['funds_checked'] += len(fund_ids)
+            report['changes_consumed'] += len(change_ids)
+            report['watermark'] = last_seen
+            report['discrepancies'].extend(drift)
+    except DB_ERRORS as err:
+        conn.rollback()
+        report['error'] = str(err)
+    finally:
+        cursor.close()
+        conn.close()
+    report['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+
+@instrumented
+def reconcile_full(chunk_size=None, dry_run=False):
+    """Rechecks every fund, chunk_size fund_ids per transaction. Returns a report dict.
+
+    The change log is left alone; the next incremental run rechecks those
+    funds again, which is cheap.
+    """
+    chunk_size = chunk_size or RECONCILE_CONFIG['chunk_size']
+    report = _new_report('full', dry_run)
+    started = time.perf_counter()
+    conn = get_db_connection()
+    if not conn:
+        report['error'] = "Failed to connect to the database."
+        return report
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MIN(fund_id), MAX(fund_id), COUNT(*) FROM FundsNeeded")
+        low, high, count = cursor.fetchone()
+        conn.commit()
+        if count:
+            for start in range(low, high + 1, chunk_size):
+                end = start + chunk_size - 1
+                drift = _find_drift(cursor, "fund_id BETWEEN %s AND %s", (start, end))
+                if not dry_run:
+                    _repair(cursor, [row['fund_id'] for row in drift])
+                conn.commit()
+                _publish_repairs(drift, dry_run)
+                report['chunks'] += 1
+                report['discrepancies'].extend(drift)
+            report['funds_checked'] = count
+            report['watermark'] = high
+    except DB_ERRORS as err:
+        conn.rollback()
+        report['error'] = str(err)
+    finally:
+        cursor.close()
+        conn.close()
+    report['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+
+# ============================================================
+# CLI
+# ============================================================
+def format_report(report):
+    """Human-readable summary of a reconciliation report."""
+    lines = [
+        f"{report['mode']} reconciliation{' (dry run)' if report['dry_run'] else ''}: "
+        f"{report['funds_checked']} fund(s) checked in {report['chunks']} chunk(s), "
+        f"{len(report['discrepancies'])} discrepancy(ies), {report['elapsed_seconds']:.3f}s"
+    ]
+    if report['mode'] == 'incremental':
+        lines.append(f"  change log entries consumed: {report['changes_consumed']}, watermark: {report['watermark']}")
+    for row in report['discrepancies']:
+        lines.append(
+            f"  fund {row['fund_id']}: raised {row['stored_raised']:.2f} -> {row['actual_raised']:.2f}, "
+            f"fully funded {row['stored_fully_funded']} -> {row['actual_fully_funded']}"
+        )
+    if report['error']:
+        lines.append(f"  ERROR: {report['error']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute fund totals from the Donations table")
+    parser.add_argument('mode', choices=['incremental', 'full'])
+    parser.add_argument('--chunk-size', type=int, help=f"default {RECONCILE_CONFIG['chunk_size']}")
+    parser.add_argument('--dry-run', action='store_true', help="report drift without fixing it")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    args = parser.parse_args(argv)
+
+    from FundRaiseDAL import DAL_core
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+
+    reconcile = reconcile_full if args.mode == 'full' else reconcile_incremental
+    report = reconcile(chunk_size=args.chunk_size, dry_run=args.dry_run)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 1 if report['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Retry of DAL write transactions that failed on a transient lock conflict.
+
+Write functions are wrapped with @retry_transient and call
+raise_if_retryable(err, session) in their error handler, after the rollback.
+When the backend classifies the error as transient (MySQL deadlock 1213 or
+lock wait timeout 1205, SQLite "database is locked"), the whole function is
+run again after a jittered exponential backoff. Other errors, and a
+transient error on the last attempt, are returned to the caller exactly as
+before.
+
+Calls made inside a Session are never retried here: the rollback has undone
+the whole unit of work, so only its owner can run it again.
+
+Retries are counted per function in DAL_metrics.snapshot() ('retries',
+'retried_ok', 'retries_exhausted').
+"""
+
+import functools
+import inspect
+import random
+import threading
+import time
+
+from .DAL_metrics import record_retry
+
+
+RETRY_CONFIG = {
+    'enabled': True,
+    'max_attempts': 4,      # first try included
+    'base_delay': 0.05,     # seconds; doubles on every attempt
+    'max_delay': 1.0,
+}
+
+_local = threading.local()
+
+
+class _Retry(Exception):
+    """Raised through a write function to make retry_transient run it again."""
+
+    def __init__(self, err):
+        super().__init__(str(err))
+        self.err = err
+
+
+class _Attempt:
+    def __init__(self, last):
+        self.last = last
+        self.transient_error = False
+
+
+def backoff_delay(attempt):
+    """Full-jitter delay before the given retry (1 = first retry)."""
+    cap = min(RETRY_CONFIG['max_delay'], RETRY_CONFIG['base_delay'] * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+def is_transient(err):
+    """True if the configured backend reports err as a retryable lock conflict."""
+    from .DAL_core import get_backend
+    return get_backend().is_transient(err)
+
+
+def raise_if_retryable(err, session=None):
+    """Called from a write function's error handler after rolling back.
+
+    Raises to the enclosing retry_transient wrapper when err is transient and
+    another attempt is due; otherwise returns so the function can report it.
+    """
+    attempts = getattr(_local, 'attempts', None)
+    if session is not None or not attempts or not is_transient(err):
+        return
+    attempt = attempts[-1]
+    attempt.transient_error = True
+    if not attempt.last:
+        raise _Retry(err)
+
+
+def retry_transient(fn):
+    """Decorator re-running a DAL write function on transient errors."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not RETRY_CONFIG['enabled'] or signature.bind_partial(*args, **kwargs).arguments.get('session') is not None:
+            return fn(*args, **kwargs)
+        attempts = getattr(_local, 'attempts', None)
+        if attempts is None:
+            attempts = _local.attempts = []
+
+        max_attempts = max(1, RETRY_CONFIG['max_attempts'])
+        for number in range(1, max_attempts + 1):
+            attempt = _Attempt(last=number == max_attempts)
+            attempts.append(attempt)
+            try:
+                result = fn(*args, **kwargs)
+            except _Retry:
+                record_retry(name)
+                time.sleep(backoff_delay(number))
+                continue
+            finally:
+                attempts.pop()
+            if attempt.transient_error:
+                record_retry(name, exhausted=True)
+            elif number > 1:
+                record_retry(name, succeeded=True)
+            return result
+
+    return wrapper
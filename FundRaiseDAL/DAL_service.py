@@ -1,35 +1,48 @@
-from .DAL_core import get_db_connection
-import mysql.connector
+from .DAL_core import get_db_connection, DB_ERRORS, after_commit, keyset_clause, limit_clause
+from .DAL_cache import cached, invalidate
+from .DAL_events import publish, FUND_UPDATED
+from .DAL_metrics import instrumented
+from .DAL_retry import raise_if_retryable, retry_transient
 # ============================================================
 # Helper Query Functions related to service role
 # ============================================================
-def fetch_service_funds(service_user_id):
-    """Fetches funds where the service provider is the logged-in user."""
-    conn = get_db_connection()
+@instrumented
+def fetch_service_funds(service_user_id, after=None, limit=None, session=None):
+    """Fetches funds where the service provider is the logged-in user.
+
+    Newest first; pass after=fund_id of the last row shown to get the next page.
+    """
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
-        query = """
+        seek, params = keyset_clause(('f.fund_id',), None if after is None else (after,), descending=True)
+        limit_sql, limit_params = limit_clause(limit)
+        query = f"""
         SELECT
             f.fund_id,
             u_rec.name AS RecipientName,
-            f.amount_needed,
-            f.proof_of_charge
+            f.amount_needed
         FROM FundsNeeded f
         JOIN Users u_rec ON f.recipient_id = u_rec.user_id
         WHERE f.service_id = %s
-        ORDER BY f.fund_id DESC;
+        {'AND ' + seek if seek else ''}
+        ORDER BY f.fund_id DESC
+        {limit_sql};
         """
-        cursor.execute(query, (service_user_id,))
+        cursor.execute(query, tuple([service_user_id] + params + limit_params))
         data = cursor.fetchall()
         cursor.close()
         conn.close()
-        # Returns list of (fund_id, recipient_name, amount_needed, proof_of_charge)
+        # Returns list of (fund_id, recipient_name, amount_needed); the proof is
+        # loaded on selection with DAL_core.fetch_fund_details
         return data
     return []
 
-def update_fund_proof_of_charge(fund_id, new_proof, service_user_id):
+@instrumented
+@retry_transient
+def update_fund_proof_of_charge(fund_id, new_proof, service_user_id, session=None):
     """Updates the proof_of_charge link for a specific fund."""
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -40,9 +53,12 @@ def update_fund_proof_of_charge(fund_id, new_proof, service_user_id):
             """
             cursor.execute(query, (new_proof, fund_id, service_user_id))
             conn.commit()
+            after_commit(session, lambda: publish(FUND_UPDATED, fund_ids=[fund_id]))
             return True, "Success"
             
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
+            conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -50,12 +66,14 @@ def update_fund_proof_of_charge(fund_id, new_proof, service_user_id):
     return False, "Failed to connect to the database."
 
 
-def fetch_service_profile(user_id):
+@cached('service_profile')
+@instrumented
+def fetch_service_profile(user_id, session=None):
     """Return service-specific profile row or None.
 
     Expected return: (user_id, service_name, service_description, tax_id_number)
     """
-    conn = get_db_connection()
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -68,8 +86,10 @@ def fetch_service_profile(user_id):
     return None
 
 
-def upsert_service_profile(user_id, service_name, service_description, tax_id_number):
-    conn = get_db_connection()
+@instrumented
+@retry_transient
+def upsert_service_profile(user_id, service_name, service_description, tax_id_number, session=None):
+    conn = get_db_connection(session)
     if conn:
         cursor = conn.cursor()
         try:
@@ -86,9 +106,14 @@ def upsert_service_profile(user_id, service_name, service_description, tax_id_nu
                     (user_id, service_name, service_description, tax_id_number)
                 )
             conn.commit()
+            def refresh():
+                invalidate('service_profile', user_id)
+                invalidate('services')
+            after_commit(session, refresh)
             return True, 'Success'
-        except mysql.connector.Error as err:
+        except DB_ERRORS as err:
             conn.rollback()
+            raise_if_retryable(err, session)
             return False, str(err)
         finally:
             cursor.close()
@@ -0,0 +1,356 @@
+"""Write-behind queue for donations.
+
+With WRITE_BEHIND_CONFIG['enabled'] (or FUNDRAISE_WRITE_BEHIND=1),
+DonorManager.submit_donation appends the donation to a local journal,
+fsyncs it and returns without touching the database. A background flusher
+then writes the queued donations in batches: one executemany INSERT into
+Donations and one aggregated amount_raised update per affected fund, all in
+a single transaction.
+
+Every queued donation carries an idempotency key (generated when the caller
+gives none), and the journal's checkpoint file records the last sequence
+number that was committed. On start the entries past the checkpoint are
+queued again; keys already present in Donations are skipped, so a crash
+between the commit and the checkpoint write cannot record a donation twice.
+
+Queued donations are not visible in the database until they are flushed,
+and donation_date is the time of the flush. To drain a journal left behind
+by a stopped process:
+
+    python -m FundRaiseDAL.DAL_writebehind flush
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+from decimal import Decimal, ROUND_HALF_UP
+
+from FundRaiseDAL.DAL_core import get_db_connection
+from FundRaiseDAL.DAL_donor import execute_donation_batch
+
+
+WRITE_BEHIND_CONFIG = {
+    'enabled': os.environ.get('FUNDRAISE_WRITE_BEHIND') == '1',
+    'journal_path': os.environ.get('FUNDRAISE_DONATION_JOURNAL', 'donations.journal'),
+    'batch_size': 200,          # donations per transaction
+    'flush_interval': 0.5,      # seconds a queued donation may wait for a full batch
+    'compact_bytes': 1 << 20,   # journal size at which a drained journal is truncated
+}
+
+logger = logging.getLogger('FundRaiseDAL.write_behind')
+
+
+def _cents(value):
+    return Decimal(str(value)).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
+
+class DonationJournal:
+    """Append-only JSON-lines file of queued donations plus a checkpoint file.
+
+    The checkpoint holds the sequence number of the last donation committed
+    to the database; everything after it still has to be flushed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.checkpoint_path = path + '.checkpoint'
+        self.rejected_path = path + '.rejected'
+        self._file = None
+
+    def read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, seq):
+        """Atomically replaces the checkpoint (write, fsync, rename)."""
+        tmp = self.checkpoint_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def recover(self):
+        """Returns (entries after the checkpoint, highest sequence number seen).
+
+        A torn last line from a crash during append is ignored: its donation
+        was never acknowledged to the caller.
+        """
+        checkpoint = self.read_checkpoint()
+        pending, last_seq = [], checkpoint
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping unreadable journal line in %s", self.path)
+                        continue
+                    last_seq = max(last_seq, entry['seq'])
+                    if entry['seq'] > checkpoint:
+                        pending.append(entry)
+        except FileNotFoundError:
+            pass
+        return pending, last_seq
+
+    def append(self, entry):
+        """Writes one entry and fsyncs it before returning."""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def compact(self, seq):
+        """Empties the journal once every entry up to seq is committed.
+
+        The caller must exclude append() meanwhile: an entry appended after
+        the queue was seen drained would be truncated away.
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= WRITE_BEHIND_CONFIG['compact_bytes']:
+            self.close()
+            # The checkpoint already covers seq, so a crash here leaves only entries it skips
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def reject(self, entry, reason):
+        """Keeps a donation the database refused, for manual follow-up."""
+        with open(self.rejected_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(entry, error=reason), separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def write_donation_batch(entries):
+    """Writes journal entries with DAL_donor.execute_donation_batch."""
+    return execute_donation_batch(
+        [(entry['fund_id'], entry['donor_id'], Decimal(entry['amount']), entry['key']) for entry in entries]
+    )
+
+
+# ============================================================
+# Queue and flusher thread
+# ============================================================
+class WriteBehindQueue:
+    """Journals donations and commits them in batches from a background thread."""
+
+    def __init__(self, journal_path=None, batch_size=None, flush_interval=None):
+        self.journal = DonationJournal(journal_path or WRITE_BEHIND_CONFIG['journal_path'])
+        self.batch_size = batch_size or WRITE_BEHIND_CONFIG['batch_size']
+        self.flush_interval = flush_interval or WRITE_BEHIND_CONFIG['flush_interval']
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()   # one batch writer at a time
+        self._pending, self._seq = self.journal.recover()
+        self._by_key = {entry['key']: entry for entry in self._pending}
+        self._stopping = False
+        self._thread = None
+        self.stats = {'queued': 0, 'flushed': 0, 'skipped': 0, 'rejected': 0, 'batches': 0,
+                      'failed_batches': 0, 'recovered': len(self._pending)}
+        if self._pending:
+            logger.info("Recovered %d queued donation(s) from %s", len(self._pending), self.journal.path)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='donation-write-behind', daemon=True)
+            self._thread.start()
+        return self
+
+    def enqueue(self, fund_id, donor_id, donation_amount, idempotency_key=None):
+        """Durably queues a donation. Returns (True, "Queued") or (False, error_message).
+
+        A key that is still queued returns the same result again, or an error
+        if it was queued for a different donation.
+        """
+        amount = str(_cents(donation_amount))
+        with self._lock:
+            if self._stopping:
+                return False, "Donation queue is shut down."
+            if idempotency_key is not None and idempotency_key in self._by_key:
+                queued = self._by_key[idempotency_key]
+                if (queued['fund_id'], queued['donor_id'], queued['amount']) != (fund_id, donor_id, amount):
+                    return False, "Idempotency key was already used for a different donation."
+                return True, "Queued"
+            entry = {'seq': self._seq + 1, 'key': idempotency_key or uuid.uuid4().hex,
+                     'fund_id': fund_id, 'donor_id': donor_id, 'amount': amount}
+            try:
+                self.journal.append(entry)
+            except OSError as err:
+                return False, f"Could not write the donation journal: {err}"
+            self._seq = entry['seq']
+            self._pending.append(entry)
+            self._by_key[entry['key']] = entry
+            self.stats['queued'] += 1
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+        return True, "Queued"
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Writes every queued donation now. Returns True if the queue was drained."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return True
+            if not self._flush_batch():
+                return False
+
+    def stop(self, flush=True):
+        """Stops the flusher thread, draining the queue first unless flush=False."""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        drained = self.flush() if flush else False
+        with self._lock:
+            self.journal.close()
+        return drained
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                if self._stopping:
+                    return
+                has_work = bool(self._pending)
+            if has_work and not self._flush_batch():
+                # Database unavailable: keep the journal and try again next interval
+                with self._lock:
+                    if not self._stopping:
+                        self._wakeup.wait(self.flush_interval)
+
+    def _flush_batch(self):
+        """Commits the oldest batch, then advances the checkpoint. Returns False on failure."""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending[:self.batch_size]
+            if not batch:
+                return True
+
+            success, result = write_donation_batch(batch)
+            rejected = 0
+            if success:
+                inserted = result
+            else:
+                self.stats['failed_batches'] += 1
+                if not self._database_reachable():
+                    logger.warning("Donation batch of %d not written: %s", len(batch), result)
+                    return False
+                # One bad donation (e.g. a fund deleted meanwhile) must not block the rest
+                inserted, rejected = self._flush_one_by_one(batch)
+
+            self.journal.write_checkpoint(batch[-1]['seq'])
+            with self._lock:
+                del self._pending[:len(batch)]
+                for entry in batch:
+                    self._by_key.pop(entry['key'], None)
+                # Under the lock enqueue() appends with, so no new entry can land in between
+                if not self._pending:
+                    self.journal.compact(batch[-1]['seq'])
+            self.stats['batches'] += 1
+            self.stats['flushed'] += inserted
+            self.stats['rejected'] += rejected
+            self.stats['skipped'] += len(batch) - inserted - rejected
+            return True
+
+    def _flush_one_by_one(self, batch):
+        """Writes each donation in its own transaction. Returns (inserted, rejected)."""
+        inserted = rejected = 0
+        for entry in batch:
+            success, result = write_donation_batch([entry])
+            if success:
+                inserted += result
+            else:
+                logger.error("Donation %s rejected: %s", entry['key'], result)
+                self.journal.reject(entry, result)
+                rejected += 1
+        return inserted, rejected
+
+    @staticmethod
+    def _database_reachable():
+        conn = get_db_connection()
+        if not conn:
+            return False
+        conn.close()
+        return True
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    """The process-wide queue, recovered from its journal and started on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteBehindQueue().start()
+            atexit.register(shutdown)
+        return _queue
+
+
+def enqueue_donation(fund_id, donor_id, donation_amount, idempotency_key=None):
+    """Queues a donation on the process-wide queue."""
+    return get_queue().enqueue(fund_id, donor_id, donation_amount, idempotency_key)
+
+
+def shutdown():
+    """Flushes and stops the process-wide queue, if one was started."""
+    global _queue
+    with _queue_lock:
+        queue, _queue = _queue, None
+    if queue is not None:
+        queue.stop(flush=True)
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or drain the donation write-behind journal")
+    parser.add_argument('command', choices=['status', 'flush'])
+    parser.add_argument('--journal', help=f"default {WRITE_BEHIND_CONFIG['journal_path']}")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        pending, last_seq = DonationJournal(args.journal or WRITE_BEHIND_CONFIG['journal_path']).recover()
+        print(f"{len(pending)} donation(s) waiting, last sequence number {last_seq}")
+        return 0
+
+    from FundRaiseDAL import DAL_core
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+
+    queue = WriteBehindQueue(journal_path=args.journal)
+    drained = queue.stop(flush=True)
+    print(f"Recovered {queue.stats['recovered']}, inserted {queue.stats['flushed']}, "
+          f"already present {queue.stats['skipped']}, rejected {queue.stats['rejected']}.")
+    return 0 if drained else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,7 +4,8 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 import webbrowser
 from FundRaiseLIB import LIB_admin
-from FundRaiseGUI import GUI_core
+from FundRaiseLIB.LIB_search import FundSearchIndex
+from FundRaiseGUI.GUI_widgets import DetailLoader, FilterBar, FundPicker, TableQuery, VirtualTreeview
 
 
 class AdminDashboard(tk.Frame):
@@ -15,120 +16,10 @@ class AdminDashboard(tk.Frame):
 
         # Track selected fund for CRUD
         self.selected_fund_id = None
-        self.all_funds_raw = {}
-
-        btn_frame = tk.Frame(self)
-        btn_frame.pack(pady=10)
-        tk.Label(self, text="🔑 Admin Dashboard", font=("Arial", 18, "bold")).pack(pady=10)
-        tk.Button(btn_frame, text="Edit Profile", command=lambda: controller.open_profile()).pack(side=tk.LEFT, padx=6)
-        tk.Button(btn_frame, text="Logout", command=controller.logout).pack(side=tk.LEFT, padx=6)
-
-        tk.Label(self, text="Funds Verification (Pending Admin Action)", font=("Arial", 14, "underline")).pack(pady=10)
-
-        form_frame = tk.Frame(self)
-        form_frame.pack(padx=20, pady=10, fill='x')
-
-        # Fund selection dropdown
-        tk.Label(form_frame, text="Select Fund to Verify:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        """Admin dashboard GUI: verify funds, update/delete funds."""
-
-        import tkinter as tk
-        from tkinter import messagebox, ttk
-        import webbrowser
-        from FundRaiseLIB import LIB_admin
-
-
-        class AdminDashboard(tk.Frame):
-            def __init__(self, master, controller):
-                super().__init__(master)
-                self.controller = controller
-                self.admin_manager = LIB_admin.AdminManager()
-
-                # Track selected fund for CRUD
-                self.selected_fund_id = None
-                self.all_funds_raw = {}
-
-                tk.Label(self, text="🔑 Admin Dashboard", font=("Arial", 18, "bold")).pack(pady=10)
-                tk.Button(self, text="Logout", command=controller.logout).pack(pady=10)
-
-                tk.Label(self, text="Funds Verification (Pending Admin Action)", font=("Arial", 14, "underline")).pack(pady=10)
-
-                form_frame = tk.Frame(self)
-                form_frame.pack(padx=20, pady=10, fill='x')
-
-                # Fund selection dropdown
-                tk.Label(form_frame, text="Select Fund to Verify:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-                self.funds_data = []
-                self.fund_descriptions = []
-                self.fund_map = {}
-
-                self.fund_var = tk.StringVar(self)
-                self.fund_var.set("Loading Funds...")
-
-                self.fund_menu = tk.OptionMenu(form_frame, self.fund_var, *['Loading Funds...'])
-                self.fund_menu.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-
-                # Proof link display
-                tk.Label(form_frame, text="Proof for Review:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
-                self.proof_label_text = tk.StringVar()
-                self.proof_label = tk.Label(form_frame, textvariable=self.proof_label_text, fg='blue', cursor="hand2")
-                self.proof_label.grid(row=1, column=1, padx=5, pady=5, sticky='w')
-                self.proof_label.bind("<Button-1>", self.open_proof_link)
-
-                # Action buttons
-                button_frame = tk.Frame(form_frame)
-                button_frame.grid(row=2, columnspan=2, pady=15)
-                tk.Button(button_frame, text="✅ Verify Fund", command=self.verify_fund, bg='green', fg='white').pack(side=tk.LEFT, padx=10)
-
-                # Bind selection change
-                self.fund_var.trace_add("write", lambda *args: self.load_current_proof())
-                self.load_pending_funds()
-
-                tk.Label(self, text="Manage All Funds (Update / Delete)", font=("Arial", 14, "underline")).pack(pady=10)
-
-                crud_frame = tk.Frame(self)
-                crud_frame.pack(padx=20, pady=10, fill='both', expand=True)
-
-                # Treeview for all funds
-                columns = ('fund_id', 'recipient', 'service', 'needed', 'raised', 'verified', 'fully_funded')
-                self.all_funds_tree = ttk.Treeview(crud_frame, columns=columns, show='headings', height=8)
-                for col in columns:
-                    self.all_funds_tree.heading(col, text=col.capitalize())
-                    width = 80
-                    if col in ('recipient', 'service'):
-                        width = 150
-                    self.all_funds_tree.column(col, anchor=tk.CENTER, width=width)
-
-                self.all_funds_tree.grid(row=0, column=0, columnspan=3, sticky='nsew', pady=5)
-
-                # Scrollbar for tree
-                scrollbar = ttk.Scrollbar(crud_frame, orient="vertical", command=self.all_funds_tree.yview)
-                self.all_funds_tree.configure(yscrollcommand=scrollbar.set)
-                scrollbar.grid(row=0, column=3, sticky='ns')
-
-                # Configure grid weights
-                crud_frame.grid_rowconfigure(0, weight=1)
-                crud_frame.grid_columnconfigure(0, weight=1)
-
-                # Bind selection
-                self.all_funds_tree.bind("<<TreeviewSelect>>", self.on_fund_select)
-"""Admin dashboard GUI: verify funds, update/delete funds."""
-
-import tkinter as tk
-from tkinter import messagebox, ttk
-import webbrowser
-from FundRaiseLIB import LIB_admin
-
-
-class AdminDashboard(tk.Frame):
-    def __init__(self, master, controller):
-        super().__init__(master)
-        self.controller = controller
-        self.admin_manager = LIB_admin.AdminManager()
-
-        # Track selected fund for CRUD
-        self.selected_fund_id = None
-        self.all_funds_raw = {}
+        self.proof_fund_id = None   # fund whose proof is in the edit field
+        # proof_of_charge is not in the fund lists; it is loaded for the selected fund and its neighbours
+        self.pending_details = DetailLoader(self, 'pending_details', self.admin_manager.get_fund_details)
+        self.fund_details = DetailLoader(self, 'fund_details', self.admin_manager.get_fund_details)
 
         tk.Label(self, text="🔑 Admin Dashboard", font=("Arial", 18, "bold")).pack(pady=10)
         tk.Button(self, text="Logout", command=controller.logout).pack(pady=10)
@@ -138,17 +29,13 @@ class AdminDashboard(tk.Frame):
         form_frame = tk.Frame(self)
         form_frame.pack(padx=20, pady=10, fill='x')
 
-        # Fund selection dropdown
-        tk.Label(form_frame, text="Select Fund to Verify:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
-        self.funds_data = []
-        self.fund_descriptions = []
-        self.fund_map = {}
+        # Pending funds picker; type to filter, Ctrl/Shift-click selects several funds to verify at once
+        tk.Label(form_frame, text="Select Fund(s) to Verify:").grid(row=0, column=0, padx=5, pady=5, sticky='nw')
 
-        self.fund_var = tk.StringVar(self)
-        self.fund_var.set("Loading Funds...")
-
-        self.fund_menu = tk.OptionMenu(form_frame, self.fund_var, *['Loading Funds...'])
-        self.fund_menu.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        self.pending_picker = FundPicker(form_frame, height=6, selectmode=tk.EXTENDED,
+                                         on_select=self.load_current_proof, empty_text='No Pending Funds to Verify')
+        self.pending_picker.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        form_frame.grid_columnconfigure(1, weight=1)
 
         # Proof link display
         tk.Label(form_frame, text="Proof for Review:").grid(row=1, column=0, padx=5, pady=5, sticky='w')
@@ -160,14 +47,17 @@ class AdminDashboard(tk.Frame):
         # Action buttons
         button_frame = tk.Frame(form_frame)
         button_frame.grid(row=2, columnspan=2, pady=15)
-        tk.Button(button_frame, text="✅ Verify Fund", command=self.verify_fund, bg='green', fg='white').pack(side=tk.LEFT, padx=10)
-
-        # Bind selection change
-        self.fund_var.trace_add("write", lambda *args: self.load_current_proof())
-        self.load_pending_funds()
+        tk.Button(button_frame, text="Select All", command=self.select_all_pending).pack(side=tk.LEFT, padx=10)
+        tk.Button(button_frame, text="✅ Verify Selected", command=self.verify_fund, bg='green', fg='white').pack(side=tk.LEFT, padx=10)
 
         tk.Label(self, text="Manage All Funds (Update / Delete)", font=("Arial", 14, "underline")).pack(pady=10)
 
+        self.all_funds_filter = FilterBar(self, [('recipient', "Recipient:", None),
+                                                 ('status', "Status:", [("Any", None), ("Pending", 'pending'),
+                                                                        ("Active", 'active'), ("Funded", 'funded')])],
+                                          self._on_all_funds_filter)
+        self.all_funds_filter.pack(padx=20)
+
         crud_frame = tk.Frame(self)
         crud_frame.pack(padx=20, pady=10, fill='both', expand=True)
 
@@ -183,9 +73,15 @@ class AdminDashboard(tk.Frame):
 
         self.all_funds_tree.grid(row=0, column=0, columnspan=3, sticky='nsew', pady=5)
 
-        # Scrollbar for tree
-        scrollbar = ttk.Scrollbar(crud_frame, orient="vertical", command=self.all_funds_tree.yview)
-        self.all_funds_tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar for tree; only the visible funds are loaded, as they are scrolled to
+        scrollbar = ttk.Scrollbar(crud_frame, orient="vertical")
+        self.all_funds_list = VirtualTreeview(self, self.all_funds_tree, 'all_funds', self._count_all_funds,
+                                              self._fetch_all_funds_range, self._format_fund_row,
+                                              scrollbar=scrollbar, on_refreshed=self._on_all_funds_refreshed)
+        # Sorting and filtering run in the query; a change reloads from the top
+        self.all_funds_query = TableQuery(self.all_funds_tree, {'fund_id': 'fund_id', 'needed': 'needed',
+                                                                'raised': 'raised'},
+                                          self._on_all_funds_query, sort='fund_id')
         scrollbar.grid(row=0, column=3, sticky='ns')
 
         # Configure grid weights
@@ -212,49 +108,54 @@ class AdminDashboard(tk.Frame):
         tk.Button(crud_frame, text="💾 Update Selected Fund", command=self.handle_update_fund).grid(row=4, column=0, padx=5, pady=10, sticky='e')
         tk.Button(crud_frame, text="🗑 Delete Selected Fund", command=self.handle_delete_fund).grid(row=4, column=1, padx=5, pady=10, sticky='w')
 
-        # Initial load of all funds table
+    def refresh(self):
+        """Called by the controller each time the frame is shown."""
+        self.load_pending_funds()
         self.load_all_funds_table()
 
     def load_pending_funds(self):
-        """Fetches and populates the fund selection dropdown using LIB layer."""
-        self.funds_data = self.admin_manager.get_pending_funds_list()
-
-        self.fund_descriptions = []
-        self.fund_map = {}
-
-        menu = self.fund_menu.children['menu']
-        menu.delete(0, 'end')
-
-        if not self.funds_data:
-            self.fund_var.set('No Pending Funds to Verify')
-            self.proof_label_text.set('')
-            menu.add_command(label='No Pending Funds to Verify')
-            return
-
-        for fund_id, recipient_name, service_name, amount_needed, proof_of_charge in self.funds_data:
-            desc = f"ID {fund_id} for {recipient_name} ({service_name}, ${amount_needed:.2f})"
-            self.fund_descriptions.append(desc)
-            self.fund_map[desc] = (fund_id, proof_of_charge if proof_of_charge else 'N/A')
-
-        for d in self.fund_descriptions:
-            menu.add_command(label=d, command=tk._setit(self.fund_var, d))
-
-        self.fund_var.set(self.fund_descriptions[0])
-        self.load_current_proof()
+        """Fetches the pending funds in the background using LIB layer."""
+        self.controller.loader.submit(self, 'pending', self._fetch_pending_funds, self._apply_pending_funds)
+
+    def _fetch_pending_funds(self):
+        # Runs on a worker thread: the search index is built here, not on the GUI thread
+        funds_data = self.admin_manager.get_pending_funds_list()
+        return FundSearchIndex(
+            (fund_id, f"ID {fund_id} for {recipient_name} ({service_name}, ${amount_needed:.2f})")
+            for fund_id, recipient_name, service_name, amount_needed in funds_data
+        )
+
+    def _apply_pending_funds(self, index):
+        """Populates the pending funds picker."""
+        self.pending_details.discard()
+        self.pending_picker.set_index(index)
+
+    def with_pending_proofs(self, fund_ids, on_loaded):
+        """Calls on_loaded([(fund_id, proof), ...]) once the proofs of fund_ids are loaded (in the background)."""
+        self.pending_details.get_many(
+            fund_ids, lambda proofs: on_loaded([(fund_id, proofs.get(fund_id) or 'N/A') for fund_id in fund_ids])
+        )
+
+    def select_all_pending(self):
+        """Selects every pending fund matching the filter."""
+        self.pending_picker.select_all()
 
     def load_current_proof(self):
-        """Loads the proof_of_charge for the currently selected fund into the label."""
-        selected_desc = self.fund_var.get()
-        if selected_desc in self.fund_map:
-            _, current_proof = self.fund_map[selected_desc]
-            self.proof_label_text.set(current_proof)
+        """Shows the proof_of_charge of the selected fund, or a count when several are selected."""
+        selection = self.pending_picker.selection()
+        if len(selection) == 1:
+            self.proof_label_text.set("")
+            self.pending_details.get(selection[0], self.pending_picker.results,
+                                     lambda proof: self.proof_label_text.set(proof or 'N/A'))
+        elif selection:
+            self.proof_label_text.set(f"{len(selection)} funds selected")
         else:
             self.proof_label_text.set("")
 
     def open_proof_link(self, event):
         """Opens the proof link in the user's default web browser."""
         link = self.proof_label_text.get()
-        if link and link not in ('N/A', 'Loading Funds...', ''):
+        if link and link != 'N/A' and not link.endswith('funds selected'):
             try:
                 webbrowser.open_new_tab(link)
             except Exception as e:
@@ -263,19 +164,26 @@ class AdminDashboard(tk.Frame):
             messagebox.showinfo('No Proof', 'No proof of charge has been provided by the service provider yet.')
 
     def verify_fund(self):
-        """Uses LIB layer to verify selected fund."""
-        selected_desc = self.fund_var.get()
-        if selected_desc not in self.fund_map:
-            messagebox.showerror('Error', 'Please select a valid fund to verify.')
+        """Uses LIB layer to verify the selected fund(s) in one batch."""
+        selection = self.pending_picker.selection()
+        if not selection:
+            messagebox.showerror('Error', 'Please select at least one fund to verify.')
             return
-
-        fund_id, current_proof = self.fund_map[selected_desc]
-
-        if current_proof == 'N/A':
-            if not messagebox.askyesno('Confirm Verification', 'No proof of charge has been provided for this fund. Do you still wish to verify it?'):
+        # Proofs of a large selection are fetched off the GUI thread; confirm once they are in
+        self.with_pending_proofs(selection, self._confirm_verify)
+
+    def _confirm_verify(self, selected):
+        without_proof = [fund_id for fund_id, proof in selected if proof == 'N/A']
+        if without_proof:
+            if len(selected) == 1:
+                question = 'No proof of charge has been provided for this fund. Do you still wish to verify it?'
+            else:
+                question = (f"{len(without_proof)} of the {len(selected)} selected funds have no proof of charge "
+                            f"(IDs {', '.join(map(str, without_proof))}). Do you still wish to verify them all?")
+            if not messagebox.askyesno('Confirm Verification', question):
                 return
 
-        success, msg = self.admin_manager.verify_fund(fund_id)
+        success, msg, _ = self.admin_manager.verify_funds([fund_id for fund_id, _ in selected])
         if success:
             messagebox.showinfo('Success', msg)
         else:
@@ -286,117 +194,47 @@ class AdminDashboard(tk.Frame):
         self.load_all_funds_table()
 
     def load_all_funds_table(self):
-        """Loads all funds into the Treeview for update/delete."""
-        # Clear current rows
-        for item in self.all_funds_tree.get_children():
-            self.all_funds_tree.delete(item)
-
-        self.all_funds_raw = {}
-        self.selected_fund_id = None
-        self.selected_fund_label.config(text='-')
-        self.edit_amount_entry.delete(0, tk.END)
-        self.edit_proof_entry.delete(0, tk.END)
-
-        rows = self.admin_manager.get_all_funds_list()
-        for row in rows:
-            (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_verified, is_fully_funded, proof_of_charge) = row
-
-            self.all_funds_raw[fund_id] = row
-
-            self.all_funds_tree.insert('', tk.END, values=(
-                fund_id,
-                recipient_name,
-                service_name,
-                f"{amount_needed:.2f}",
-                f"{amount_raised:.2f}",
-                'YES' if is_verified else 'NO',
-                'YES' if is_fully_funded else 'NO',
-            ))
-
-    def on_fund_select(self, event):
-        """When admin selects a row, load into edit fields."""
-        selection = self.all_funds_tree.selection()
-        if not selection:
-            return
-
-        item_id = selection[0]
-        values = self.all_funds_tree.item(item_id, 'values')
-        if not values:
-            return
-
-        try:
-            fund_id = int(values[0])
-        except ValueError:
-            return
-
-        self.selected_fund_id = fund_id
-        self.selected_fund_label.config(text=str(fund_id))
-
-        row = self.all_funds_raw.get(fund_id)
-        if row:
-            amount_needed = row[3]
-            proof = row[7] if row[7] is not None else ''
+        """Reloads the visible part of the update/delete Treeview in the background."""
+        self.fund_details.discard()
+        self.all_funds_list.reset()
+
+    def _on_all_funds_filter(self, values):
+        self.all_funds_query.set_filters(values)
+
+    def _on_all_funds_query(self):
+        self.all_funds_list.first = 0
+        self.all_funds_list.reset()
+
+    def _count_all_funds(self):
+        # Worker thread: options() only copies plain attributes
+        return self.admin_manager.count_all_funds(filters=self.all_funds_query.options()['filters'])
+
+    def _fetch_all_funds_range(self, offset, limit):
+        return self.admin_manager.get_all_funds_range(offset, limit, **self.all_funds_query.options())
+
+    @staticmethod
+    def _format_fund_row(row):
+        """(key, Treeview values) for a fund row."""
+        (fund_id, recipient_name, service_name, amount_needed, amount_raised, is_verified, is_fully_funded) = row
+        return fund_id, (
+            fund_id,
+            recipient_name,
+            service_name,
+            f"{amount_needed:.2f}",
+            f"{amount_raised:.2f}",
+            'YES' if is_verified else 'NO',
+            'YES' if is_fully_funded else 'NO',
+        )
+
+    def _on_all_funds_refreshed(self, removed):
+        """Clears the edit fields if the selected fund was shown and is gone."""
+        if self.selected_fund_id is not None and str(self.selected_fund_id) in removed \
+                and self.all_funds_list.row(self.selected_fund_id) is None:
+            self.selected_fund_id = None
+            self.proof_fund_id = None
+            self.selected_fund_label.config(text='-')
             self.edit_amount_entry.delete(0, tk.END)
-            self.edit_amount_entry.insert(0, str(amount_needed))
             self.edit_proof_entry.delete(0, tk.END)
-            self.edit_proof_entry.insert(0, proof)
-
-    def handle_update_fund(self):
-        """Triggered by 'Update Selected Fund' button."""
-        if not self.selected_fund_id:
-            messagebox.showerror('Error', 'Please select a fund from the table first.')
-            return
-
-        amount_str = self.edit_amount_entry.get()
-        proof = self.edit_proof_entry.get()
-
-        success, msg = self.admin_manager.update_fund(self.selected_fund_id, amount_str, proof)
-        if success:
-            messagebox.showinfo('Success', msg)
-            self.load_all_funds_table()
-            self.load_pending_funds()
-        else:
-            messagebox.showerror('Error', msg)
-
-    def handle_delete_fund(self):
-        """Triggered by 'Delete Selected Fund' button."""
-        if not self.selected_fund_id:
-            messagebox.showerror('Error', 'Please select a fund from the table first.')
-            return
-
-        if not messagebox.askyesno('Confirm Delete', f'Are you sure you want to delete Fund ID {self.selected_fund_id}? This will also remove all associated donations.'):
-            return
-
-        success, msg = self.admin_manager.delete_fund(self.selected_fund_id)
-        if success:
-            messagebox.showinfo('Success', msg)
-            self.load_all_funds_table()
-            self.load_pending_funds()
-        else:
-            messagebox.showerror('Error', msg)
-        self.edit_amount_entry.delete(0, tk.END)
-        self.edit_proof_entry.delete(0, tk.END)
-
-        rows = self.admin_manager.get_all_funds_list()
-        for row in rows:
-            (fund_id, recipient_name, service_name,
-             amount_needed, amount_raised, is_verified,
-             is_fully_funded, proof_of_charge) = row
-
-            self.all_funds_raw[fund_id] = row
-
-            self.all_funds_tree.insert(
-                '', tk.END,
-                values=(
-                    fund_id,
-                    recipient_name,
-                    service_name,
-                    f"{amount_needed:.2f}",
-                    f"{amount_raised:.2f}",
-                    "YES" if is_verified else "NO",
-                    "YES" if is_fully_funded else "NO",
-                )
-            )
 
     def on_fund_select(self, event):
         """When admin selects a row, load into edit fields."""
@@ -412,25 +250,37 @@ class AdminDashboard(tk.Frame):
         try:
             fund_id = int(values[0])
         except ValueError:
-            return
+            return  # placeholder of a row still loading
+        if fund_id == self.selected_fund_id:
+            return  # reselected after scrolling back; keep any edits in progress
 
         self.selected_fund_id = fund_id
         self.selected_fund_label.config(text=str(fund_id))
 
-        row = self.all_funds_raw.get(fund_id)
+        self.proof_fund_id = None
+        self.edit_proof_entry.delete(0, tk.END)
+        row = self.all_funds_list.row(fund_id)
         if row:
             amount_needed = row[3]
-            proof = row[7] if row[7] is not None else ""
             self.edit_amount_entry.delete(0, tk.END)
             self.edit_amount_entry.insert(0, str(amount_needed))
-            self.edit_proof_entry.delete(0, tk.END)
-            self.edit_proof_entry.insert(0, proof)
+        visible = [int(iid) for iid in self.all_funds_tree.get_children() if iid.isdigit()]
+        self.fund_details.get(fund_id, visible, lambda proof: self._show_fund_proof(fund_id, proof))
+
+    def _show_fund_proof(self, fund_id, proof):
+        """Fills the proof field once the selected fund's proof_of_charge is loaded."""
+        self.proof_fund_id = fund_id
+        self.edit_proof_entry.delete(0, tk.END)
+        self.edit_proof_entry.insert(0, proof if proof is not None else "")
 
     def handle_update_fund(self):
         """Triggered by 'Update Selected Fund' button."""
         if not self.selected_fund_id:
             messagebox.showerror("Error", "Please select a fund from the table first.")
             return
+        if self.proof_fund_id != self.selected_fund_id:
+            messagebox.showerror("Error", "The fund's details are still loading. Please try again.")
+            return
 
         amount_str = self.edit_amount_entry.get()
         proof = self.edit_proof_entry.get()
@@ -1,15 +1,27 @@
 """Core GUI frames: MainWindow, LoginWindow, RegistrationWindow."""
 
+import os
 import tkinter as tk
 from tkinter import messagebox, ttk
 from FundRaiseDAL import DAL_core
 from FundRaiseLIB import LIB_core
+from FundRaiseGUI.GUI_widgets import FilterBar, KeyedTreeview, TableQuery, TreeviewPager
+
+
+# Rows shown in the "Latest Donations" panel
+LATEST_DONATIONS = 10
+# Poll for new donations every N ms while the main window is shown (0 = off),
+# e.g. FUNDRAISE_BOARD_POLL_MS=5000 for a wall display
+DONATION_POLL_MS = int(os.environ.get('FUNDRAISE_BOARD_POLL_MS', '0'))
 
 
 class MainWindow(tk.Frame):
     def __init__(self, master, controller):
         super().__init__(master)
         self.controller = controller
+        # Highest donation_id shown in the donations panel; only newer rows are fetched
+        self.latest_donation_id = None
+        self._poll_job = None
 
         tk.Label(self, text="Fundraising Platform", font=("Arial", 24, "bold")).pack(pady=10)
 
@@ -27,15 +39,31 @@ class MainWindow(tk.Frame):
         tk.Label(self, text="Latest Donations", font=("Arial", 16, "underline")).pack(pady=10)
         self.create_donations_table()
 
+    def refresh(self):
+        """Called by the controller each time the frame is shown."""
         self.load_data()
+        if DONATION_POLL_MS > 0 and self._poll_job is None:
+            self._poll_job = self.after(DONATION_POLL_MS, self._poll_donations)
 
     def create_funds_table(self):
         columns = ('#ID', 'Recipient', 'Service', 'Needed', 'Raised', 'Funded')
+        self.funds_filter = FilterBar(self, [('name', "Recipient/Service:", None),
+                                             ('funded', "Funded:", [("Any", None), ("Yes", True), ("No", False)])],
+                                      self._on_funds_filter)
+        self.funds_filter.pack(padx=20)
         self.funds_tree = ttk.Treeview(self, columns=columns, show='headings', height=5)
         for col in columns:
             self.funds_tree.heading(col, text=col)
             self.funds_tree.column(col, anchor=tk.CENTER, width=70 if col in ('#ID', 'Funded') else 120)
         self.funds_tree.pack(padx=20, pady=5)
+        # Sorting and filtering run in the query; a change reloads from the first page
+        self.funds_query = TableQuery(self.funds_tree, {'#ID': 'fund_id', 'Recipient': 'recipient', 'Service': 'service',
+                                                        'Needed': 'needed', 'Raised': 'raised'},
+                                      lambda: self.funds_pager.reset(), sort='fund_id', descending=True)
+        # Funds are paged in as the table is scrolled
+        self.funds_view = KeyedTreeview(self.funds_tree)
+        self.funds_pager = TreeviewPager(self, self.funds_tree, 'funds', self._fetch_funds_page, self._apply_funds,
+                                         view=self.funds_view)
 
     def create_donations_table(self):
         columns = ('#D_ID', '#F_ID', 'Donor', 'Amount', 'Date')
@@ -46,35 +74,69 @@ class MainWindow(tk.Frame):
         self.donations_tree.pack(padx=20, pady=5)
 
     def load_data(self):
-        # Clear existing data
-        for item in self.funds_tree.get_children():
-            self.funds_tree.delete(item)
-        for item in self.donations_tree.get_children():
-            self.donations_tree.delete(item)
-
+        """Reloads the funds table and adds new donations, in the background.
+
+        Funds arrive one page at a time; the donations panel only fetches rows
+        newer than the ones it already shows.
+        """
+        self.funds_pager.reset()
+        self.load_new_donations()
+
+    def load_new_donations(self):
+        self.controller.loader.submit(self, 'donations', self._fetch_donations, self._apply_donations,
+                                      self.latest_donation_id)
+
+    def _poll_donations(self):
+        self._poll_job = None
+        if self.controller.current_frame is not self:
+            return  # polling resumes on the next refresh()
+        self.load_new_donations()
+        self._poll_job = self.after(DONATION_POLL_MS, self._poll_donations)
+
+    def _on_funds_filter(self, values):
+        self.funds_query.set_filters(values)
+
+    def _fetch_funds_page(self, after):
+        # Runs on a worker thread: no widget access here (options() only copies plain attributes)
         # Load FundsNeeded - Simple fetch remains in DAL
+        # Errors propagate to the pager, which keeps the rows already shown
+        options = self.funds_query.options()
+        funds_data = DAL_core.fetch_funds_data(after=after, limit=LIB_core.PAGE_SIZE, **options)
+        key = LIB_core.sort_key(DAL_core.BOARD_SORTS, options['sort'], 'fund_id')
+        return LIB_core.page_result(funds_data, LIB_core.PAGE_SIZE, key=key)
+
+    @staticmethod
+    def _fetch_donations(after_donation_id):
+        # Load Donations - Simple fetch remains in DAL
         try:
-            funds_data = DAL_core.fetch_funds_data()
+            return DAL_core.fetch_donations_since(after_donation_id, limit=LATEST_DONATIONS)
         except Exception:
-            funds_data = []
+            return []
 
+    def _apply_funds(self, funds_data, first_page):
+        # Diffed into the tree: unchanged rows are not touched on a refresh
+        rows = []
         for fund in funds_data:
             needed = f"${fund[3]:.2f}"
             raised = f"${fund[4]:.2f}"
             funded = "YES" if fund[5] else "NO"
-            self.funds_tree.insert('', tk.END, values=(fund[0], fund[1], fund[2], needed, raised, funded))
+            rows.append((fund[0], (fund[0], fund[1], fund[2], needed, raised, funded)))
+        self.funds_view.apply(rows)
 
-        # Load Donations - Simple fetch remains in DAL
-        try:
-            donations_data = DAL_core.fetch_donations_data()
-        except Exception:
-            donations_data = []
-
-        for donation in donations_data:
+    def _apply_donations(self, donations_data):
+        """Prepends the new donations (newest first) and drops the oldest rows."""
+        if not donations_data:
+            return
+        # Oldest first, each inserted at the top
+        for donation in reversed(donations_data):
             donor_name = donation[2] if donation[2] is not None else "Anonymous"
             amount = f"${donation[3]:.2f}"
             date_str = donation[4].strftime("%Y-%m-%d") if donation[4] else "N/A"
-            self.donations_tree.insert('', tk.END, values=(donation[0], donation[1], donor_name, amount, date_str))
+            self.donations_tree.insert('', 0, values=(donation[0], donation[1], donor_name, amount, date_str))
+        dropped = self.donations_tree.get_children()[LATEST_DONATIONS:]
+        if dropped:
+            self.donations_tree.delete(*dropped)
+        self.latest_donation_id = donations_data[0][0]
 
 
 class LoginWindow(tk.Frame):
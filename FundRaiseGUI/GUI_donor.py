@@ -1,6 +1,9 @@
+import uuid
 import tkinter as tk
 from tkinter import messagebox, ttk
 from FundRaiseLIB import LIB_donor
+from FundRaiseLIB.LIB_search import FundSearchIndex
+from FundRaiseGUI.GUI_widgets import FilterBar, FundPicker, KeyedTreeview, TableQuery, TreeviewPager
 
 
 class DonorDashboard(tk.Frame):
@@ -14,6 +17,8 @@ class DonorDashboard(tk.Frame):
 
         self.selected_donation_id = None
         self.my_donations_raw = {}
+        # (form values, idempotency key) of the last submission that did not succeed
+        self.pending_submission = None
 
         tk.Label(self, text="Donor Dashboard", font=("Arial", 18, "bold")).pack(pady=8)
         btn_frame = tk.Frame(self)
@@ -26,11 +31,10 @@ class DonorDashboard(tk.Frame):
         form_frame = tk.Frame(self)
         form_frame.pack(padx=20, pady=6, fill='x')
 
-        tk.Label(form_frame, text="Select Fund:").grid(row=0, column=0, sticky='w')
-        self.fund_var = tk.StringVar(self)
-        self.fund_var.set("Loading Active Funds...")
-        self.fund_menu = tk.OptionMenu(form_frame, self.fund_var, "Loading Active Funds...")
-        self.fund_menu.grid(row=0, column=1, sticky='ew')
+        # Type to filter the active funds by recipient, description or ID
+        tk.Label(form_frame, text="Select Fund:").grid(row=0, column=0, sticky='nw')
+        self.fund_picker = FundPicker(form_frame, height=5, empty_text='No active funds')
+        self.fund_picker.grid(row=0, column=1, sticky='ew')
 
         tk.Label(form_frame, text="Donation Amount ($):").grid(row=1, column=0, sticky='w')
         self.amount_entry = tk.Entry(form_frame, width=20)
@@ -44,6 +48,11 @@ class DonorDashboard(tk.Frame):
 
         # My donations
         tk.Label(self, text="Your Donations (Update / Delete)", font=("Arial", 14, "underline")).pack(pady=6)
+        self.my_donations_filter = FilterBar(self, [('fund_id', "Fund ID:", None),
+                                                    ('status', "Status:", [("Any", None), ("Pending", 'Pending'),
+                                                                           ("Completed", 'Completed')])],
+                                             self._on_my_donations_filter)
+        self.my_donations_filter.pack(padx=20)
         crud_frame = tk.Frame(self)
         crud_frame.pack(padx=20, pady=6, fill='both', expand=True)
 
@@ -54,6 +63,15 @@ class DonorDashboard(tk.Frame):
             self.my_donations_tree.column(col, anchor=tk.CENTER, width=100)
         self.my_donations_tree.pack(fill='both', expand=True)
         self.my_donations_tree.bind('<<TreeviewSelect>>', self.on_donation_select)
+        # Donations are paged in as the table is scrolled
+        self.my_donations_view = KeyedTreeview(self.my_donations_tree)
+        self.my_donations_pager = TreeviewPager(self, self.my_donations_tree, 'my_donations',
+                                                self._fetch_my_donations_page, self._apply_my_donations,
+                                                view=self.my_donations_view,
+                                                on_refreshed=self._on_my_donations_refreshed)
+        self.my_donations_query = TableQuery(self.my_donations_tree, {'fund_id': 'fund_id', 'amount': 'amount',
+                                                                      'date': 'date'},
+                                             lambda: self.my_donations_pager.reset(), sort='date', descending=True)
 
         edit_frame = tk.Frame(self)
         edit_frame.pack(pady=6)
@@ -68,36 +86,24 @@ class DonorDashboard(tk.Frame):
         tk.Button(edit_frame, text="Update", command=self.handle_update_donation).grid(row=2, column=0, pady=6)
         tk.Button(edit_frame, text="Delete", command=self.handle_delete_donation).grid(row=2, column=1, pady=6)
 
-        # Load initial data
+    def refresh(self):
+        """Called by the controller each time the frame is shown."""
+        # The frame is reused across logins; never carry a key over to the next session
+        self.pending_submission = None
         self.load_funds()
         self.load_my_donations_table()
 
     def load_funds(self):
-        try:
-            funds = self.manager.get_active_funds_list()
-        except Exception:
-            funds = []
-
-        self.fund_id_map = {}
-        descriptions = []
-        for f in funds:
-            fid = f[0]
-            desc = f"{f[1]} - {f[2]} (${f[3]:.2f} needed)"
-            descriptions.append(desc)
-            self.fund_id_map[desc] = fid
-
-        menu = self.fund_menu['menu']
-        menu.delete(0, 'end')
-        if descriptions:
-            for d in descriptions:
-                menu.add_command(label=d, command=lambda value=d: self.fund_var.set(value))
-            self.fund_var.set(descriptions[0])
-        else:
-            menu.add_command(label='No active funds', command=lambda: None)
-            self.fund_var.set('No active funds')
+        self.controller.loader.submit(self, 'funds', self._fetch_funds, self.fund_picker.set_index,
+                                      on_error=lambda exc: self.fund_picker.set_index(FundSearchIndex()))
+
+    def _fetch_funds(self):
+        # Runs on a worker thread: the search index is built here, not on the GUI thread
+        funds = self.manager.get_active_funds_list()
+        return FundSearchIndex((f[0], f"{f[1]} - {f[2]} (${f[3]:.2f} needed)") for f in funds)
 
     def submit_donation(self):
-        fund_description = self.fund_var.get()
+        fund_id = self.fund_picker.get()
         amount_str = self.amount_entry.get().strip()
         is_anonymous = bool(self.is_anonymous_var.get())
 
@@ -113,8 +119,18 @@ class DonorDashboard(tk.Frame):
             messagebox.showerror("Error", "Enter a valid positive number for the amount.")
             return
 
-        success, message = self.manager.submit_donation(fund_description, amount, is_anonymous, self.fund_id_map, self.user_id)
+        # Submitting the same form again (e.g. after a timeout) reuses its key,
+        # so the donation cannot be recorded twice. The key names the donor, so
+        # another donor's identical form (even anonymous) never matches it.
+        form = (self.user_id, fund_id, amount, is_anonymous)
+        if self.pending_submission is None or self.pending_submission[0] != form:
+            self.pending_submission = (form, f"{self.user_id}:{uuid.uuid4().hex}")
+        idempotency_key = self.pending_submission[1]
+
+        success, message = self.manager.submit_donation(fund_id, amount, is_anonymous, self.fund_picker.index,
+                                                        self.user_id, idempotency_key=idempotency_key)
         if success:
+            self.pending_submission = None
             messagebox.showinfo("Success", message)
             self.amount_entry.delete(0, tk.END)
             self.is_anonymous_var.set(False)
@@ -123,23 +139,33 @@ class DonorDashboard(tk.Frame):
             messagebox.showerror("Error", message)
 
     def load_my_donations_table(self):
-        for item in self.my_donations_tree.get_children():
-            self.my_donations_tree.delete(item)
-        self.my_donations_raw = {}
-        self.selected_donation_id = None
-        self.selected_donation_label.config(text='-')
-        self.edit_amount_entry.delete(0, tk.END)
+        self.my_donations_pager.reset()
 
-        try:
-            rows = self.manager.get_my_donations(self.user_id)
-        except Exception:
-            rows = []
+    def _on_my_donations_filter(self, values):
+        # A fund id that is not a number yet filters nothing
+        if not values['fund_id'].isdigit():
+            values['fund_id'] = None
+        self.my_donations_query.set_filters(values)
 
+    def _fetch_my_donations_page(self, after):
+        return self.manager.get_my_donations_page(self.user_id, after, **self.my_donations_query.options())
+
+    def _apply_my_donations(self, rows, first_page=True):
+        keyed = []
         for row in rows:
             donation_id, fund_id, donation_amount, payment_status, donation_date = row
             self.my_donations_raw[donation_id] = row
             date_str = donation_date.strftime("%Y-%m-%d") if donation_date else "N/A"
-            self.my_donations_tree.insert('', tk.END, values=(donation_id, fund_id, f"{float(donation_amount):.2f}", payment_status, date_str))
+            keyed.append((donation_id, (donation_id, fund_id, f"{float(donation_amount):.2f}", payment_status, date_str)))
+        self.my_donations_view.apply(keyed)
+
+    def _on_my_donations_refreshed(self, removed):
+        for iid in removed:
+            self.my_donations_raw.pop(int(iid), None)
+        if self.selected_donation_id is not None and self.selected_donation_id not in self.my_donations_view:
+            self.selected_donation_id = None
+            self.selected_donation_label.config(text='-')
+            self.edit_amount_entry.delete(0, tk.END)
 
     def on_donation_select(self, event):
         selection = self.my_donations_tree.selection()
@@ -66,7 +66,9 @@ class ProfileWindow(tk.Frame):
             messagebox.showerror("Error", "No user logged in.")
             return
         self.user_id = self.controller.user_id
-        profile = self.pm.get_profile(self.user_id)
+        self.controller.loader.submit(self, 'profile', self.pm.get_profile, self._apply_profile, self.user_id)
+
+    def _apply_profile(self, profile):
         if not profile:
             messagebox.showerror("Error", "Could not load profile.")
             return
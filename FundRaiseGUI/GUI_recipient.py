@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 from FundRaiseLIB.LIB_recipient import RecipientManager
 from .GUI_core import MainWindow
+from .GUI_widgets import DetailLoader, FilterBar, KeyedTreeview, TableQuery, TreeviewPager
 
 
 class RecipientDashboard(tk.Frame):
@@ -14,6 +15,10 @@ class RecipientDashboard(tk.Frame):
         # Track selected fund in "My Funds" table
         self.selected_fund_id = None
         self.my_funds_raw = {}
+        self.proof_fund_id = None   # fund whose proof is in the edit field
+        # proof_of_charge is not in the fund list; it is loaded for the selected fund and its neighbours
+        self.fund_details = DetailLoader(self, 'fund_details',
+                                         lambda fund_ids: self.manager.get_fund_details(self.user_id, fund_ids))
 
         tk.Label(self, text="Recipient Dashboard", font=("Arial", 18, "bold")).pack(pady=10)
         btn_frame = tk.Frame(self)
@@ -28,19 +33,15 @@ class RecipientDashboard(tk.Frame):
 
         tk.Label(form_frame, text="Service Provider:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
 
-        self.services_data = self.manager.get_services_data()  # LIB call
-        self.service_names = [name for id, name in self.services_data]
-        self.service_map = {name: id for id, name in self.services_data}
+        self.services_data = []
+        self.service_names = []
+        self.service_map = {}
 
         self.service_var = tk.StringVar(self)
-        initial_options = self.service_names if self.service_names else ["No Services Available"]
-        if self.service_names:
-            self.service_var.set(self.service_names[0])
-        else:
-            self.service_var.set(initial_options[0])
+        self.service_var.set("Loading Services...")
 
-        service_menu = tk.OptionMenu(form_frame, self.service_var, *initial_options)
-        service_menu.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        self.service_menu = tk.OptionMenu(form_frame, self.service_var, "Loading Services...")
+        self.service_menu.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
 
         tk.Label(form_frame, text="Amount Needed ($):").grid(row=1, column=0, padx=5, pady=5, sticky='w')
         self.amount_entry = tk.Entry(form_frame, width=20)
@@ -55,6 +56,11 @@ class RecipientDashboard(tk.Frame):
         # Section: existing funds table (allows update/delete)
         tk.Label(self, text="Your Existing Funds (Update / Delete)", font=("Arial", 14, "underline")).pack(pady=10)
 
+        self.my_funds_filter = FilterBar(self, [('status', "Status:", [("Any", None), ("Pending", 'pending'),
+                                                                       ("Active", 'active'), ("Funded", 'funded')])],
+                                         self._on_my_funds_filter)
+        self.my_funds_filter.pack(padx=20)
+
         crud_frame = tk.Frame(self)
         crud_frame.pack(padx=20, pady=10, fill='both', expand=True)
 
@@ -69,7 +75,13 @@ class RecipientDashboard(tk.Frame):
         self.my_funds_tree.grid(row=0, column=0, columnspan=3, sticky='nsew', pady=5)
 
         scrollbar = tk.Scrollbar(crud_frame, orient="vertical", command=self.my_funds_tree.yview)
-        self.my_funds_tree.configure(yscrollcommand=scrollbar.set)
+        self.my_funds_view = KeyedTreeview(self.my_funds_tree)
+        self.my_funds_pager = TreeviewPager(self, self.my_funds_tree, 'my_funds', self._fetch_my_funds_page,
+                                            self._apply_my_funds, scrollbar=scrollbar, view=self.my_funds_view,
+                                            on_refreshed=self._on_my_funds_refreshed)
+        self.my_funds_query = TableQuery(self.my_funds_tree, {'fund_id': 'fund_id', 'needed': 'needed',
+                                                              'raised': 'raised'},
+                                         lambda: self.my_funds_pager.reset(), sort='fund_id', descending=True)
         scrollbar.grid(row=0, column=3, sticky='ns')
 
         crud_frame.grid_rowconfigure(0, weight=1)
@@ -94,9 +106,28 @@ class RecipientDashboard(tk.Frame):
         tk.Button(crud_frame, text="Update Selected Fund", command=self.handle_update_fund).grid(row=4, column=0, padx=5, pady=10, sticky='e')
         tk.Button(crud_frame, text="Delete Selected Fund", command=self.handle_delete_fund).grid(row=4, column=1, padx=5, pady=10, sticky='w')
 
-        # Load data
+    def refresh(self):
+        """Called by the controller each time the frame is shown."""
+        self.load_services()
         self.load_my_funds_table()
 
+    def load_services(self):
+        """Fetches the service providers in the background."""
+        self.controller.loader.submit(self, 'services', self.manager.get_services_data, self._apply_services)  # LIB call
+
+    def _apply_services(self, services_data):
+        """Populates the service provider dropdown."""
+        self.services_data = services_data
+        self.service_names = [name for id, name in self.services_data]
+        self.service_map = {name: id for id, name in self.services_data}
+
+        options = self.service_names if self.service_names else ["No Services Available"]
+        menu = self.service_menu['menu']
+        menu.delete(0, 'end')
+        for name in options:
+            menu.add_command(label=name, command=tk._setit(self.service_var, name))
+        self.service_var.set(options[0])
+
     def create_fund(self):
         if not self.user_id:
             messagebox.showerror("Error", "Recipient ID is missing. Please log in again.")
@@ -122,24 +153,25 @@ class RecipientDashboard(tk.Frame):
             messagebox.showerror("Error", message)
 
     def load_my_funds_table(self):
-        """Load all funds created by this recipient."""
-        for item in self.my_funds_tree.get_children():
-            self.my_funds_tree.delete(item)
+        """Load the funds created by this recipient in the background, one page at a time."""
+        self.fund_details.discard()
+        self.my_funds_pager.reset()
 
-        self.my_funds_raw = {}
-        self.selected_fund_id = None
-        self.selected_fund_label.config(text="-")
-        self.edit_amount_entry.delete(0, tk.END)
-        self.edit_proof_entry.delete(0, tk.END)
+    def _on_my_funds_filter(self, values):
+        self.my_funds_query.set_filters(values)
+
+    def _fetch_my_funds_page(self, after):
+        return self.manager.get_recipient_funds_page(self.user_id, after, **self.my_funds_query.options())
 
-        rows = self.manager.get_recipient_funds(self.user_id)
+    def _apply_my_funds(self, rows, first_page=True):
+        keyed = []
         for row in rows:
-            (fund_id, service_name, amount_needed, amount_raised, is_verified, is_fully_funded, proof_of_charge) = row
+            (fund_id, service_name, amount_needed, amount_raised, is_verified, is_fully_funded) = row
             self.my_funds_raw[fund_id] = row
 
-            self.my_funds_tree.insert(
-                '', tk.END,
-                values=(
+            keyed.append((
+                fund_id,
+                (
                     fund_id,
                     service_name,
                     f"{amount_needed:.2f}",
@@ -147,7 +179,18 @@ class RecipientDashboard(tk.Frame):
                     "YES" if is_verified else "NO",
                     "YES" if is_fully_funded else "NO",
                 )
-            )
+            ))
+        self.my_funds_view.apply(keyed)
+
+    def _on_my_funds_refreshed(self, removed):
+        for iid in removed:
+            self.my_funds_raw.pop(int(iid), None)
+        if self.selected_fund_id is not None and self.selected_fund_id not in self.my_funds_view:
+            self.selected_fund_id = None
+            self.proof_fund_id = None
+            self.selected_fund_label.config(text="-")
+            self.edit_amount_entry.delete(0, tk.END)
+            self.edit_proof_entry.delete(0, tk.END)
 
     def on_fund_select(self, event):
         selection = self.my_funds_tree.selection()
@@ -165,19 +208,29 @@ class RecipientDashboard(tk.Frame):
         self.selected_fund_id = fund_id
         self.selected_fund_label.config(text=str(fund_id))
 
+        self.proof_fund_id = None
+        self.edit_proof_entry.delete(0, tk.END)
         row = self.my_funds_raw.get(fund_id)
         if row:
             amount_needed = row[2]
-            proof = row[6] if row[6] is not None else ""
             self.edit_amount_entry.delete(0, tk.END)
             self.edit_amount_entry.insert(0, str(amount_needed))
-            self.edit_proof_entry.delete(0, tk.END)
-            self.edit_proof_entry.insert(0, proof)
+        shown = [int(iid) for iid in self.my_funds_tree.get_children()]
+        self.fund_details.get(fund_id, shown, lambda proof: self._show_fund_proof(fund_id, proof))
+
+    def _show_fund_proof(self, fund_id, proof):
+        """Fills the proof field once the selected fund's proof_of_charge is loaded."""
+        self.proof_fund_id = fund_id
+        self.edit_proof_entry.delete(0, tk.END)
+        self.edit_proof_entry.insert(0, proof if proof is not None else "")
 
     def handle_update_fund(self):
         if not self.selected_fund_id:
             messagebox.showerror("Error", "Please select a fund from the table first.")
             return
+        if self.proof_fund_id != self.selected_fund_id:
+            messagebox.showerror("Error", "The fund's details are still loading. Please try again.")
+            return
 
         amount_str = self.edit_amount_entry.get()
         proof = self.edit_proof_entry.get()
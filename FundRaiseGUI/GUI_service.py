@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox
 from FundRaiseLIB import LIB_service
+from FundRaiseLIB.LIB_search import FundSearchIndex
 from .GUI_core import MainWindow
+from .GUI_widgets import DetailLoader, FundPicker
 
 class ServiceDashboard(tk.Frame):
     def __init__(self, master, controller, user_id):
@@ -20,77 +22,72 @@ class ServiceDashboard(tk.Frame):
         form_frame = tk.Frame(self)
         form_frame.pack(padx=20, pady=10, fill='x')
 
-        tk.Label(form_frame, text="Select Fund to Update:").grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        tk.Label(form_frame, text="Select Fund to Update:").grid(row=0, column=0, padx=5, pady=5, sticky='nw')
         
-        self.funds_data = [] 
-        self.fund_descriptions = []
-        self.fund_map = {} 
+        self.proof_fund_id = None   # fund whose proof is in the entry field
+        # proof_of_charge is not in the fund list; it is loaded for the chosen fund and its neighbours
+        self.fund_details = DetailLoader(self, 'fund_details',
+                                         lambda fund_ids: self.manager.get_fund_details(self.user_id, fund_ids))
         
-        self.fund_var = tk.StringVar(self)
-        self.fund_var.set("Loading Funds...")
-
-        self.fund_menu = tk.OptionMenu(form_frame, self.fund_var, *['Loading Funds...'])
-        self.fund_menu.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        # Type to filter by fund ID or recipient
+        self.fund_picker = FundPicker(form_frame, height=5, on_select=self.load_current_proof,
+                                      empty_text="No Funds Assigned to Your Service")
+        self.fund_picker.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
         
         tk.Label(form_frame, text="Proof of Charge (URL):").grid(row=1, column=0, padx=5, pady=5, sticky='w')
         self.proof_entry = tk.Entry(form_frame, width=40)
         self.proof_entry.grid(row=1, column=1, padx=5, pady=5, sticky='ew')
 
         tk.Button(form_frame, text="Update Proof of Charge", command=self.update_proof, bg='orange', fg='white').grid(row=2, columnspan=2, pady=15)
-        
-        self.fund_var.trace_add("write", lambda *args: self.load_current_proof())        
+
+    def refresh(self):
+        """Called by the controller each time the frame is shown."""
         self.load_funds()
 
     def load_funds(self):
-        """Fetches and populates the fund selection dropdown using BLL."""
+        """Fetches the funds assigned to this service in the background using BLL."""
         # LIB call
-        self.funds_data = self.manager.get_funds_assigned_to_service(self.user_id)
-        
-        self.fund_descriptions = []
-        self.fund_map = {}
-        
-        menu = self.fund_menu.children['menu']
-        menu.delete(0, "end")
-        
-        if not self.funds_data:
-            self.fund_var.set("No Funds Assigned to Your Service")
-            self.proof_entry.delete(0, tk.END)
-            menu.add_command(label="No Funds Assigned to Your Service")
-            return
-        
-        for fund_id, recipient_name, amount_needed, proof_of_charge in self.funds_data:
-            description = f"Fund ID {fund_id} for {recipient_name} (${amount_needed:.2f})"
-            self.fund_descriptions.append(description)
-            self.fund_map[description] = (fund_id, proof_of_charge if proof_of_charge else '')
-            
-        for fund_desc in self.fund_descriptions:
-            menu.add_command(label=fund_desc, command=tk._setit(self.fund_var, fund_desc))
-            
-        self.fund_var.set(self.fund_descriptions[0])
-        self.load_current_proof()
+        self.controller.loader.submit(self, 'funds', self._fetch_funds, self._apply_funds, self.user_id)
+
+    def _fetch_funds(self, user_id):
+        # Runs on a worker thread: the search index is built here, not on the GUI thread
+        funds_data = self.manager.get_funds_assigned_to_service(user_id)
+        return FundSearchIndex((fund_id, f"Fund ID {fund_id} for {recipient_name} (${amount_needed:.2f})")
+                               for fund_id, recipient_name, amount_needed in funds_data)
+
+    def _apply_funds(self, index):
+        """Populates the fund picker."""
+        self.fund_details.discard()
+        self.proof_fund_id = None
+        self.fund_picker.set_index(index)
         
     def load_current_proof(self):
         """Loads the proof_of_charge for the currently selected fund into the entry field (GUI logic)."""
-        selected_desc = self.fund_var.get()
-        if selected_desc in self.fund_map:
-            fund_id, current_proof = self.fund_map[selected_desc]
-            self.proof_entry.delete(0, tk.END)
-            self.proof_entry.insert(0, current_proof)
-        else:
-            self.proof_entry.delete(0, tk.END)
+        fund_id = self.fund_picker.get()
+        if fund_id == self.proof_fund_id and fund_id is not None:
+            return  # same fund still chosen while filtering; keep the edit in progress
+        self.proof_fund_id = fund_id
+        self.proof_entry.delete(0, tk.END)
+        if fund_id is not None:
+            self.fund_details.get(fund_id, self.fund_picker.results, self._show_proof)
+
+    def _show_proof(self, proof):
+        # Arrives after the selection when not prefetched; do not overwrite a link already being typed
+        if proof and not self.proof_entry.get():
+            self.proof_entry.insert(0, proof)
             
     def update_proof(self):
         """DELEGATE PROOF UPDATE to LIB."""
-        selected_desc = self.fund_var.get()
+        fund_id = self.fund_picker.get()
         new_proof = self.proof_entry.get()
         
-        if selected_desc not in self.fund_map or not self.user_id:
+        if fund_id is None or not self.user_id:
             messagebox.showerror("Error", "Please select a valid fund.")
             return
         
         # DELEGATE to LIB
         success, message = self.manager.update_fund_proof(
-            selected_desc, new_proof, self.user_id, self.fund_map
+            fund_id, new_proof, self.user_id, self.fund_picker.index
         )
         
         if success:
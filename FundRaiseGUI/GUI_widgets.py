@@ -0,0 +1,744 @@
+"""Reusable widgets and helpers shared by the dashboard frames."""
+
+import tkinter as tk
+from bisect import bisect_left
+from collections import OrderedDict
+from tkinter import ttk
+
+from FundRaiseLIB.LIB_search import FundSearchIndex
+
+
+class TreeviewPager:
+    """Loads a Treeview one page at a time as the user scrolls towards the end.
+
+    fetch_page(after) runs on the controller's BackgroundLoader and must
+    return (rows, next_after) as the LIB *_page methods do. on_rows(rows,
+    first_page) is called on the main thread to insert the rows; it should
+    clear the tree when first_page is True, unless a KeyedTreeview is given
+    as view, in which case it passes the rows to view.apply() and reset()
+    updates the tree in place.
+    """
+
+    def __init__(self, owner, tree, key, fetch_page, on_rows, scrollbar=None, threshold=0.9,
+                 view=None, on_refreshed=None):
+        self.owner = owner
+        self.tree = tree
+        self.key = key
+        self.fetch_page = fetch_page
+        self.on_rows = on_rows
+        self.scrollbar = scrollbar
+        self.threshold = threshold
+        self.view = view
+        self.on_refreshed = on_refreshed
+
+        self.next_after = None
+        self.exhausted = True
+        self.loading = False
+        self.refreshing = False
+        self._refresh_target = 0
+        tree.configure(yscrollcommand=self._on_view_change)
+
+    def reset(self):
+        """Fetches the pages again from the first one.
+
+        With a KeyedTreeview as view, the rows already shown stay in place:
+        pages are fetched until they cover as many rows as were displayed,
+        each is diffed into the tree, and rows that did not come back are
+        removed at the end. on_refreshed(removed_keys) is then called.
+        """
+        self.next_after = None
+        self.exhausted = False
+        if self.view is not None:
+            self._refresh_target = len(self.view)
+            self.refreshing = True
+            self.view.begin()
+        self._load(first_page=True)
+
+    def load_more(self):
+        """Fetches the next page unless one is in flight or the end was reached."""
+        if self.loading or self.exhausted:
+            return
+        self._load(first_page=False)
+
+    def _load(self, first_page):
+        self.loading = True
+        loader = self.owner.controller.loader
+        loader.submit(self.owner, self.key, self.fetch_page, lambda page: self._apply(page, first_page),
+                      self.next_after, on_error=self._on_error)
+
+    def _apply(self, page, first_page):
+        rows, next_after = page
+        self.loading = False
+        self.next_after = next_after
+        self.exhausted = next_after is None
+        self.on_rows(rows, first_page)
+        if self.refreshing:
+            if self.exhausted or self.view.position >= self._refresh_target:
+                self.refreshing = False
+                removed = self.view.finish()
+                if self.on_refreshed is not None:
+                    self.on_refreshed(removed)
+            else:
+                self._load(first_page=False)
+
+    def _on_error(self, exc):
+        self.loading = False
+        self.exhausted = True
+        if self.refreshing:
+            self.refreshing = False
+            self.view.finish(prune=False)   # keep the rows not yet re-read rather than drop them
+        self.owner.controller.report_callback_exception(type(exc), exc, exc.__traceback__)
+
+    def _on_view_change(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        # Also fires when rows are inserted, so a short first page keeps
+        # pulling pages until the visible area is filled.
+        if float(last) >= self.threshold:
+            self.owner.after_idle(self.load_more)
+
+
+class KeyedTreeview:
+    """Updates a Treeview from keyed rows by diffing instead of clear-and-rebuild.
+
+    Items use str(key) as their Treeview iid. A refresh pass is begin(),
+    one or more apply(rows) calls with the rows in display order, then
+    finish(): unchanged rows are left alone and changed values are updated
+    in place as they arrive; at finish() rows that did not come back are
+    deleted, new rows inserted and only the rows whose relative order
+    changed are moved (those outside a longest run already in order).
+    Selection, focus and scroll position survive. Outside a pass, apply()
+    appends (e.g. further pages).
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._order = []    # iids in display order, mirrors the tree
+        self._values = {}   # iid -> values tuple last written
+        self._pass = None   # iids applied in the current pass, in order
+        self._new = {}      # iid -> values of rows the pass will insert
+        self.position = 0   # index where the next applied row goes
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, key):
+        return str(key) in self._values
+
+    def begin(self):
+        self._pass = []
+        self._new = {}
+        self.position = 0
+
+    def apply(self, rows):
+        """rows: iterable of (key, values). Returns (inserted, updated).
+
+        Inside a pass, inserted counts the rows finish() will insert.
+        """
+        inserted = updated = 0
+        for key, values in rows:
+            iid = str(key)
+            values = tuple(values)
+            if iid in self._values:
+                if self._values[iid] != values:
+                    self.tree.item(iid, values=values)
+                    self._values[iid] = values
+                    updated += 1
+            elif self._pass is not None:
+                self._new[iid] = values
+                inserted += 1
+            else:
+                self.tree.insert('', 'end', iid=iid, values=values)
+                self._order.append(iid)
+                self._values[iid] = values
+                inserted += 1
+            if self._pass is not None:
+                self._pass.append(iid)
+            self.position += 1
+        return inserted, updated
+
+    def finish(self, prune=True):
+        """Ends a refresh pass. Returns the keys (as str) of the rows deleted.
+
+        With prune=False (e.g. the pass was cut short by an error) rows the
+        pass did not see are kept, after the ones it did.
+        """
+        order, self._pass = self._pass, None
+        new, self._new = self._new, {}
+        if order is None:
+            return []
+        order = list(dict.fromkeys(order))
+        seen = set(order)
+        removed = [iid for iid in self._order if iid not in seen]
+        if not prune:
+            order += removed
+            removed = []
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self._values[iid]
+
+        old_index = {iid: index for index, iid in enumerate(self._order)}
+        stay = self._in_order(order, old_index)
+        # Detach the rows to move so only rows already in order remain, then
+        # put each one back (or insert it) at its index, front to back
+        moving = [iid for iid in order if iid in old_index and iid not in stay]
+        if moving:
+            selection = self.tree.selection()
+            self.tree.detach(*moving)
+        for index, iid in enumerate(order):
+            if iid in new:
+                self.tree.insert('', index, iid=iid, values=new[iid])
+                self._values[iid] = new[iid]
+            elif iid not in stay:
+                self.tree.move(iid, '', index)
+        if moving and self.tree.selection() != selection:
+            self.tree.selection_set(selection)
+        self._order = order
+        self.position = len(order)
+        return removed
+
+    @staticmethod
+    def _in_order(order, old_index):
+        """The iids of a longest subsequence of order whose old positions increase."""
+        tails, tail_iids, previous = [], [], {}
+        for iid in order:
+            position = old_index.get(iid)
+            if position is None:
+                continue
+            i = bisect_left(tails, position)
+            previous[iid] = tail_iids[i - 1] if i else None
+            if i == len(tails):
+                tails.append(position)
+                tail_iids.append(iid)
+            else:
+                tails[i] = position
+                tail_iids[i] = iid
+        stay, iid = set(), tail_iids[-1] if tail_iids else None
+        while iid is not None:
+            stay.add(iid)
+            iid = previous[iid]
+        return stay
+
+    def clear(self):
+        if self._order:
+            self.tree.delete(*self._order)
+        self._order = []
+        self._values = {}
+        self._pass = None
+        self._new = {}
+        self.position = 0
+
+
+class VirtualTreeview:
+    """Shows a window of a very long list in a Treeview, fetching rows on demand.
+
+    Only the rows that fit in the tree (its height option) exist as Tk
+    items, so memory and redraw time do not grow with the list. The widget
+    drives the scrollbar itself from the row count, and handles the mouse
+    wheel and Up/Down/Page Up/Page Down/Home/End.
+
+    count_rows() and fetch_rows(offset, limit) run on the controller's
+    BackgroundLoader. Rows are cached in blocks of block_size (at most
+    max_blocks, least recently shown dropped first) and the blocks next to
+    the visible ones are prefetched; rows not loaded yet show as
+    placeholders. format_row(row) returns (key, values) for a row.
+    reset() re-reads the count and the visible rows, keeping the scroll
+    position, and then calls on_refreshed(removed_keys).
+    """
+
+    PLACEHOLDER = '…'
+
+    def __init__(self, owner, tree, key, count_rows, fetch_rows, format_row, scrollbar=None,
+                 block_size=100, max_blocks=50, on_refreshed=None):
+        self.owner = owner
+        self.tree = tree
+        self.key = key
+        self.count_rows = count_rows
+        self.fetch_rows = fetch_rows
+        self.format_row = format_row
+        self.scrollbar = scrollbar
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.on_refreshed = on_refreshed
+
+        self.view = KeyedTreeview(tree)
+        self.total = 0
+        self.first = 0                  # list index of the top row
+        self._blocks = OrderedDict()    # block number -> rows, least recently shown first
+        self._by_key = {}               # key -> row, for the cached blocks
+        self._pending = None            # (first block, last block) being fetched
+        self._generation = 0            # bumped by reset() to drop older fetches
+        self._selected = None           # iid of the selected row, kept while it is scrolled out
+
+        if scrollbar is not None:
+            scrollbar.configure(command=self._on_scrollbar)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(sequence, self._on_wheel)
+        tree.bind('<Up>', lambda event: self._on_arrow(-1))
+        tree.bind('<Down>', lambda event: self._on_arrow(1))
+        tree.bind('<Prior>', lambda event: self.scroll_by(-self.height) or 'break')
+        tree.bind('<Next>', lambda event: self.scroll_by(self.height) or 'break')
+        tree.bind('<Home>', lambda event: self.scroll_to(0) or 'break')
+        tree.bind('<End>', lambda event: self.scroll_to(self.total) or 'break')
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+
+    @property
+    def height(self):
+        return max(1, int(self.tree.cget('height')))
+
+    def row(self, key):
+        """The cached row with this key, or None."""
+        return self._by_key.get(str(key))
+
+    def reset(self):
+        """Re-reads the row count and the visible rows in the background."""
+        self._generation += 1
+        self._blocks.clear()
+        self._by_key.clear()
+        self._pending = None
+        generation = self._generation
+        self.owner.controller.loader.submit(self.owner, self.key, self._fetch_window,
+                                            lambda result: self._apply_window(generation, result),
+                                            self.first, on_error=self._on_error)
+
+    def scroll_to(self, first):
+        self.first = first
+        self._render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+
+    # Worker thread: no widget access
+    def _fetch_window(self, first):
+        total = self.count_rows()
+        first = max(0, min(first, total - self.height))
+        return (total,) + self._fetch_blocks(first // self.block_size, (first + self.height) // self.block_size)
+
+    def _fetch_blocks(self, start_block, end_block):
+        return start_block, end_block, self.fetch_rows(start_block * self.block_size,
+                                                       (end_block - start_block + 1) * self.block_size)
+
+    def _apply_window(self, generation, result):
+        if generation != self._generation:
+            return
+        self.total = result[0]
+        self._store(*result[1:])
+        removed = self._render()
+        if self.on_refreshed is not None:
+            self.on_refreshed(removed)
+
+    def _apply_blocks(self, generation, result):
+        if generation != self._generation:
+            return
+        self._pending = None
+        self._store(*result)
+        self._render()
+
+    def _on_error(self, exc):
+        self._pending = None
+        self.owner.controller.report_callback_exception(type(exc), exc, exc.__traceback__)
+
+    def _store(self, start_block, end_block, rows):
+        size = self.block_size
+        for block_no in range(start_block, end_block + 1):
+            self._drop(block_no)
+            offset = (block_no - start_block) * size
+            # Stored even when short or empty, so rows deleted since the count are not fetched again
+            block = self._blocks[block_no] = rows[offset:offset + size]
+            for row in block:
+                self._by_key[str(self.format_row(row)[0])] = row
+        while len(self._blocks) > self.max_blocks:
+            self._drop(next(iter(self._blocks)))
+
+    def _drop(self, block_no):
+        for row in self._blocks.pop(block_no, ()):
+            key = str(self.format_row(row)[0])
+            if self._by_key.get(key) is row:
+                del self._by_key[key]
+
+    def _render(self):
+        """Shows the rows at self.first; returns the keys no longer shown."""
+        height = self.height
+        self.first = max(0, min(self.first, self.total - height))
+        last = min(self.first + height, self.total)
+        size = self.block_size
+        placeholder = (self.PLACEHOLDER,) * len(self.tree['columns'])
+
+        rows, missing = [], []
+        for block_no in range(self.first // size, (max(last, 1) - 1) // size + 1):
+            block = self._blocks.get(block_no)
+            if block is None:
+                missing.append(block_no)
+            else:
+                self._blocks.move_to_end(block_no)
+        for index in range(self.first, last):
+            block = self._blocks.get(index // size)
+            if block is None:
+                rows.append((f"~{index}", placeholder))
+            elif index % size < len(block):    # a block can come back short if funds were deleted
+                rows.append(self.format_row(block[index % size]))
+
+        self.view.begin()
+        self.view.apply(rows)
+        removed = self.view.finish()
+        if self._selected is not None and self._selected in self.view \
+                and self._selected not in self.tree.selection():
+            self.tree.selection_set(self._selected)
+        if self.scrollbar is not None:
+            if self.total:
+                self.scrollbar.set(self.first / self.total, last / self.total)
+            else:
+                self.scrollbar.set(0, 1)
+        self._prefetch(missing, last)
+        return removed
+
+    def _prefetch(self, missing, last):
+        """Fetches the missing visible blocks, or else one missing neighbouring block."""
+        size = self.block_size
+        last_block = (self.total - 1) // size
+        if missing:
+            start, end = missing[0], missing[-1]
+            if start > 0 and start - 1 not in self._blocks:
+                start -= 1
+            if end < last_block and end + 1 not in self._blocks:
+                end += 1
+        else:
+            neighbours = [block_no for block_no in ((max(last, 1) - 1) // size + 1, self.first // size - 1)
+                          if 0 <= block_no <= last_block and block_no not in self._blocks]
+            if not neighbours:
+                return
+            start = end = neighbours[0]
+        if self._pending == (start, end):
+            return
+        self._pending = (start, end)
+        generation = self._generation
+        # Superseding the previous request keeps a fast scrollbar drag from queueing fetches
+        self.owner.controller.loader.submit(self.owner, self.key + '_rows', self._fetch_blocks,
+                                            lambda result: self._apply_blocks(generation, result),
+                                            start, end, on_error=self._on_error)
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * self.total))
+        elif action == 'scroll':
+            count, what = int(args[0]), args[1]
+            self.scroll_by(count * (self.height if what == 'pages' else 1))
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_by(-3)
+        else:
+            self.scroll_by(3)
+        return 'break'
+
+    def _on_arrow(self, step):
+        """Scrolls when the focus would move past the top or bottom row."""
+        items = self.tree.get_children()
+        if not items or self.tree.focus() != items[0 if step < 0 else -1]:
+            return None     # the Treeview moves the focus itself
+        self.scroll_by(step)
+        items = self.tree.get_children()
+        if items:
+            target = items[0 if step < 0 else -1]
+            self.tree.focus(target)
+            self.tree.selection_set(target)
+        return 'break'
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self._selected = selection[0]
+
+
+class FundPicker(tk.Frame):
+    """Type-ahead fund chooser: an Entry that filters a Listbox of matching funds.
+
+    set_index() takes a LIB_search.FundSearchIndex (built off the GUI
+    thread). Each keystroke re-runs index.search(); the Listbox shows the
+    first PAGE matches and adds more as it is scrolled to the end. get()
+    returns the chosen fund_id or None; with selectmode=tk.EXTENDED,
+    selection() returns every chosen fund_id. on_select() is called
+    whenever the choice may have changed.
+    """
+
+    PAGE = 50
+
+    def __init__(self, master, height=6, selectmode=tk.BROWSE, on_select=None, empty_text='No funds'):
+        super().__init__(master)
+        self.index = FundSearchIndex()
+        self.on_select = on_select
+        self.empty_text = empty_text
+        self.results = []       # fund_ids in Listbox order
+        self._limit = self.PAGE
+        self._more_job = None
+
+        self.query_var = tk.StringVar(self)
+        self.entry = tk.Entry(self, textvariable=self.query_var)
+        self.entry.pack(fill='x')
+        list_frame = tk.Frame(self)
+        list_frame.pack(fill='both', expand=True)
+        self.listbox = tk.Listbox(list_frame, height=height, selectmode=selectmode, exportselection=False)
+        self.scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=self._on_view_change)
+        self.listbox.pack(side=tk.LEFT, fill='both', expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill='y')
+        self.listbox.insert(tk.END, "Loading Funds...")
+
+        self.query_var.trace_add('write', lambda *args: self._search())
+        self.listbox.bind('<<ListboxSelect>>', lambda event: self._changed())
+        self.entry.bind('<Down>', self._focus_list)
+        self.entry.bind('<Return>', self._focus_list)
+
+    def set_index(self, index):
+        """Shows the funds of a new index, keeping the chosen ones that are still in it."""
+        keep = set(self.selection())
+        self.index = index
+        self._search(keep)
+
+    def get(self):
+        selection = self.selection()
+        return selection[0] if selection else None
+
+    def selection(self):
+        return [self.results[i] for i in self.listbox.curselection() if i < len(self.results)]
+
+    def select_all(self):
+        """Shows and selects every fund matching the current query."""
+        self._limit = max(len(self.index), self.PAGE)
+        self._show(self.index.search(self.query_var.get(), self._limit), keep=None)
+        if self.results:
+            self.listbox.selection_set(0, tk.END)
+        self._changed()
+
+    def _search(self, keep=None):
+        self._limit = self.PAGE
+        self._show(self.index.search(self.query_var.get(), self._limit),
+                   keep=set(self.selection()) if keep is None else keep)
+        self._changed()
+
+    def _show(self, results, keep):
+        self.results = results
+        self.listbox.delete(0, tk.END)
+        if not results:
+            self.listbox.insert(tk.END, self.empty_text)
+            return
+        self.listbox.insert(tk.END, *[self.index.label(fund_id) for fund_id in results])
+        if keep:
+            for i, fund_id in enumerate(results):
+                if fund_id in keep:
+                    self.listbox.selection_set(i)
+        if not self.listbox.curselection():
+            self.listbox.selection_set(0)   # like the old drop-downs, default to the first fund
+
+    def _changed(self):
+        if self.on_select is not None:
+            self.on_select()
+
+    def _focus_list(self, event):
+        self.listbox.focus_set()
+        if not self.listbox.curselection() and self.results:
+            self.listbox.selection_set(0)
+            self._changed()
+        return 'break'
+
+    def _on_view_change(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.9 and len(self.results) >= self._limit and self._more_job is None:
+            self._more_job = self.after_idle(self._load_more)
+
+    def _load_more(self):
+        self._more_job = None
+        self._limit += self.PAGE
+        shown = set(self.results)
+        more = [fund_id for fund_id in self.index.search(self.query_var.get(), self._limit) if fund_id not in shown]
+        if more:
+            self.results.extend(more)
+            self.listbox.insert(tk.END, *[self.index.label(fund_id) for fund_id in more])
+
+
+class TableQuery:
+    """Sort and filter state of a table, changed through its headings and a FilterBar.
+
+    sortable maps Treeview column ids to the DAL sort names they sort by.
+    Clicking a heading sorts by that column, clicking it again reverses the
+    order; the heading shows an arrow. on_change() is called after every
+    change and should reload the table; its page fetch passes options() on
+    to the LIB, so sorting and filtering happen in the query.
+    """
+
+    ARROWS = {False: ' \u25b2', True: ' \u25bc'}
+
+    def __init__(self, tree, sortable, on_change, sort=None, descending=False):
+        self.tree = tree
+        self.sortable = sortable
+        self.on_change = on_change
+        self.sort = sort
+        self.descending = descending
+        self.filters = {}
+        self._titles = {column: tree.heading(column, 'text') for column in sortable}
+        for column in sortable:
+            tree.heading(column, command=lambda column=column: self.sort_by(column))
+        self._update_headings()
+
+    def sort_by(self, column):
+        name = self.sortable[column]
+        if name == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort, self.descending = name, False
+        self._update_headings()
+        self.on_change()
+
+    def set_filters(self, filters):
+        filters = {name: value for name, value in filters.items() if value is not None and value != ''}
+        if filters != self.filters:
+            self.filters = filters
+            self.on_change()
+
+    def options(self):
+        """Keyword arguments for the LIB page methods."""
+        return {'sort': self.sort, 'descending': self.descending, 'filters': dict(self.filters)}
+
+    def _update_headings(self):
+        for column, name in self.sortable.items():
+            arrow = self.ARROWS[self.descending] if name == self.sort else ''
+            self.tree.heading(column, text=self._titles[column] + arrow)
+
+
+class FilterBar(tk.Frame):
+    """A row of filter fields; calls on_change(values) once the user stops typing.
+
+    fields are (name, label, choices) tuples. choices None gives an Entry;
+    otherwise a read-only Combobox of (label, value) pairs, the first of
+    which should mean "any" (value None).
+    """
+
+    DELAY_MS = 300
+
+    def __init__(self, master, fields, on_change):
+        super().__init__(master)
+        self.on_change = on_change
+        self._vars = {}
+        self._choices = {}
+        self._job = None
+        for name, label, choices in fields:
+            tk.Label(self, text=label).pack(side=tk.LEFT, padx=(6, 2))
+            var = tk.StringVar(self)
+            if choices is None:
+                tk.Entry(self, textvariable=var, width=16).pack(side=tk.LEFT)
+            else:
+                self._choices[name] = dict(choices)
+                var.set(choices[0][0])
+                ttk.Combobox(self, textvariable=var, values=[label for label, _ in choices], state='readonly',
+                             width=10).pack(side=tk.LEFT)
+            var.trace_add('write', lambda *args: self._schedule())
+            self._vars[name] = var
+        tk.Button(self, text="Clear", command=self.clear).pack(side=tk.LEFT, padx=6)
+
+    def values(self):
+        values = {}
+        for name, var in self._vars.items():
+            if name in self._choices:
+                values[name] = self._choices[name].get(var.get())
+            else:
+                values[name] = var.get().strip()
+        return values
+
+    def clear(self):
+        for name, var in self._vars.items():
+            var.set(next(iter(self._choices[name])) if name in self._choices else '')
+
+    def _schedule(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self._job = self.after(self.DELAY_MS, self._apply)
+
+    def _apply(self):
+        self._job = None
+        self.on_change(self.values())
+
+
+class DetailLoader:
+    """Detail columns the list queries leave out, loaded when a row is selected.
+
+    fetch(keys) runs on the controller's BackgroundLoader and returns
+    {key: detail}. get() loads the selected key together with up to prefetch
+    keys on each side of it in the display order, so moving the selection to
+    a neighbouring row is answered from memory. At most max_entries details
+    are kept, least recently used dropped first.
+    """
+
+    def __init__(self, owner, key, fetch, prefetch=5, max_entries=500):
+        self.owner = owner
+        self.key = key
+        self.fetch = fetch
+        self.prefetch = prefetch
+        self.max_entries = max_entries
+        self._details = OrderedDict()
+        self._wanted = None
+
+    def __contains__(self, key):
+        return key in self._details
+
+    def get(self, key, order, on_loaded):
+        """Calls on_loaded(detail) for key now if it is loaded, else once it is.
+
+        order is the sequence of keys as displayed. If the selection moves on
+        before the detail arrives, on_loaded is not called.
+        """
+        self._wanted = key
+        missing = [k for k in self._neighbours(key, order) if k not in self._details]
+        if key in self._details:
+            self._details.move_to_end(key)
+            on_loaded(self._details[key])
+            if missing:
+                self.owner.controller.loader.submit(self.owner, self.key + '_prefetch', self.fetch, self._store,
+                                                    missing)
+            return
+        self.owner.controller.loader.submit(self.owner, self.key, self.fetch,
+                                            lambda details: self._loaded(key, details, on_loaded), [key] + missing)
+
+    def get_many(self, keys, on_loaded):
+        """Calls on_loaded({key: detail}) for keys, now if all are loaded, else once the rest are."""
+        keys = list(keys)
+        details = {key: self._details[key] for key in keys if key in self._details}
+        missing = [key for key in keys if key not in details]
+        if not missing:
+            on_loaded(details)
+            return
+
+        def loaded(fetched):
+            self._store(fetched)
+            details.update(fetched)
+            on_loaded({key: details[key] for key in keys if key in details})
+
+        self.owner.controller.loader.submit(self.owner, self.key + '_many', self.fetch, loaded, missing)
+
+    def discard(self, key=None):
+        """Forgets one detail (e.g. after editing it), or all of them."""
+        if key is None:
+            self._details.clear()
+        else:
+            self._details.pop(key, None)
+
+    def _neighbours(self, key, order):
+        order = list(order)
+        try:
+            position = order.index(key)
+        except ValueError:
+            return []
+        return (order[max(0, position - self.prefetch):position] +
+                order[position + 1:position + 1 + self.prefetch])
+
+    def _loaded(self, key, details, on_loaded):
+        self._store(details)
+        if key == self._wanted and key in self._details:
+            on_loaded(self._details[key])
+
+    def _store(self, details):
+        for key, detail in details.items():
+            self._details[key] = detail
+            self._details.move_to_end(key)
+        while len(self._details) > self.max_entries:
+            self._details.popitem(last=False)
@@ -0,0 +1,99 @@
+"""Background data loading for GUI frames.
+
+DAL/LIB reads run on a small worker pool so a slow database never blocks the
+Tk main thread. Workers never touch widgets: finished results are queued and
+the main thread drains the queue with after(), then calls the frame's
+callback. Each frame shows a "Loading..." indicator while it has reads in
+flight, and results that arrive after the user has left the frame (or after
+a newer load of the same data was started) are dropped.
+"""
+
+import queue
+import itertools
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundLoader:
+    """Runs reads off the main thread and hands results back via after()."""
+
+    def __init__(self, root, max_workers=4, poll_interval=25):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gui-loader')
+        self._results = queue.Queue()
+        self._tokens = itertools.count(1)
+        self._current = {}      # (owner, key) -> token of the newest load
+        self._indicators = {}   # owner -> "Loading..." label
+        self._closed = False
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, owner, key, fn, on_done, *args, on_error=None):
+        """Runs fn(*args) on a worker and calls on_done(result) on the main thread.
+
+        owner is the frame the data is for and key names the dataset, e.g.
+        'funds'. Starting a new load for the same (owner, key) supersedes the
+        previous one. on_error(exc) is called instead if fn raises.
+        """
+        if self._closed:
+            return
+        token = next(self._tokens)
+        self._current[(owner, key)] = token
+        self._update_indicator(owner)
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(
+            lambda f: self._results.put((owner, key, token, f, on_done, on_error))
+        )
+
+    def cancel(self, owner):
+        """Discards every in-flight load for owner, e.g. when the user leaves the frame."""
+        for pending in [k for k in self._current if k[0] is owner]:
+            del self._current[pending]
+        self._update_indicator(owner)
+
+    def is_loading(self, owner):
+        return any(k[0] is owner for k in self._current)
+
+    def shutdown(self):
+        self._closed = True
+        self._current.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        while True:
+            try:
+                owner, key, token, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if self._current.get((owner, key)) != token:
+                continue    # stale: cancelled or superseded
+            del self._current[(owner, key)]
+            self._update_indicator(owner)
+
+            exc = future.exception()
+            try:
+                if exc is None:
+                    on_done(future.result())
+                elif on_error is not None:
+                    on_error(exc)
+                else:
+                    self.root.report_callback_exception(type(exc), exc, exc.__traceback__)
+            except Exception as callback_exc:
+                self.root.report_callback_exception(type(callback_exc), callback_exc, callback_exc.__traceback__)
+
+        if not self._closed:
+            self.root.after(self.poll_interval, self._poll)
+
+    def _update_indicator(self, owner):
+        if not isinstance(owner, tk.Misc) or not owner.winfo_exists():
+            return
+        label = self._indicators.get(owner)
+        if self.is_loading(owner):
+            if label is None:
+                label = tk.Label(owner, text="Loading...", fg='gray')
+                self._indicators[owner] = label
+            label.place(relx=1.0, x=-10, y=6, anchor='ne')
+            label.lift()
+        elif label is not None:
+            label.place_forget()
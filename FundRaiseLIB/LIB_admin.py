@@ -1,4 +1,5 @@
-from FundRaiseDAL import DAL_admin
+from FundRaiseDAL import DAL_admin, DAL_core
+from FundRaiseLIB.LIB_core import PAGE_SIZE, page_result, sort_key
 
 
 class AdminManager:
@@ -8,10 +9,18 @@ class AdminManager:
         """Fetches pending funds list from DAL.
 
         Returns a list of tuples:
-        (fund_id, recipient_name, service_name, amount_needed, proof_of_charge)
+        (fund_id, recipient_name, service_name, amount_needed)
         """
         return DAL_admin.fetch_unverified_funds()
 
+    def get_pending_funds_page(self, after=None, limit=PAGE_SIZE):
+        """One page of pending funds, oldest first.
+
+        Returns (rows, next_after); pass next_after back to get the next page.
+        """
+        rows = DAL_admin.fetch_unverified_funds(after=after, limit=limit)
+        return page_result(rows, limit, key=lambda row: row[0])
+
     def verify_fund(self, fund_id):
         """Coordinates fund verification using the Admin DAL."""
         if not fund_id:
@@ -24,14 +33,62 @@ class AdminManager:
         else:
             return False, "Failed to verify fund due to a database error."
 
+    def verify_funds(self, fund_ids):
+        """Verifies several funds in one database transaction.
+
+        Returns (success: bool, message: str, outcomes) where outcomes maps
+        each fund_id to 'verified', 'already_verified' or 'not_found'.
+        On failure nothing was verified and outcomes is empty.
+        """
+        try:
+            fund_ids = [int(fund_id) for fund_id in fund_ids]
+        except (TypeError, ValueError):
+            return False, "Error: Fund IDs must be whole numbers.", {}
+        if not fund_ids:
+            return False, "Error: No funds selected.", {}
+
+        success, result = DAL_admin.update_fund_verification_status_bulk(fund_ids)
+        if not success:
+            return False, f"Failed to verify funds due to a database error: {result}", {}
+
+        verified = [fid for fid, outcome in result.items() if outcome == 'verified']
+        already = [fid for fid, outcome in result.items() if outcome == 'already_verified']
+        missing = [fid for fid, outcome in result.items() if outcome == 'not_found']
+
+        msg = f"{len(verified)} fund(s) verified and now active for donations."
+        if already:
+            msg += f"\n{len(already)} already verified: {', '.join(map(str, already))}."
+        if missing:
+            msg += f"\n{len(missing)} not found: {', '.join(map(str, missing))}."
+        return True, msg, result
+
     def get_all_funds_list(self):
         """
         Returns all funds for admin management:
         (fund_id, recipient_name, service_name,
-         amount_needed, amount_raised, is_verified, is_fully_funded, proof_of_charge)
+         amount_needed, amount_raised, is_verified, is_fully_funded)
         """
         return DAL_admin.fetch_all_funds()
 
+    def get_fund_details(self, fund_ids):
+        """{fund_id: proof_of_charge} for the given funds (None where no proof was given)."""
+        return dict(DAL_core.fetch_fund_details(fund_ids))
+
+    def get_all_funds_page(self, after=None, limit=PAGE_SIZE, sort=None, descending=False, filters=None):
+        """One page of all funds, oldest first unless sorted. Returns (rows, next_after).
+
+        sort and filters take the names in DAL_admin.ALL_FUNDS_SORTS / ALL_FUNDS_FILTERS.
+        """
+        rows = DAL_admin.fetch_all_funds(after=after, limit=limit, sort=sort, descending=descending, filters=filters)
+        return page_result(rows, limit, key=sort_key(DAL_admin.ALL_FUNDS_SORTS, sort, 'fund_id'))
+
+    def count_all_funds(self, filters=None):
+        return DAL_admin.count_all_funds(filters=filters)
+
+    def get_all_funds_range(self, offset, limit=PAGE_SIZE, sort=None, descending=False, filters=None):
+        """limit funds starting at position offset (0-based) of the sorted, filtered list."""
+        return DAL_admin.fetch_all_funds(offset=offset, limit=limit, sort=sort, descending=descending, filters=filters)
+
     def update_fund(self, fund_id, new_amount_str, new_proof):
         """
         Validates and updates amount_needed + proof_of_charge for a fund.
@@ -2,6 +2,31 @@ from FundRaiseDAL import DAL_core
 from FundRaiseDAL import DAL_recipient, DAL_service, DAL_donor
 
 
+# Rows fetched per page by the paged list methods of the managers
+PAGE_SIZE = 100
+
+
+def page_result(rows, limit, key):
+    """Pairs a page of rows with the cursor for the next page.
+
+    Returns (rows, next_after) where next_after is key(last_row), or None
+    once the final page has been reached.
+    """
+    next_after = key(rows[-1]) if limit is not None and rows and len(rows) >= limit else None
+    return rows, next_after
+
+
+def sort_key(sorts, sort, default):
+    """Keyset cursor of a row for a DAL sort whitelist ({name: (column, row position, is_text)}).
+
+    The primary key (row[0]) when sorting by it, else (sort value, primary key).
+    """
+    position = sorts[default if sort is None else sort][1]
+    if position == 0:
+        return lambda row: row[0]
+    return lambda row: (row[position], row[0])
+
+
 class AuthManager:
     """Handles login and registration logic."""
 
@@ -27,13 +52,17 @@ class AuthManager:
         if len(password) < 6:
             return False, "Password must be at least 6 characters long."
 
-        # Check if email already exists
-        existing = DAL_core.fetch_user_by_email(email)
-        if existing:
-            return False, "Email is already registered."
-
-        # Create user (DAL_core will hash the password)
-        success, result = DAL_core.create_user(name, email, password, role)
+        # Duplicate check and insert share one connection and transaction
+        with DAL_core.session() as s:
+            # Check if email already exists
+            existing = DAL_core.fetch_user_by_email(email, session=s)
+            if existing:
+                return False, "Email is already registered."
+
+            # Create user (DAL_core will hash the password)
+            success, result = DAL_core.create_user(name, email, password, role, session=s)
+        if success and s.failed:
+            return False, "Failed to commit the new user."
         if success:
             # Note: role_data is currently collected by the GUI and passed here
             # but insertion into role-specific tables (Recipients/Services/Donors)
@@ -58,7 +87,17 @@ class ProfileManager:
             'role_profile': { ... }
         }
         """
-        user = DAL_core.fetch_user_by_id(user_id)
+        # One connection for the user row and the role-specific row
+        with DAL_core.session() as s:
+            profile = self._get_profile(user_id, s)
+        if profile and profile['role'] == 'Service':
+            # After the session has returned its connection, so the read is
+            # served from the reference-data cache without a second checkout
+            profile['role_profile'] = self._service_profile(user_id)
+        return profile
+
+    def _get_profile(self, user_id, s):
+        user = DAL_core.fetch_user_by_id(user_id, session=s)
         if not user:
             return None
         # user => (user_id, name, email, user_type)
@@ -74,7 +113,7 @@ class ProfileManager:
 
         # Role-specific
         if role == 'Recipient':
-            rp = DAL_recipient.fetch_recipient_profile(uid)
+            rp = DAL_recipient.fetch_recipient_profile(uid, session=s)
             if rp:
                 # rp expected: (user_id, contact_email, join_date)
                 result['role_profile'] = {'contact_email': rp[1]}
@@ -82,7 +121,7 @@ class ProfileManager:
                 result['role_profile'] = {}
         elif role == 'Donor':
             try:
-                dp = DAL_donor.fetch_donor_profile(uid)
+                dp = DAL_donor.fetch_donor_profile(uid, session=s)
             except Exception:
                 dp = None
             if dp:
@@ -90,29 +129,41 @@ class ProfileManager:
                 result['role_profile'] = {'is_anonymous_default': bool(dp[1])}
             else:
                 result['role_profile'] = {}
-        elif role == 'Service':
-            sp = DAL_service.fetch_service_profile(uid)
-            if sp:
-                # sp expected: (user_id, service_name, service_description, tax_id_number)
-                result['role_profile'] = {
-                    'service_name': sp[1],
-                    'service_description': sp[2],
-                    'tax_id_number': sp[3]
-                }
-            else:
-                result['role_profile'] = {}
         else:
+            # Service profiles are read by get_profile once the session is closed
             result['role_profile'] = {}
 
         return result
 
+    def _service_profile(self, user_id):
+        sp = DAL_service.fetch_service_profile(user_id)
+        if sp:
+            # sp expected: (user_id, service_name, service_description, tax_id_number)
+            return {
+                'service_name': sp[1],
+                'service_description': sp[2],
+                'tax_id_number': sp[3]
+            }
+        return {}
+
     def update_profile(self, user_id, name=None, phone_number=None, address=None, role=None, role_data=None):
         """Update common + role-specific profile fields.
 
         Returns (True, msg) or (False, error)
         """
+        # Users row and role row are written in one transaction: if the
+        # role-specific upsert fails the common fields are rolled back too.
+        with DAL_core.session() as s:
+            ok, msg = self._update_profile(user_id, name, phone_number, address, role, role_data, s)
+            if not ok:
+                s.rollback()
+        if ok and s.failed:
+            return False, 'Failed to commit profile changes.'
+        return ok, msg
+
+    def _update_profile(self, user_id, name, phone_number, address, role, role_data, s):
         # Update common Users fields
-        ok, msg = DAL_core.update_user_profile(user_id, name=name, phone_number=phone_number, address=address)
+        ok, msg = DAL_core.update_user_profile(user_id, name=name, phone_number=phone_number, address=address, session=s)
         if not ok:
             return False, msg
 
@@ -120,14 +171,14 @@ class ProfileManager:
         if role and role_data is not None:
             if role == 'Recipient':
                 contact = role_data.get('contact_email', None)
-                return DAL_recipient.upsert_recipient_profile(user_id, contact)
+                return DAL_recipient.upsert_recipient_profile(user_id, contact, session=s)
             elif role == 'Donor':
                 is_anon = bool(role_data.get('is_anonymous_default', False))
-                return DAL_donor.upsert_donor_profile(user_id, is_anon)
+                return DAL_donor.upsert_donor_profile(user_id, is_anon, session=s)
             elif role == 'Service':
                 sname = role_data.get('service_name', '')
                 sdesc = role_data.get('service_description', '')
                 tax = role_data.get('tax_id_number', '')
-                return DAL_service.upsert_service_profile(user_id, sname, sdesc, tax)
+                return DAL_service.upsert_service_profile(user_id, sname, sdesc, tax, session=s)
 
         return True, 'Success'
@@ -1,4 +1,19 @@
-from FundRaiseDAL import DAL_donor
+from FundRaiseDAL import DAL_donor, DAL_writebehind
+from FundRaiseLIB.LIB_core import PAGE_SIZE, page_result, sort_key
+
+# Donations.idempotency_key is VARCHAR(64)
+MAX_IDEMPOTENCY_KEY_LENGTH = 64
+
+
+def parse_donation_amount(donation_amount_str):
+    """Returns (amount, None) for a valid donation amount, else (None, error_message)."""
+    try:
+        donation_amount = float(donation_amount_str)
+    except (TypeError, ValueError):
+        return None, "Validation Error: Please enter a valid number for Donation Amount."
+    if not donation_amount > 0:
+        return None, "Validation Error: Donation amount must be greater than zero."
+    return donation_amount, None
 
 
 class DonorManager:
@@ -9,25 +24,40 @@ class DonorManager:
         # Returns list of (fund_id, description, needed, raised, recipient_name)
         return DAL_donor.fetch_active_funds()
 
-    def submit_donation(self, fund_description, donation_amount_str,
-                        is_anonymous, fund_id_map, donor_user_id):
-        """Validates donation and executes the two-step database transaction."""
-        if fund_description not in fund_id_map:
+    def submit_donation(self, fund_id, donation_amount_str,
+                        is_anonymous, active_funds, donor_user_id, idempotency_key=None):
+        """Validates donation and executes the two-step database transaction.
+
+        active_funds is the collection of fund_ids offered to the donor (e.g.
+        the picker's FundSearchIndex); fund_id must be one of them.
+        Pass the same idempotency_key when retrying a submission (e.g. after a
+        timeout): the donation is then recorded at most once and the retry
+        returns the original result.
+        """
+        if idempotency_key is not None and not (0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH):
+            return False, f"Validation Error: Idempotency key must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters."
+
+        if fund_id is None or fund_id not in active_funds:
             return False, "Validation Error: Please select a valid active fund."
 
-        try:
-            donation_amount = float(donation_amount_str)
-            if donation_amount <= 0:
-                return False, "Validation Error: Donation amount must be greater than zero."
-        except ValueError:
-            return False, "Validation Error: Please enter a valid number for Donation Amount."
+        donation_amount, error = parse_donation_amount(donation_amount_str)
+        if error:
+            return False, error
 
-        fund_id = fund_id_map[fund_description]
         donor_id_to_insert = None if is_anonymous else donor_user_id
 
-        success, db_message = DAL_donor.execute_donation_transaction(
-            fund_id, donor_id_to_insert, donation_amount
-        )
+        if DAL_writebehind.WRITE_BEHIND_CONFIG['enabled']:
+            # Journaled now, written to the database by the background flusher
+            success, db_message = DAL_writebehind.enqueue_donation(
+                fund_id, donor_id_to_insert, donation_amount, idempotency_key=idempotency_key
+            )
+            if success:
+                return True, (f"Donation of ${donation_amount:.2f} queued for Fund ID {fund_id}. "
+                              "It will be recorded shortly.")
+        else:
+            success, db_message = DAL_donor.execute_donation_transaction(
+                fund_id, donor_id_to_insert, donation_amount, idempotency_key=idempotency_key
+            )
 
         if success:
             return True, f"Donation of ${donation_amount:.2f} submitted successfully to Fund ID {fund_id}!"
@@ -38,6 +68,18 @@ class DonorManager:
         """Return this donor's donations."""
         return DAL_donor.fetch_donations_for_donor(donor_user_id)
 
+    def get_my_donations_page(self, donor_user_id, after=None, limit=PAGE_SIZE, sort=None, descending=True,
+                              filters=None):
+        """One page of this donor's donations, newest first unless sorted.
+
+        Returns (rows, next_after) where next_after is a (sort value, donation_id)
+        cursor. sort and filters take the names in DAL_donor.DONOR_DONATION_SORTS /
+        DONOR_DONATION_FILTERS.
+        """
+        rows = DAL_donor.fetch_donations_for_donor(donor_user_id, after=after, limit=limit, sort=sort,
+                                                   descending=descending, filters=filters)
+        return page_result(rows, limit, key=sort_key(DAL_donor.DONOR_DONATION_SORTS, sort, 'date'))
+
     def update_donation(self, donor_user_id, donation_id, new_amount_str):
         """Validate and update a donation amount."""
         try:
@@ -0,0 +1,211 @@
+"""Headless bulk import of offline donations (galas, check drives) from CSV.
+
+The file needs a header row with the columns
+
+    fund_id, amount[, donor_email | donor_id][, anonymous]
+
+A row without a donor, or with anonymous set to 1/yes/true, is recorded as
+an anonymous donation. Rows are checked with the same rules as
+DonorManager.submit_donation: the fund must be active (verified and not yet
+fully funded when the import starts) and the amount a positive number.
+
+The file is read as a stream and written in batches through
+DAL_donor.execute_donation_batch, so memory use does not grow with the
+file. Each row gets an idempotency key derived from --import-id and its
+line number; running the same import again (e.g. after a failed batch)
+skips the rows already recorded before validating anything else. Those
+keys are looked up one batch at a time.
+
+    python -m FundRaiseLIB.LIB_import gala-2025.csv --batch-size 2000
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+
+from FundRaiseDAL import DAL_core, DAL_donor
+from FundRaiseLIB.LIB_donor import parse_donation_amount
+
+
+IMPORT_CONFIG = {
+    'batch_size': 1000,     # donations per transaction
+    'max_errors_reported': 50,
+}
+
+TRUE_VALUES = {'1', 'y', 'yes', 'true'}
+
+
+def key_prefix(import_id):
+    """Common idempotency key prefix of the rows of one import."""
+    return f"csv:{hashlib.sha256(import_id.encode('utf-8')).hexdigest()[:24]}:"
+
+
+class DonationImporter:
+    """Validates CSV rows and records them in batches."""
+
+    def __init__(self, import_id, batch_size=None, dry_run=False):
+        self.import_id = import_id
+        self.batch_size = batch_size or IMPORT_CONFIG['batch_size']
+        self.dry_run = dry_run
+        self.active_funds = {row[0] for row in DAL_donor.fetch_active_funds()}
+        self._donors = {}   # donor_email or donor_id -> user_id, or None if not a donor
+        self.key_prefix = key_prefix(import_id)
+        self.report = {'import_id': import_id, 'dry_run': dry_run, 'rows': 0, 'imported': 0,
+                       'already_imported': 0, 'invalid': 0, 'batches': 0, 'amount': 0.0,
+                       'errors': [], 'elapsed_seconds': 0.0, 'rows_per_second': 0.0, 'failed': None}
+
+    def run(self, lines):
+        """Imports the CSV text lines (any iterable, e.g. an open file). Returns the report."""
+        started = time.perf_counter()
+        reader = csv.DictReader(lines)
+        missing = {'fund_id', 'amount'} - set(reader.fieldnames or ())
+        if missing:
+            self.report['failed'] = f"Missing column(s): {', '.join(sorted(missing))}"
+            return self.report
+
+        rows = []   # (line number, row) read since the last batch
+        for row in reader:
+            self.report['rows'] += 1
+            rows.append((reader.line_num, row))
+            if len(rows) >= self.batch_size:
+                if not self._import(rows):
+                    break
+                rows = []
+        else:
+            if rows:
+                self._import(rows)
+
+        elapsed = time.perf_counter() - started
+        self.report['elapsed_seconds'] = round(elapsed, 3)
+        self.report['rows_per_second'] = round(self.report['rows'] / elapsed, 1) if elapsed else 0.0
+        return self.report
+
+    def validate(self, row):
+        """Returns ((fund_id, donor_id, amount), None) or (None, error_message)."""
+        try:
+            fund_id = int((row.get('fund_id') or '').strip())
+        except ValueError:
+            return None, "Validation Error: fund_id must be a number."
+        if fund_id not in self.active_funds:
+            return None, "Validation Error: Please select a valid active fund."
+
+        amount, error = parse_donation_amount((row.get('amount') or '').strip())
+        if error:
+            return None, error
+
+        if (row.get('anonymous') or '').strip().lower() in TRUE_VALUES:
+            return (fund_id, None, amount), None
+        donor = (row.get('donor_email') or row.get('donor_id') or '').strip()
+        if not donor:
+            return (fund_id, None, amount), None
+        donor_id = self._resolve_donor(donor)
+        if donor_id is None:
+            return None, f"Validation Error: {donor} is not a registered donor."
+        return (fund_id, donor_id, amount), None
+
+    def _resolve_donor(self, donor):
+        if donor not in self._donors:
+            if '@' in donor:
+                user = DAL_core.fetch_user_by_email(donor)
+                self._donors[donor] = user[0] if user and user[1] == 'Donor' else None
+            elif donor.isdigit():
+                user = DAL_core.fetch_user_by_id(int(donor))
+                self._donors[donor] = user[0] if user and user[3] == 'Donor' else None
+            else:
+                self._donors[donor] = None
+        return self._donors[donor]
+
+    def _import(self, rows):
+        """Checks and writes one batch of (line number, row). Returns False if the write failed."""
+        # Rows recorded by an earlier run of this import are skipped before validation
+        keys = [f"{self.key_prefix}{line_number}" for line_number, _ in rows]
+        done = DAL_donor.fetch_recorded_idempotency_keys(keys)
+        batch, line_numbers = [], []
+        for (line_number, row), key in zip(rows, keys):
+            if key in done:
+                self.report['already_imported'] += 1
+                continue
+            donation, error = self.validate(row)
+            if error:
+                self._error(line_number, error)
+                continue
+            batch.append(donation + (key,))
+            line_numbers.append(line_number)
+        return not batch or self._write(batch, line_numbers[0], line_numbers[-1])
+
+    def _write(self, batch, first_line, last_line):
+        self.report['batches'] += 1
+        if self.dry_run:
+            inserted = len(batch)
+        else:
+            success, result = DAL_donor.execute_donation_batch(batch)
+            if not success:
+                self.report['failed'] = (f"Batch {self.report['batches']} (lines {first_line}-{last_line}) "
+                                         f"rolled back: {result}")
+                return False
+            inserted = result
+        self.report['imported'] += inserted
+        self.report['already_imported'] += len(batch) - inserted
+        self.report['amount'] = round(self.report['amount'] + sum(amount for _, _, amount, _ in batch), 2)
+        return True
+
+    def _error(self, line_number, message):
+        self.report['invalid'] += 1
+        if len(self.report['errors']) < IMPORT_CONFIG['max_errors_reported']:
+            self.report['errors'].append({'line': line_number, 'error': message})
+
+
+def import_donations(path, import_id=None, batch_size=None, dry_run=False):
+    """Imports the donations in the CSV file at path. Returns a report dict."""
+    importer = DonationImporter(import_id or os.path.basename(path), batch_size=batch_size, dry_run=dry_run)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return importer.run(f)
+
+
+# ============================================================
+# CLI
+# ============================================================
+def format_report(report):
+    """Human-readable summary of an import report."""
+    lines = [
+        f"import '{report['import_id']}'{' (dry run)' if report['dry_run'] else ''}: "
+        f"{report['rows']} row(s) read, {report['imported']} imported, "
+        f"{report['already_imported']} already imported, {report['invalid']} invalid, "
+        f"${report['amount']:.2f} in {report['batches']} batch(es)",
+        f"  {report['elapsed_seconds']:.3f}s, {report['rows_per_second']:.1f} rows/s",
+    ]
+    for error in report['errors']:
+        lines.append(f"  line {error['line']}: {error['error']}")
+    if report['invalid'] > len(report['errors']):
+        lines.append(f"  ... {report['invalid'] - len(report['errors'])} more invalid row(s)")
+    if report['failed']:
+        lines.append(f"  ERROR: {report['failed']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import offline donations from a CSV file")
+    parser.add_argument('path')
+    parser.add_argument('--import-id', help="identifies this import for re-runs (default: file name)")
+    parser.add_argument('--batch-size', type=int, help=f"default {IMPORT_CONFIG['batch_size']}")
+    parser.add_argument('--dry-run', action='store_true', help="validate only, write nothing")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    args = parser.parse_args(argv)
+
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+
+    report = import_donations(args.path, import_id=args.import_id, batch_size=args.batch_size, dry_run=args.dry_run)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,13 @@
+from FundRaiseDAL.DAL_core import fetch_fund_details
 from FundRaiseDAL.DAL_recipient import (
     fetch_all_services,
     insert_new_fund,
     fetch_recipient_funds,
     update_recipient_fund,
     delete_recipient_fund,
+    RECIPIENT_FUND_SORTS,
 )
+from FundRaiseLIB.LIB_core import PAGE_SIZE, page_result, sort_key
 
 
 class RecipientManager:
@@ -47,6 +50,20 @@ class RecipientManager:
         """Return list of funds created by this recipient."""
         return fetch_recipient_funds(recipient_id)
 
+    def get_fund_details(self, recipient_id, fund_ids):
+        """{fund_id: proof_of_charge} for those of fund_ids this recipient created."""
+        return dict(fetch_fund_details(fund_ids, recipient_id=recipient_id))
+
+    def get_recipient_funds_page(self, recipient_id, after=None, limit=PAGE_SIZE, sort=None, descending=True,
+                                 filters=None):
+        """One page of this recipient's funds, newest first unless sorted. Returns (rows, next_after).
+
+        sort and filters take the names in DAL_recipient.RECIPIENT_FUND_SORTS / RECIPIENT_FUND_FILTERS.
+        """
+        rows = fetch_recipient_funds(recipient_id, after=after, limit=limit, sort=sort, descending=descending,
+                                     filters=filters)
+        return page_result(rows, limit, key=sort_key(RECIPIENT_FUND_SORTS, sort, 'fund_id'))
+
     def update_fund(self, recipient_id, fund_id, amount_str, proof):
         """Validate and update fund fields."""
         if not fund_id:
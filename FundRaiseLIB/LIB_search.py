@@ -0,0 +1,127 @@
+"""In-memory type-ahead search over fund descriptions.
+
+FundSearchIndex maps fund_id -> description and answers prefix queries:
+every word of the query must start a word of the description (or be the
+fund_id), so "jo med" finds "Medical bills - John Smith". Words of three
+or more letters that match too few funds that way also match inside
+words, through a trigram index of the distinct words ("ohn" finds "John").
+Numbers only match as prefixes.
+
+The word index is a sorted list searched with bisect, so a query costs
+O(log n) plus the matches it returns; search() stops at limit, which keeps
+type-ahead lookups well under a millisecond for hundreds of thousands of
+funds. Build the index off the GUI thread; it is read-only afterwards.
+
+    >>> index = FundSearchIndex([(12, "Medical bills - John Smith")])
+    >>> index.search("jo med")
+    [12]
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text):
+    return _WORD.findall(text.casefold())
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class FundSearchIndex:
+    """Searchable (fund_id, description) pairs, in the order they were given."""
+
+    def __init__(self, funds=()):
+        self._labels = {}       # fund_id -> description
+        self._position = {}     # fund_id -> position in input order
+        self._words = {}        # fund_id -> tuple of its words
+        entries = []            # (word, position, fund_id)
+        for fund_id, description in funds:
+            if fund_id in self._labels:
+                continue
+            position = len(self._labels)
+            self._labels[fund_id] = description
+            self._position[fund_id] = position
+            words = tuple(dict.fromkeys(_words(description) + [str(fund_id)]))
+            self._words[fund_id] = words
+            for word in words:
+                entries.append((word, position, fund_id))
+        entries.sort()
+        self._trigram_words = {}    # trigram -> set of the distinct words containing it
+        for word in set(entry[0] for entry in entries):
+            if not word.isdigit():
+                for trigram in _trigrams(word):
+                    self._trigram_words.setdefault(trigram, set()).add(word)
+        self._index_words = [entry[0] for entry in entries]
+        self._index_ids = [entry[2] for entry in entries]
+        self._order = sorted(self._labels, key=self._position.__getitem__)
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __contains__(self, fund_id):
+        return fund_id in self._labels
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def label(self, fund_id):
+        """The description of fund_id, or None."""
+        return self._labels.get(fund_id)
+
+    def search(self, query, limit=50):
+        """fund_ids matching query, best matches first; all funds (in order) for an empty query."""
+        terms = list(dict.fromkeys(_words(query or '')))
+        if not terms:
+            return self._order[:limit]
+
+        results = self._prefix_matches(terms, limit)
+        if len(results) < limit and all(len(term) >= 3 and not term.isdigit() for term in terms):
+            results += self._substring_matches(terms, limit - len(results), exclude=set(results))
+        return results
+
+    def _prefix_range(self, term):
+        start = bisect_left(self._index_words, term)
+        # Every word starting with term sorts before term + the highest code point
+        end = bisect_left(self._index_words, term + '\U0010ffff', start)
+        return start, end
+
+    def _prefix_matches(self, terms, limit):
+        # Walk the rarest term's matches; check the other terms on each candidate
+        ranges = {term: self._prefix_range(term) for term in terms}
+        driver = min(terms, key=lambda term: ranges[term][1] - ranges[term][0])
+        others = [term for term in terms if term != driver]
+        start, end = ranges[driver]
+        results, seen = [], set()
+        for i in range(start, end):
+            fund_id = self._index_ids[i]
+            if fund_id in seen:
+                continue
+            seen.add(fund_id)
+            words = self._words[fund_id]
+            if all(any(word.startswith(term) for word in words) for term in others):
+                results.append(fund_id)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _substring_matches(self, terms, limit, exclude):
+        # Words containing the first term: candidates from its rarest trigram, then checked
+        driver, others = terms[0], terms[1:]
+        candidates = min((self._trigram_words.get(trigram, set()) for trigram in _trigrams(driver)), key=len)
+        matches = []
+        for word in sorted(word for word in candidates if driver in word):
+            start = bisect_left(self._index_words, word)
+            for i in range(start, bisect_right(self._index_words, word, start)):
+                fund_id = self._index_ids[i]
+                if fund_id in exclude:
+                    continue
+                exclude.add(fund_id)
+                if all(any(term in w for w in self._words[fund_id]) for term in others):
+                    matches.append(fund_id)
+                    if len(matches) >= limit:
+                        return sorted(matches, key=self._position.__getitem__)
+        return sorted(matches, key=self._position.__getitem__)
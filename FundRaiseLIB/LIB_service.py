@@ -1,21 +1,28 @@
-from FundRaiseDAL import DAL_service
+from FundRaiseDAL import DAL_core, DAL_service
+from FundRaiseLIB.LIB_core import PAGE_SIZE, page_result
 
 class ServiceManager:
     """Handles logic for updating fund documentation."""
     
     def get_funds_assigned_to_service(self, service_user_id):
         """Fetches funds assigned to this service user."""
-        # Returns list of (fund_id, recipient_name, amount_needed, proof_of_charge)
+        # Returns list of (fund_id, recipient_name, amount_needed)
         return DAL_service.fetch_service_funds(service_user_id)
+
+    def get_fund_details(self, service_user_id, fund_ids):
+        """{fund_id: proof_of_charge} for those of fund_ids assigned to this service."""
+        return dict(DAL_core.fetch_fund_details(fund_ids, service_id=service_user_id))
+
+    def get_funds_assigned_page(self, service_user_id, after=None, limit=PAGE_SIZE):
+        """One page of funds assigned to this service, newest first. Returns (rows, next_after)."""
+        rows = DAL_service.fetch_service_funds(service_user_id, after=after, limit=limit)
+        return page_result(rows, limit, key=lambda row: row[0])
         
-    def update_fund_proof(self, fund_description, new_proof, service_user_id, fund_map):
-        """Updates the proof of charge for a fund."""
+    def update_fund_proof(self, fund_id, new_proof, service_user_id, assigned_funds):
+        """Updates the proof of charge for a fund; fund_id must be one of assigned_funds."""
         
-        if fund_description not in fund_map:
+        if fund_id is None or fund_id not in assigned_funds:
             return False, "Please select a valid fund."
-        
-        # fund_map contains (fund_id, current_proof)
-        fund_id, _ = fund_map[fund_description]
 
         if not new_proof or new_proof.strip() == "":
             return False, "Proof of Charge link cannot be empty."
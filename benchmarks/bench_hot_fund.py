@@ -0,0 +1,138 @@
+"""Contention benchmark: many donors giving to one hot fund at the same time.
+
+Compares donations/sec of the single-row path (every donation updates
+FundsNeeded.amount_raised) with sharded-counter mode (DAL_counters). Each
+donation runs in a unit of work that stays open for --think-ms after the
+write, as a request doing more work in the same transaction would, so the
+row lock is held for a realistic time.
+
+    python benchmarks/bench_hot_fund.py --threads 32 --seconds 10
+    python benchmarks/bench_hot_fund.py --backend sqlite --database /tmp/bench.db
+
+Run it against MySQL to see the effect of row locks: SQLite takes one write
+lock for the whole database, so there both modes serialize and the numbers
+only show the overhead of the shard upsert.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from FundRaiseDAL import DAL_core, DAL_counters, DAL_donor, DAL_metrics  # noqa: E402
+from FundRaiseLIB import LIB_admin, LIB_core, LIB_recipient            # noqa: E402
+
+
+def setup_fund(amount_needed):
+    """Creates the users and one verified fund; returns (fund_id, donor_id)."""
+    suffix = f"{os.getpid()}.{time.time_ns()}"
+    auth = LIB_core.AuthManager()
+    _, recipient_id = auth.register_user('Bench Recipient', f"recipient.{suffix}@bench", 'secret1', 'Recipient')
+    _, service_id = auth.register_user('Bench Service', f"service.{suffix}@bench", 'secret1', 'Service')
+    _, donor_id = auth.register_user('Bench Donor', f"donor.{suffix}@bench", 'secret1', 'Donor')
+    LIB_core.ProfileManager().update_profile(service_id, role='Service', role_data={'service_name': f"Bench {suffix}"})
+
+    LIB_recipient.RecipientManager().create_fund(
+        recipient_id, f"Bench {suffix}", str(amount_needed), 'https://example.com/proof',
+        {f"Bench {suffix}": service_id}
+    )
+    conn = DAL_core.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(fund_id) FROM FundsNeeded WHERE recipient_id = %s", (recipient_id,))
+    fund_id = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    LIB_admin.AdminManager().verify_fund(fund_id)
+    return fund_id, donor_id
+
+
+def fund_state(fund_id):
+    conn = DAL_core.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT amount_raised, is_fully_funded FROM FundsNeeded WHERE fund_id = %s", (fund_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return row
+
+
+def run(mode, args):
+    DAL_counters.COUNTER_CONFIG['enabled'] = mode == 'sharded'
+    DAL_counters.COUNTER_CONFIG['shards'] = args.shards
+    # A run that donates more than amount_needed also checks the is_fully_funded transition
+    fund_id, donor_id = setup_fund(args.amount_needed)
+
+    done = []
+    failed = []
+    stop = time.perf_counter() + args.seconds
+
+    def donor():
+        ok = errors = 0
+        while time.perf_counter() < stop:
+            with DAL_core.session() as s:
+                success, _ = DAL_donor.execute_donation_transaction(fund_id, donor_id, 1, session=s)
+                time.sleep(args.think_ms / 1000)
+            if success and not s.failed:
+                ok += 1
+            else:
+                errors += 1
+        done.append(ok)
+        failed.append(errors)
+
+    threads = [threading.Thread(target=donor) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    DAL_counters.fold_counters([fund_id])
+    amount_raised, is_fully_funded = fund_state(fund_id)
+    total = sum(done)
+    return {
+        'mode': mode,
+        'donations': total,
+        'errors': sum(failed),
+        'per_sec': total / elapsed,
+        'exact': float(amount_raised) == float(total),
+        'fully_funded_ok': bool(is_fully_funded) == (total >= args.amount_needed),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], help="override DAL_core.DB_BACKEND")
+    parser.add_argument('--database', help="database name (mysql) or file path (sqlite)")
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--think-ms', type=float, default=2.0, help="time each transaction stays open after the write")
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--amount-needed', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    DAL_core.POOL_CONFIG['max_size'] = args.threads + 2
+    # Lock waits are the point of the benchmark; don't log each one as a slow query
+    DAL_metrics.METRICS_CONFIG['slow_query_ms'] = float('inf')
+    if args.backend or args.database:
+        options = {'database': args.database} if args.database else {}
+        DAL_core.configure_backend(args.backend or DAL_core.DB_BACKEND, **options)
+
+    print(f"{args.threads} threads, {args.seconds:g}s per mode, {args.think_ms:g} ms think time, "
+          f"backend {DAL_core.get_backend().name}")
+    print(f"{'mode':<12}{'donations':>10}{'errors':>8}{'per sec':>10}  totals exact  fully-funded flag")
+    results = [run(mode, args) for mode in ('single-row', 'sharded')]
+    for r in results:
+        print(f"{r['mode']:<12}{r['donations']:>10}{r['errors']:>8}{r['per_sec']:>10.1f}  "
+              f"{'yes' if r['exact'] else 'NO':<12}  {'ok' if r['fully_funded_ok'] else 'WRONG'}")
+    single, sharded = results
+    if single['per_sec']:
+        print(f"speed-up: {sharded['per_sec'] / single['per_sec']:.2f}x")
+    return 0 if all(r['exact'] and r['fully_funded_ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
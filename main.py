@@ -1,16 +1,28 @@
+import time
+
+_PROCESS_START = time.perf_counter()  # taken before the GUI imports so they count towards startup
+
+import os
+import sys
 import tkinter as tk
 from tkinter import messagebox
 
+from FundRaiseDAL import DAL_writebehind
 from FundRaiseGUI.GUI_core import MainWindow, LoginWindow, RegistrationWindow
 from FundRaiseGUI.GUI_admin import AdminDashboard
 from FundRaiseGUI.GUI_recipient import RecipientDashboard
 from FundRaiseGUI.GUI_donor import DonorDashboard
 from FundRaiseGUI.GUI_service import ServiceDashboard
 from FundRaiseGUI.GUI_profile import ProfileWindow
+from FundRaiseGUI.GUI_worker import BackgroundLoader
+
+
+# Frames that display data for the logged-in user take a user_id argument
+USER_FRAMES = (RecipientDashboard, DonorDashboard, ServiceDashboard)
 
 
 class MainApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup_timing=False):
         super().__init__()
         self.title("Fundraising Project")
         self.geometry("900x650")
@@ -18,57 +30,62 @@ class MainApp(tk.Tk):
         self.user_id = None
         self.user_role = None
 
-        container = tk.Frame(self)
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        # Database reads issued by the frames run here, off the Tk main thread
+        self.loader = BackgroundLoader(self)
+        self.current_frame = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        self.frames = {}
+        self.container = tk.Frame(self)
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
-        # Initialize all possible frames
-        for F in (
-            MainWindow,
-            LoginWindow,
-            RegistrationWindow,
-            AdminDashboard,
-            RecipientDashboard,
-            DonorDashboard,
-            ServiceDashboard,
-            ProfileWindow,
-        ):
-            page_name = F.__name__
-            if F in (RecipientDashboard, DonorDashboard, ServiceDashboard):
-                frame = F(master=container, controller=self, user_id=None)
-            else:
-                frame = F(master=container, controller=self)
+        # Frames are built on first show_frame and cached afterwards
+        self.frames = {}
+        self.frame_build_times = {}
 
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        self.startup_timing = startup_timing
+        if startup_timing:
+            self.after_idle(self.report_startup_time)
 
         self.show_frame(MainWindow)  # Start on the Main Window
 
+    def get_frame(self, cont):
+        """Returns the cached frame for cont, building it on first use."""
+        frame = self.frames.get(cont.__name__)
+        if frame is None:
+            started = time.perf_counter()
+            if cont in USER_FRAMES:
+                frame = cont(master=self.container, controller=self, user_id=self.user_id)
+            else:
+                frame = cont(master=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[cont.__name__] = frame
+            self.frame_build_times[cont.__name__] = time.perf_counter() - started
+        return frame
+
     def login(self, user_id, user_role):
         """Called upon successful login. Updates user info and routes to dashboard."""
         self.user_id = user_id
         self.user_role = user_role
 
-        # Update user_id in the target frame before showing it
-        target_frame_name = user_role + 'Dashboard'
-        if user_role in ('Recipient', 'Donor', 'Service'):
-            self.frames[target_frame_name].user_id = user_id
-
         # Route to the appropriate dashboard, ensuring data is refreshed
-        if user_role == 'Admin':
-            self.show_frame(AdminDashboard)
-        elif user_role == 'Recipient':
-            self.show_frame(RecipientDashboard)
-        elif user_role == 'Donor':
-            self.show_frame(DonorDashboard)
-        elif user_role == 'Service':
-            self.show_frame(ServiceDashboard)
-        else:
+        targets = {
+            'Admin': AdminDashboard,
+            'Recipient': RecipientDashboard,
+            'Donor': DonorDashboard,
+            'Service': ServiceDashboard,
+        }
+        target = targets.get(user_role)
+        if target is None:
             messagebox.showerror("Error", "Role not recognized.")
             self.show_frame(LoginWindow)
+            return
+
+        # Update user_id in the target frame before showing it
+        if target in USER_FRAMES:
+            self.get_frame(target).user_id = user_id
+        self.show_frame(target)
 
     def logout(self):
         """Resets user state and returns to the Main Window."""
@@ -80,31 +97,45 @@ class MainApp(tk.Tk):
         """Open the ProfileWindow for the currently logged-in user."""
         if not self.user_id:
             return
-        frame = self.frames.get('ProfileWindow')
-        if frame:
-            frame.user_id = self.user_id
-            frame.user_role = self.user_role
-            try:
-                frame.load_profile()
-            except Exception:
-                pass
-            self.show_frame(ProfileWindow)
+        frame = self.get_frame(ProfileWindow)
+        frame.user_id = self.user_id
+        frame.user_role = self.user_role
+        try:
+            frame.load_profile()
+        except Exception:
+            pass
+        self.show_frame(ProfileWindow)
 
     def show_frame(self, cont):
         """Raises the requested frame to the top and reloads data if necessary."""
-        frame = self.frames[cont.__name__]
+        frame = self.get_frame(cont)
+
+        # Results still loading for the frame we are leaving are no longer wanted
+        if self.current_frame is not None and self.current_frame is not frame:
+            self.loader.cancel(self.current_frame)
+        self.current_frame = frame
 
-        # Data refresh logic for dynamic dashboards
-        if cont.__name__ == 'MainWindow' and hasattr(frame, 'load_data'):
-            frame.load_data()
-        elif cont.__name__ in ('AdminDashboard', 'DonorDashboard', 'ServiceDashboard', 'RecipientDashboard'):
-            if hasattr(frame, 'load_funds'):
-                frame.load_funds()
+        # Data refresh logic for dynamic frames; constructors never hit the database
+        if hasattr(frame, 'refresh'):
+            frame.refresh()
 
         frame.tkraise()
 
+    def report_startup_time(self):
+        """Prints time-to-first-paint and per-frame build times (startup timing mode)."""
+        self.update_idletasks()     # flush pending geometry and redraws of the first frame
+        first_paint = time.perf_counter() - _PROCESS_START
+        print(f"[startup] time-to-first-paint: {first_paint * 1000:.1f} ms")
+        for name, seconds in self.frame_build_times.items():
+            print(f"[startup]   built {name} in {seconds * 1000:.1f} ms")
+
+    def on_close(self):
+        self.loader.shutdown()
+        DAL_writebehind.shutdown()
+        self.destroy()
+
 
 if __name__ == "__main__":
-    app = MainApp()
+    timing = '--startup-timing' in sys.argv[1:] or os.environ.get('FUNDRAISE_STARTUP_TIMING') == '1'
+    app = MainApp(startup_timing=timing)
     app.mainloop()
-
@@ -0,0 +1,45 @@
+"""Shared fixtures: every test runs against a fresh in-memory SQLite database."""
+
+import pytest
+
+from FundRaiseDAL import DAL_cache, DAL_core
+from FundRaiseLIB import LIB_admin, LIB_core, LIB_recipient
+
+
+@pytest.fixture
+def db():
+    """Configures an empty in-memory SQLite database for the test."""
+    DAL_core.configure_backend('sqlite', database=':memory:')
+    DAL_cache.clear()
+    yield
+    DAL_cache.clear()
+    DAL_core.reset_pool()
+
+
+@pytest.fixture
+def users(db):
+    """Registers a recipient, a named service and a donor. Returns {role: user_id}."""
+    auth = LIB_core.AuthManager()
+    ids = {}
+    for name, email, role in [('Rita', 'rita@example.com', 'Recipient'),
+                              ('Sam', 'sam@example.com', 'Service'),
+                              ('Dana', 'dana@example.com', 'Donor')]:
+        success, user_id = auth.register_user(name, email, 'secret1', role)
+        assert success, user_id
+        ids[role] = user_id
+    LIB_core.ProfileManager().update_profile(ids['Service'], role='Service', role_data={'service_name': 'Clinic'})
+    return ids
+
+
+@pytest.fixture
+def funds(users):
+    """Creates ten verified funds needing $100, $110, ... $190. Returns their fund_ids."""
+    recipients = LIB_recipient.RecipientManager()
+    for i in range(10):
+        success, message = recipients.create_fund(users['Recipient'], 'Sam', str(100 + 10 * i),
+                                                  f'http://proof/{i}', {'Sam': users['Service']})
+        assert success, message
+    fund_ids = [row[0] for row in LIB_admin.AdminManager().get_all_funds_list()]
+    for fund_id in fund_ids:
+        assert LIB_admin.AdminManager().verify_fund(fund_id)[0]
+    return fund_ids
@@ -0,0 +1,128 @@
+"""Connection pool, Session and retry_transient on the SQLite backend."""
+
+import sqlite3
+
+import pytest
+
+from FundRaiseDAL import DAL_core, DAL_donor
+from FundRaiseDAL.DAL_retry import RETRY_CONFIG, raise_if_retryable, retry_transient
+
+
+def test_pool_checkout_and_return(db):
+    before = DAL_core.get_pool_stats()
+    conn = DAL_core.get_db_connection()
+    assert DAL_core.get_pool_stats()['in_use'] == 1
+    conn.close()
+    after = DAL_core.get_pool_stats()
+    assert after['in_use'] == 0
+    assert after['idle'] == 1
+    assert after['checkouts'] == before['checkouts'] + 1
+
+
+def test_pool_reuses_the_returned_connection(db):
+    for _ in range(3):
+        DAL_core.get_db_connection().close()
+    assert DAL_core.get_pool_stats()['created'] == 1
+
+
+def test_pool_times_out_when_exhausted(db):
+    conn = DAL_core.get_db_connection()
+    try:
+        with pytest.raises(DAL_core.PoolTimeout):
+            DAL_core.get_pool().acquire(timeout=0.01)
+        assert DAL_core.get_pool_stats()['timeouts'] == 1
+    finally:
+        conn.close()
+
+
+def test_returned_connection_has_no_open_transaction(db):
+    conn = DAL_core.get_db_connection()
+    conn.cursor().execute("INSERT INTO Users (name, email, password_hash, user_type) "
+                          "VALUES ('Al', 'al@example.com', 'x', 'Donor')")
+    conn.close()    # without commit
+    assert DAL_core.fetch_user_by_email('al@example.com') is None
+
+
+def test_session_commits_once_on_exit(db):
+    with DAL_core.session() as s:
+        assert DAL_core.create_user('Al', 'al@example.com', 'secret1', 'Donor', session=s)[0]
+        assert DAL_core.create_user('Bo', 'bo@example.com', 'secret1', 'Donor', session=s)[0]
+    assert DAL_core.fetch_user_by_email('al@example.com')
+    assert DAL_core.fetch_user_by_email('bo@example.com')
+
+
+def test_session_rollback_discards_every_call(db):
+    callbacks = []
+    with DAL_core.session() as s:
+        DAL_core.create_user('Al', 'al@example.com', 'secret1', 'Donor', session=s)
+        s.after_commit(lambda: callbacks.append('committed'))
+        s.rollback()
+    assert DAL_core.fetch_user_by_email('al@example.com') is None
+    assert callbacks == []
+
+
+def test_session_rolls_back_when_a_dal_call_fails(db):
+    with DAL_core.session() as s:
+        success, donor_id = DAL_core.create_user('Al', 'al@example.com', 'secret1', 'Donor', session=s)
+        assert success
+        # No such fund: the foreign key fails and the DAL call rolls the session back
+        assert not DAL_donor.execute_donation_transaction(999, donor_id, 5, session=s)[0]
+    assert s.failed
+    assert DAL_core.fetch_user_by_email('al@example.com') is None
+
+
+def test_session_rolls_back_when_create_user_fails(db):
+    assert DAL_core.create_user('Al', 'al@example.com', 'secret1', 'Donor')[0]
+    with DAL_core.session() as s:
+        assert DAL_core.create_user('Bo', 'bo@example.com', 'secret1', 'Donor', session=s)[0]
+        # Duplicate email: the INSERT fails and the whole unit of work is dropped
+        assert not DAL_core.create_user('Al', 'al@example.com', 'secret1', 'Donor', session=s)[0]
+    assert s.failed
+    assert DAL_core.fetch_user_by_email('bo@example.com') is None
+
+
+def test_session_rolls_back_on_exception(db):
+    with pytest.raises(RuntimeError):
+        with DAL_core.session() as s:
+            DAL_core.create_user('Al', 'al@example.com', 'secret1', 'Donor', session=s)
+            raise RuntimeError
+    assert DAL_core.fetch_user_by_email('al@example.com') is None
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setitem(RETRY_CONFIG, 'base_delay', 0)
+
+
+def _flaky(failures):
+    """A write function failing with 'database is locked' the first `failures` times."""
+    calls = []
+
+    @retry_transient
+    def write(session=None):
+        calls.append(1)
+        if len(calls) <= failures:
+            err = sqlite3.OperationalError('database is locked')
+            raise_if_retryable(err, session)
+            return False, str(err)
+        return True, len(calls)
+
+    return write, calls
+
+
+def test_retry_transient_retries_lock_errors(db, no_backoff):
+    write, calls = _flaky(failures=2)
+    assert write() == (True, 3)
+
+
+def test_retry_transient_gives_up_after_max_attempts(db, no_backoff):
+    write, calls = _flaky(failures=10)
+    assert write() == (False, 'database is locked')
+    assert len(calls) == RETRY_CONFIG['max_attempts']
+
+
+def test_retry_transient_leaves_sessions_alone(db, no_backoff):
+    write, calls = _flaky(failures=1)
+    with DAL_core.session() as s:
+        assert write(session=s) == (False, 'database is locked')
+    assert len(calls) == 1
@@ -0,0 +1,81 @@
+"""Donation writes: idempotent replay, fund totals and the fully-funded flip."""
+
+from decimal import Decimal
+
+import pytest
+
+from FundRaiseDAL import DAL_admin, DAL_counters, DAL_donor
+from FundRaiseDAL.DAL_counters import COUNTER_CONFIG
+
+
+def fund(fund_id):
+    """(amount_raised, is_fully_funded) as stored on FundsNeeded."""
+    row = next(row for row in DAL_admin.fetch_all_funds() if row[0] == fund_id)
+    return Decimal(str(row[4])), bool(row[6])
+
+
+@pytest.fixture(params=[False, True], ids=['delta', 'sharded'])
+def counters(request, monkeypatch):
+    """Runs the test with single-row deltas and with sharded counters."""
+    monkeypatch.setitem(COUNTER_CONFIG, 'enabled', request.param)
+    return request.param
+
+
+def test_replay_with_the_same_key_records_once(funds, users):
+    fund_id, donor_id = funds[0], users['Donor']
+    assert DAL_donor.execute_donation_transaction(fund_id, donor_id, 5, idempotency_key='k1') == (True, "Success")
+    assert DAL_donor.execute_donation_transaction(fund_id, donor_id, 5, idempotency_key='k1') == (True, "Success")
+    assert len(DAL_donor.fetch_donations_for_donor(donor_id)) == 1
+    assert fund(fund_id)[0] == Decimal('5.00')
+
+
+def test_replay_with_different_details_is_refused(funds, users):
+    fund_id, donor_id = funds[0], users['Donor']
+    assert DAL_donor.execute_donation_transaction(fund_id, donor_id, 5, idempotency_key='k1')[0]
+    success, message = DAL_donor.execute_donation_transaction(fund_id, donor_id, 6, idempotency_key='k1')
+    assert not success
+    assert 'different donation' in message
+    assert fund(fund_id)[0] == Decimal('5.00')
+
+
+def test_batch_skips_recorded_keys(funds, users):
+    donor_id = users['Donor']
+    batch = [(funds[0], donor_id, Decimal('1.00'), 'a'), (funds[1], donor_id, Decimal('2.00'), 'b')]
+    assert DAL_donor.execute_donation_batch(batch) == (True, 2)
+    assert DAL_donor.execute_donation_batch(batch + [(funds[1], None, Decimal('3.00'), 'c')]) == (True, 1)
+    assert fund(funds[0])[0] == Decimal('1.00')
+    assert fund(funds[1])[0] == Decimal('5.00')
+    assert DAL_donor.fetch_recorded_idempotency_keys(['a', 'c', 'z']) == {'a', 'c'}
+
+
+def test_totals_add_up(funds, users, counters):
+    for amount in ('10.10', '20.20', '30.30'):
+        assert DAL_donor.execute_donation_transaction(funds[0], users['Donor'], Decimal(amount))[0]
+    assert DAL_counters.fold_counters()[0]
+    assert fund(funds[0]) == (Decimal('60.60'), False)
+
+
+def test_sharded_donations_stay_in_shards_until_folded(funds, users, monkeypatch):
+    monkeypatch.setitem(COUNTER_CONFIG, 'enabled', True)
+    assert DAL_donor.execute_donation_transaction(funds[0], users['Donor'], 7)[0]
+    assert fund(funds[0])[0] == Decimal('0.00')
+    assert DAL_counters.fold_counters() == (True, {funds[0]: Decimal('7.00')})
+    assert fund(funds[0])[0] == Decimal('7.00')
+
+
+def test_reaching_the_target_flips_fully_funded(funds, users, counters):
+    fund_id = funds[0]    # needs $100
+    assert DAL_donor.execute_donation_transaction(fund_id, users['Donor'], 60)[0]
+    assert fund(fund_id)[1] is False
+    assert DAL_donor.execute_donation_transaction(fund_id, users['Donor'], 40)[0]
+    # No fold needed: the donation that reached the target flipped the flag
+    assert fund(fund_id) == (Decimal('100.00'), True)
+    assert fund_id not in [row[0] for row in DAL_donor.fetch_active_funds()]
+
+
+def test_batch_reaching_the_target_flips_fully_funded(funds, users, counters):
+    fund_id = funds[0]
+    batch = [(fund_id, users['Donor'], Decimal('50.00'), f'k{i}') for i in range(2)]
+    assert DAL_donor.execute_donation_batch(batch) == (True, 2)
+    assert DAL_counters.fold_counters()[0]
+    assert fund(fund_id) == (Decimal('100.00'), True)
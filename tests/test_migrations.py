@@ -0,0 +1,39 @@
+"""Schema migrations on SQLite files."""
+
+import pytest
+
+from FundRaiseDAL import DAL_backend, DAL_migrations
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """Raw connection to an empty SQLite file; no migrations applied."""
+    conn = DAL_backend.create_backend('sqlite', database=str(tmp_path / 'fundraising.db'), bootstrap=False).connect()
+    yield conn
+    conn.close()
+
+
+def test_upgrade_drops_the_donations_date_index(conn):
+    DAL_migrations.upgrade(conn, 'sqlite', target=8)
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX ix_donations_date ON Donations (donation_date, donation_id)")
+    conn.commit()
+    assert DAL_migrations.upgrade(conn, 'sqlite') == [9]
+    assert 'ix_donations_date' not in DAL_migrations.list_indexes(cursor, 'sqlite', 'Donations')
+
+
+def test_upgrade_recreates_the_board_triggers_for_unnamed_services(conn):
+    DAL_migrations.upgrade(conn, 'sqlite', target=7)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO Users (user_id, name, email, password_hash, user_type) VALUES "
+                   "(1, 'Rita', 'rita@example.com', 'x', 'Recipient'), (2, 'Sam', 'sam@example.com', 'x', 'Service')")
+    cursor.execute("INSERT INTO Services (user_id, service_name) VALUES (2, 'Clinic')")
+    cursor.execute("INSERT INTO FundsNeeded (recipient_id, service_id, amount_needed) VALUES (1, 2, 100)")
+    conn.commit()
+    assert DAL_migrations.upgrade(conn, 'sqlite') == [8, 9]
+
+    cursor.execute("UPDATE Services SET service_name = NULL WHERE user_id = 2")
+    cursor.execute("INSERT INTO FundsNeeded (recipient_id, service_id, amount_needed) VALUES (1, 2, 50)")
+    conn.commit()
+    cursor.execute("SELECT fund_id, service_name FROM PublicBoard ORDER BY fund_id")
+    assert cursor.fetchall() == [(1, ''), (2, '')]
@@ -0,0 +1,74 @@
+"""Keyset and offset paging of the fund lists."""
+
+import pytest
+
+from FundRaiseDAL import DAL_admin, DAL_core, DAL_donor
+from FundRaiseLIB import LIB_admin
+from FundRaiseLIB.LIB_core import page_result, sort_key
+
+
+def walk(fetch_page):
+    """Follows next_after until the last page. Returns every row and the page count."""
+    rows, after, pages = [], None, 0
+    while True:
+        page, after = fetch_page(after)
+        rows += page
+        pages += 1
+        if after is None:
+            return rows, pages
+
+
+def test_page_result():
+    assert page_result([(1,), (2,)], 2, key=lambda row: row[0]) == ([(1,), (2,)], 2)
+    assert page_result([(1,)], 2, key=lambda row: row[0]) == ([(1,)], None)
+    assert page_result([], 2, key=lambda row: row[0]) == ([], None)
+    assert page_result([(1,), (2,)], None, key=lambda row: row[0]) == ([(1,), (2,)], None)
+
+
+@pytest.mark.parametrize('sort', [None, 'needed', 'raised'])
+@pytest.mark.parametrize('descending', [False, True])
+def test_keyset_pages_cover_every_fund_once(funds, users, sort, descending):
+    # Equal amount_raised values make the keyset fall back to fund_id
+    DAL_donor.execute_donation_transaction(funds[3], users['Donor'], 5)
+    DAL_donor.execute_donation_transaction(funds[6], users['Donor'], 5)
+    manager = LIB_admin.AdminManager()
+    rows, pages = walk(lambda after: manager.get_all_funds_page(after=after, limit=3, sort=sort,
+                                                                descending=descending))
+    assert rows == DAL_admin.fetch_all_funds(sort=sort, descending=descending)
+    assert len(rows) == 10
+    assert pages == 4
+
+
+@pytest.mark.parametrize('sort', [None, 'needed', 'raised'])
+def test_offset_ranges_match_the_sorted_list(funds, sort):
+    manager = LIB_admin.AdminManager()
+    everything = DAL_admin.fetch_all_funds(sort=sort, descending=True)
+    for offset in (0, 4, 9):
+        assert manager.get_all_funds_range(offset, limit=3, sort=sort, descending=True) == everything[offset:offset + 3]
+    assert manager.get_all_funds_range(10, limit=3, sort=sort) == []
+
+
+def test_offset_without_limit_is_refused(funds):
+    with pytest.raises(ValueError):
+        DAL_admin.fetch_all_funds(offset=5)
+
+
+def test_offset_with_a_keyset_cursor_is_refused(funds):
+    with pytest.raises(ValueError):
+        DAL_admin.fetch_all_funds(after=funds[2], offset=5, limit=3)
+
+
+def test_filters_narrow_pages_and_counts(funds, users):
+    manager = LIB_admin.AdminManager()
+    assert manager.count_all_funds(filters={'recipient': 'ri'}) == 10
+    assert manager.count_all_funds(filters={'recipient': 'zz'}) == 0
+    assert manager.get_all_funds_page(limit=3, filters={'recipient': 'zz'}) == ([], None)
+
+
+@pytest.mark.parametrize('sort', [None, 'recipient', 'raised'])
+def test_public_board_pages(funds, users, sort):
+    DAL_donor.execute_donation_transaction(funds[0], users['Donor'], 5)
+    key = sort_key(DAL_core.BOARD_SORTS, sort, 'fund_id')
+    rows, pages = walk(lambda after: page_result(DAL_core.fetch_funds_data(after=after, limit=4, sort=sort), 4, key))
+    assert rows == DAL_core.fetch_funds_data(sort=sort)
+    assert pages == 3
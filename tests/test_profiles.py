@@ -0,0 +1,17 @@
+"""ProfileManager reads on the single-connection in-memory pool."""
+
+from FundRaiseDAL import DAL_cache, DAL_core
+from FundRaiseLIB import LIB_core
+
+
+def test_service_profile_on_a_cold_cache(users):
+    DAL_cache.clear()
+    profile = LIB_core.ProfileManager().get_profile(users['Service'])
+    assert profile['role_profile']['service_name'] == 'Clinic'
+    assert DAL_core.get_pool_stats()['timeouts'] == 0
+
+
+def test_service_profile_from_the_cache(users):
+    manager = LIB_core.ProfileManager()
+    manager.get_profile(users['Service'])
+    assert manager.get_profile(users['Service'])['role_profile']['service_name'] == 'Clinic'
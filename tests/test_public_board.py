@@ -0,0 +1,75 @@
+"""PublicBoard triggers keep the read model equal to the join it replaces."""
+
+from FundRaiseDAL import DAL_admin, DAL_board, DAL_core, DAL_donor, DAL_service
+from FundRaiseLIB import LIB_core, LIB_recipient
+
+
+def board():
+    """{fund_id: (recipient_name, service_name, amount_raised, is_fully_funded)} from PublicBoard."""
+    return {row[0]: (row[1], row[2], float(row[4]), bool(row[5])) for row in DAL_core.fetch_funds_data()}
+
+
+def assert_consistent():
+    assert DAL_board.check_public_board() == (True, [])
+
+
+def test_new_funds_are_listed(funds):
+    assert sorted(board()) == sorted(funds)
+    assert_consistent()
+
+
+def test_donations_update_the_board(funds, users):
+    assert DAL_donor.execute_donation_transaction(funds[0], users['Donor'], 100)[0]
+    assert board()[funds[0]] == ('Rita', 'Clinic', 100.0, True)
+    assert_consistent()
+
+
+def test_amount_updates_and_deletes(funds):
+    assert DAL_admin.update_fund_amount_and_proof(funds[1], 500, 'http://proof/new')[0]
+    assert DAL_admin.delete_fund(funds[2])[0]
+    assert funds[2] not in board()
+    assert_consistent()
+
+
+def test_renames_update_the_board(funds, users):
+    profiles = LIB_core.ProfileManager()
+    assert profiles.update_profile(users['Recipient'], name='Rita B')[0]
+    assert profiles.update_profile(users['Service'], role='Service', role_data={'service_name': 'Hospital'})[0]
+    assert set(board().values()) == {('Rita B', 'Hospital', 0.0, False)}
+    assert_consistent()
+
+
+def test_service_without_a_name(funds, users):
+    success, service_id = LIB_core.AuthManager().register_user('Lee', 'lee@example.com', 'secret1', 'Service')
+    assert success
+    assert LIB_recipient.RecipientManager().create_fund(users['Recipient'], 'Lee', '50', None, {'Lee': service_id})[0]
+    fund_id = funds[-1] + 1
+    # No Services row yet: not listed, like the join
+    assert fund_id not in board()
+    assert DAL_service.upsert_service_profile(service_id, None, None, None)[0]
+    assert board()[fund_id] == ('Rita', '', 0.0, False)
+    assert_consistent()
+    assert DAL_service.upsert_service_profile(service_id, 'Lab', None, None)[0]
+    assert board()[fund_id] == ('Rita', 'Lab', 0.0, False)
+    assert_consistent()
+
+
+def test_rebuild_matches_the_triggers(funds, users):
+    DAL_donor.execute_donation_transaction(funds[0], users['Donor'], 5)
+    before = board()
+    assert DAL_board.rebuild_public_board()[0]
+    assert board() == before
+    assert_consistent()
+
+
+def test_check_reports_drift(funds):
+    conn = DAL_core.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE PublicBoard SET amount_raised = 1 WHERE fund_id = %s", (funds[0],))
+    cursor.execute("DELETE FROM PublicBoard WHERE fund_id = %s", (funds[1],))
+    conn.commit()
+    cursor.close()
+    conn.close()
+    assert DAL_board.check_public_board() == (True, sorted(funds[:2]))
+    assert DAL_board.rebuild_public_board()[0]
+    assert_consistent()
@@ -0,0 +1,92 @@
+"""Write-behind donation queue: journal recovery and compaction."""
+
+import os
+from decimal import Decimal
+
+import pytest
+
+from FundRaiseDAL import DAL_admin, DAL_donor, DAL_writebehind
+from FundRaiseDAL.DAL_writebehind import WRITE_BEHIND_CONFIG, WriteBehindQueue
+from FundRaiseLIB import LIB_donor
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / 'donations.journal')
+
+
+def amount_raised(fund_id):
+    return Decimal(str(next(row for row in DAL_admin.fetch_all_funds() if row[0] == fund_id)[4]))
+
+
+def test_queued_donations_survive_a_crash(funds, users, journal_path):
+    queue = WriteBehindQueue(journal_path=journal_path)
+    for i in range(5):
+        assert queue.enqueue(funds[0], users['Donor'], 2, idempotency_key=f'k{i}') == (True, "Queued")
+    queue.journal.close()   # crash: nothing flushed
+
+    recovered = WriteBehindQueue(journal_path=journal_path)
+    assert recovered.stats['recovered'] == 5
+    assert recovered.flush()
+    assert amount_raised(funds[0]) == Decimal('10.00')
+    assert recovered.stop()
+    assert WriteBehindQueue(journal_path=journal_path).stats['recovered'] == 0
+
+
+def test_replay_after_checkpoint_loss_records_nothing_twice(funds, users, journal_path):
+    queue = WriteBehindQueue(journal_path=journal_path)
+    for i in range(3):
+        queue.enqueue(funds[0], users['Donor'], 1, idempotency_key=f'k{i}')
+    assert queue.stop()
+    os.remove(journal_path + '.checkpoint')   # crash between commit and checkpoint
+
+    replayed = WriteBehindQueue(journal_path=journal_path)
+    assert replayed.stats['recovered'] == 3
+    assert replayed.stop()
+    assert replayed.stats['skipped'] == 3
+    assert len(DAL_donor.fetch_donations_for_donor(users['Donor'])) == 3
+
+
+def test_drained_journal_is_compacted(funds, users, journal_path, monkeypatch):
+    monkeypatch.setitem(WRITE_BEHIND_CONFIG, 'compact_bytes', 1)
+    queue = WriteBehindQueue(journal_path=journal_path, batch_size=2)
+    for i in range(3):
+        queue.enqueue(funds[0], users['Donor'], 1, idempotency_key=f'k{i}')
+    assert os.path.getsize(journal_path) > 0
+    assert queue.flush()
+    assert os.path.getsize(journal_path) == 0
+    # Sequence numbers continue past the compacted entries
+    queue.enqueue(funds[0], users['Donor'], 1, idempotency_key='k3')
+    assert queue.stop()
+    assert queue.journal.read_checkpoint() == 4
+    assert amount_raised(funds[0]) == Decimal('4.00')
+
+
+def test_rejected_donation_does_not_block_the_batch(funds, users, journal_path):
+    queue = WriteBehindQueue(journal_path=journal_path)
+    queue.enqueue(funds[0], users['Donor'], 1)
+    queue.enqueue(999, users['Donor'], 1)     # no such fund
+    queue.enqueue(funds[0], users['Donor'], 1)
+    assert queue.stop()
+    assert queue.stats['rejected'] == 1
+    assert amount_raised(funds[0]) == Decimal('2.00')
+    with open(journal_path + '.rejected', encoding='utf-8') as f:
+        assert '"fund_id":999' in f.read()
+
+
+def test_submit_donation_reports_queued_donations(funds, users, journal_path, monkeypatch):
+    monkeypatch.setitem(WRITE_BEHIND_CONFIG, 'enabled', True)
+    monkeypatch.setitem(WRITE_BEHIND_CONFIG, 'journal_path', journal_path)
+    manager = LIB_donor.DonorManager()
+    try:
+        success, message = manager.submit_donation(funds[0], '5', False, funds, users['Donor'])
+        assert success
+        assert 'queued' in message
+    finally:
+        DAL_writebehind.shutdown()
+    assert amount_raised(funds[0]) == Decimal('5.00')
+
+    monkeypatch.setitem(WRITE_BEHIND_CONFIG, 'enabled', False)
+    success, message = manager.submit_donation(funds[0], '5', False, funds, users['Donor'])
+    assert success
+    assert 'submitted successfully' in message